@@ -0,0 +1,82 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.blobstore import CONTENT_TYPES, REF_PATTERN, get_blob_store
+
+router = APIRouter()
+
+# Blobs are content-addressed, so a given URL never changes
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Blobs include SVG, some of it from remote image backends, served from the
+# API origin: never sniff a different type, and run no scripts or loads
+_SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "Content-Security-Policy": "default-src 'none'; sandbox",
+}
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single "bytes=start-end" range; None when unsatisfiable."""
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_s, _, end_s = spec.strip().partition("-")
+    try:
+        if not start_s:  # suffix range: last N bytes
+            length = int(end_s)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+@router.api_route("/blobs/{ref}", methods=["GET", "HEAD"])
+async def get_blob(ref: str, request: Request):
+    if not REF_PATTERN.match(ref):
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    etag = f'"{ref.split(".")[0]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": _CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+        **_SECURITY_HEADERS,
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+
+    data = await get_blob_store().get(ref)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    media_type = CONTENT_TYPES[ref.rsplit(".", 1)[1]]
+    size = len(data)
+
+    range_header = request.headers.get("range")
+    if range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        body = data[start:end + 1]
+        return Response(
+            content=b"" if request.method == "HEAD" else body,
+            status_code=206,
+            media_type=media_type,
+            headers={**headers, "Content-Length": str(len(body))},
+        )
+
+    return Response(
+        content=b"" if request.method == "HEAD" else data,
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(size)},
+    )
@@ -5,16 +5,28 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis import enqueue_job, queue_depth
 from app.models.design import Design
 from app.models.job import Job
 from app.models.session import Session
 from app.schemas.design import DesignCreate, DesignResponse, ProcessResponse
+from app.services.canvas_analysis import canvas_sha256
 from app.worker.processor import process_job_inline
 
 router = APIRouter()
 
 
+def queue_mode() -> bool:
+    """Whether jobs go to the worker queue rather than running inline.
+
+    Queue mode needs REDIS_URL: the in-memory queue lives in the API process,
+    where no worker would ever consume it, so jobs fall back to inline.
+    """
+    return settings.JOB_EXECUTION_MODE == "queue" and bool(settings.REDIS_URL)
+
+
 @router.post("/designs", response_model=DesignResponse)
 async def create_design(body: DesignCreate, db: AsyncSession = Depends(get_db)):
     session = await db.get(Session, body.session_id)
@@ -30,6 +42,7 @@ async def create_design(body: DesignCreate, db: AsyncSession = Depends(get_db)):
     )
     if body.canvas_data:
         design.input_image_url = body.canvas_data
+        design.input_image_sha256 = canvas_sha256(body.canvas_data)
 
     db.add(design)
     await db.commit()
@@ -63,13 +76,21 @@ async def process_design(design_id: uuid.UUID, db: AsyncSession = Depends(get_db
     if done_job:
         return ProcessResponse(job_id=done_job.id, status=done_job.status)
 
+    queued = queue_mode()
+    if queued and settings.QUEUE_MAX_DEPTH and await queue_depth() >= settings.QUEUE_MAX_DEPTH:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+
     job = Job(design_id=str(design_id), job_type="process", status="queued")
     db.add(job)
     design.status = "processing"
     await db.commit()
     await db.refresh(job)
 
-    # Process inline (no separate worker needed)
-    asyncio.create_task(process_job_inline(str(job.id)))
+    if queued:
+        # Picked up by the worker fleet (python -m app.worker.main)
+        await enqueue_job(str(job.id))
+    else:
+        # Process inline (no separate worker needed)
+        asyncio.create_task(process_job_inline(str(job.id)))
 
     return ProcessResponse(job_id=job.id, status=job.status)
@@ -1,49 +1,129 @@
+import asyncio
+import json
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.redis import cache_get, job_key
+from app.core.blobstore import resolve_image_url
+from app.core.config import settings
+from app.core.database import async_session, get_db
+from app.core.redis import cache_get, job_key, subscribe_job
 from app.models.job import Job
 from app.schemas.job import JobStatus, StyleVariation
 
 router = APIRouter()
 
+_TERMINAL = ("done", "failed")
+_KEEPALIVE_SECONDS = 15.0
 
-@router.get("/jobs/{job_id}", response_model=JobStatus)
-async def get_job_status(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
-    # Try cache first
-    cached = await cache_get(job_key(str(job_id)))
-    def _parse_variations(raw: list | None) -> list[StyleVariation] | None:
-        if not raw:
-            return None
-        return [StyleVariation(**v) for v in raw if v.get("image_url")]
 
-    if cached:
-        return JobStatus(
-            job_id=job_id,
-            status=cached["status"],
-            progress=cached.get("progress", 0),
-            error_code=cached.get("error_code"),
-            ai_image_url=cached.get("ai_image_url"),
-            style_variations=_parse_variations(cached.get("style_variations")),
-            keywords=cached.get("keywords"),
-            dominant_color=cached.get("dominant_color"),
-        )
+def _parse_variations(raw: list | None) -> list[StyleVariation] | None:
+    if not raw:
+        return None
+    return [
+        StyleVariation(style=v["style"], image_url=resolve_image_url(v["image_url"]))
+        for v in raw
+        if v.get("image_url")
+    ]
 
-    job = await db.get(Job, job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
 
+def _status_from_cache(job_id: uuid.UUID, cached: dict) -> JobStatus:
+    variations = _parse_variations(cached.get("style_variations"))
+    return JobStatus(
+        job_id=job_id,
+        status=cached["status"],
+        progress=cached.get("progress", 0),
+        error_code=cached.get("error_code"),
+        ai_image_url=resolve_image_url(cached.get("ai_image_url")),
+        style_variations=variations,
+        usable=bool(variations),
+        keywords=cached.get("keywords"),
+        dominant_color=cached.get("dominant_color"),
+    )
+
+
+def _status_from_job(job: Job) -> JobStatus:
     result = job.result or {}
+    variations = _parse_variations(result.get("style_variations"))
     return JobStatus(
         job_id=job.id,
         status=job.status,
         progress=job.progress,
         error_code=job.error_code,
-        ai_image_url=result.get("ai_image_url"),
-        style_variations=_parse_variations(result.get("style_variations")),
+        ai_image_url=resolve_image_url(result.get("ai_image_url")),
+        style_variations=variations,
+        usable=bool(variations),
         keywords=result.get("keywords"),
         dominant_color=result.get("dominant_color"),
     )
+
+
+async def _current_status(job_id: uuid.UUID, db: AsyncSession) -> JobStatus | None:
+    # Try cache first
+    cached = await cache_get(job_key(str(job_id)))
+    if cached:
+        return _status_from_cache(job_id, cached)
+    job = await db.get(Job, job_id)
+    return _status_from_job(job) if job else None
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job_status(job_id: uuid.UUID, db: AsyncSession = Depends(get_db)):
+    status = await _current_status(job_id, db)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+
+def _sse(status: JobStatus) -> str:
+    return f"event: status\ndata: {status.model_dump_json()}\n\n"
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_status(job_id: uuid.UUID, request: Request):
+    """Server-Sent Events stream of JobStatus updates, instead of polling.
+
+    Sends the current status first, then every update the processor
+    publishes (progress steps and each finished style variation), and
+    closes after the job is done or failed.
+    """
+    subscription = subscribe_job(str(job_id))
+    # Subscribe before reading the current state so no update falls in between
+    await subscription.start()
+    try:
+        async with async_session() as db:
+            initial = await _current_status(job_id, db)
+    except Exception:
+        await subscription.stop()
+        raise
+    if initial is None:
+        await subscription.stop()
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        try:
+            yield _sse(initial)
+            if initial.status in _TERMINAL:
+                return
+            deadline = asyncio.get_running_loop().time() + settings.JOB_TIMEOUT_SECONDS + 60
+            while asyncio.get_running_loop().time() < deadline:
+                message = await subscription.get(timeout=_KEEPALIVE_SECONDS)
+                if await request.is_disconnected():
+                    return
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                status = _status_from_cache(job_id, json.loads(message))
+                yield _sse(status)
+                if status.status in _TERMINAL:
+                    return
+        finally:
+            await subscription.stop()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,19 +1,186 @@
+import asyncio
+import logging
+import time
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.redis import acquire_lock, cache_get_many, cache_set, release_lock, search_key
 from app.models.design import Design
 from app.models.design_profile import DesignProfile
 from app.models.search_result import SearchResult
 from app.models.search_run import SearchRun
+from app.providers.base import BaseProvider
 from app.providers.registry import get_provider
-from app.schemas.search import SearchRequest, SearchResponse, SearchResultItem
+from app.schemas.search import ProviderRunInfo, SearchRequest, SearchResponse, SearchResultItem
 from app.services.ranking import rank_results
 
+logger = logging.getLogger("fmd.search")
+
 router = APIRouter()
 
 
+async def _fan_out(
+    providers: dict[str, BaseProvider],
+    *,
+    keywords: list[str],
+    dominant_color: str | None,
+    category: str | None,
+    limit: int,
+    provider_timeout: float,
+    total_timeout: float,
+) -> dict[str, tuple[str, list[dict]]]:
+    """Query all providers concurrently.
+
+    Each provider gets its own deadline (provider_timeout) and the whole
+    fan-out is bounded by total_timeout. Whatever finished in time is
+    returned; the rest is cancelled.
+
+    Returns provider_id -> (status, results) where status is one of
+    "done", "timeout" or "failed".
+    """
+
+    async def _one(provider: BaseProvider) -> list[dict]:
+        return await asyncio.wait_for(
+            provider.search(
+                keywords=keywords,
+                dominant_color=dominant_color,
+                category=category,
+                limit=limit,
+            ),
+            timeout=provider_timeout,
+        )
+
+    tasks = {pid: asyncio.create_task(_one(p)) for pid, p in providers.items()}
+    if not tasks:
+        return {}
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=total_timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    outcome: dict[str, tuple[str, list[dict]]] = {}
+    for pid, task in tasks.items():
+        if task in pending:
+            logger.warning("Provider %s exceeded the search budget", pid)
+            outcome[pid] = ("timeout", [])
+            continue
+        exc = task.exception()
+        if isinstance(exc, asyncio.TimeoutError):
+            logger.warning("Provider %s timed out", pid)
+            outcome[pid] = ("timeout", [])
+        elif exc is not None:
+            logger.warning("Provider %s failed: %s", pid, exc)
+            outcome[pid] = ("failed", [])
+        else:
+            outcome[pid] = ("done", task.result())
+    return outcome
+
+
+# Background stale-while-revalidate refreshes (kept referenced until done)
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def _raw_profile_hash(profile: DesignProfile) -> str:
+    # DesignProfile.profile_hash is design-scoped ("<design_id>:<hash>")
+    return profile.profile_hash.rsplit(":", 1)[-1]
+
+
+def _cache_ttl(provider_id: str) -> int:
+    return settings.SEARCH_CACHE_TTL_SECONDS.get(
+        provider_id, settings.SEARCH_CACHE_DEFAULT_TTL_SECONDS
+    )
+
+
+async def _store_results(provider_id: str, key: str, results: list[dict]) -> None:
+    # Empty lists usually mean the upstream API failed; don't pin them
+    if not results:
+        return
+    await cache_set(
+        key,
+        {"fetched_at": time.time(), "results": results},
+        ttl=_cache_ttl(provider_id) + settings.SEARCH_CACHE_STALE_SECONDS,
+    )
+
+
+async def _refresh(provider_id: str, provider: BaseProvider, key: str, search_kwargs: dict) -> None:
+    lock = f"{key}:refresh"
+    if not await acquire_lock(lock, ttl=int(settings.SEARCH_PROVIDER_TIMEOUT_SECONDS) + 1):
+        return  # another request is already refreshing this entry
+    try:
+        results = await asyncio.wait_for(
+            provider.search(**search_kwargs),
+            timeout=settings.SEARCH_PROVIDER_TIMEOUT_SECONDS,
+        )
+        await _store_results(provider_id, key, results)
+    except Exception as exc:
+        logger.warning("Background refresh of %s failed: %s", provider_id, exc)
+    finally:
+        await release_lock(lock)
+
+
+async def _cached_fan_out(
+    providers: dict[str, BaseProvider],
+    profile_hash: str,
+    *,
+    keywords: list[str],
+    dominant_color: str | None,
+    category: str | None,
+    limit: int,
+) -> dict[str, tuple[str, list[dict], str]]:
+    """Serve provider results from the search cache, fanning out on misses.
+
+    Entries are keyed by (profile_hash, provider, limit). Within the
+    provider's TTL an entry is a "hit"; for SEARCH_CACHE_STALE_SECONDS after
+    that it is served as "stale" while a background task refreshes it.
+    Anything older, or missing, is a "miss" and is fetched live.
+
+    Returns provider_id -> (status, results, cache_state).
+    """
+    search_kwargs = {
+        "keywords": keywords,
+        "dominant_color": dominant_color,
+        "category": category,
+        "limit": limit,
+    }
+    keys = {pid: search_key(profile_hash, pid, limit) for pid in providers}
+    entries = await cache_get_many(list(keys.values()))
+
+    outcome: dict[str, tuple[str, list[dict], str]] = {}
+    misses: dict[str, BaseProvider] = {}
+    now = time.time()
+    for (pid, provider), entry in zip(providers.items(), entries):
+        if entry is None:
+            misses[pid] = provider
+            continue
+        if now - entry["fetched_at"] <= _cache_ttl(pid):
+            outcome[pid] = ("cached", entry["results"], "hit")
+        else:
+            outcome[pid] = ("cached", entry["results"], "stale")
+            task = asyncio.create_task(_refresh(pid, provider, keys[pid], search_kwargs))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+
+    fresh = await _fan_out(
+        misses,
+        **search_kwargs,
+        provider_timeout=settings.SEARCH_PROVIDER_TIMEOUT_SECONDS,
+        total_timeout=settings.SEARCH_TOTAL_TIMEOUT_SECONDS,
+    )
+    for pid, (status, results) in fresh.items():
+        if status == "done":
+            await _store_results(pid, keys[pid], results)
+        outcome[pid] = (status, results, "miss")
+
+    # Preserve the requested provider order
+    return {pid: outcome[pid] for pid in providers}
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search(body: SearchRequest, db: AsyncSession = Depends(get_db)):
     design = await db.get(Design, body.design_id)
@@ -29,26 +196,40 @@ async def search(body: SearchRequest, db: AsyncSession = Depends(get_db)):
             detail="Design has not been processed yet. Call /designs/{id}/process first.",
         )
 
-    all_raw_results = []
+    providers: dict[str, BaseProvider] = {}
     for provider_id in body.providers:
         provider = get_provider(provider_id)
-        if not provider:
-            continue
-        raw = await provider.search(
-            keywords=profile.keywords,
-            dominant_color=profile.dominant_color,
-            category=design.category_hint,
-            limit=body.limit,
-        )
+        if provider:
+            providers[provider_id] = provider
 
+    outcome = await _cached_fan_out(
+        providers,
+        _raw_profile_hash(profile),
+        keywords=profile.keywords,
+        dominant_color=profile.dominant_color,
+        category=design.category_hint,
+        limit=body.limit,
+    )
+
+    all_raw_results = []
+    provider_runs = []
+    for provider_id, (status, raw, cache_state) in outcome.items():
         # Save search run
-        run = SearchRun(profile_id=profile.id, provider_id=provider_id, status="done")
+        run = SearchRun(profile_id=profile.id, provider_id=provider_id, status=status)
         db.add(run)
         await db.flush()
 
         for item in raw:
             item["search_run_id"] = run.id
         all_raw_results.extend(raw)
+        provider_runs.append(
+            ProviderRunInfo(
+                provider_id=provider_id,
+                status=status,
+                cache=cache_state,
+                result_count=len(raw),
+            )
+        )
 
     # Rank
     ranked = rank_results(
@@ -57,11 +238,12 @@ async def search(body: SearchRequest, db: AsyncSession = Depends(get_db)):
         negative_keywords=profile.negative_keywords,
         dominant_color=profile.dominant_color,
         embedding=profile.embedding,
+        top_k=body.limit,
     )
 
     # Save results
     result_items = []
-    for i, r in enumerate(ranked[: body.limit]):
+    for i, r in enumerate(ranked):
         sr = SearchResult(
             search_run_id=r["search_run_id"],
             title=r["title"],
@@ -90,4 +272,4 @@ async def search(body: SearchRequest, db: AsyncSession = Depends(get_db)):
         )
 
     await db.commit()
-    return SearchResponse(results=result_items)
+    return SearchResponse(results=result_items, providers=provider_runs)
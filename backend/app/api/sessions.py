@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.blobstore import resolve_image_url
 from app.core.database import get_db
 from app.models.design import Design
 from app.models.design_profile import DesignProfile
@@ -66,7 +67,9 @@ async def get_session_history(session_id: uuid.UUID, db: AsyncSession = Depends(
         top_results: list[HistoryResultItem] = []
 
         if profile:
-            ai_image_url = profile.profile.get("ai_image_url") if profile.profile else None
+            ai_image_url = (
+                resolve_image_url(profile.profile.get("ai_image_url")) if profile.profile else None
+            )
             keywords = profile.keywords or []
             dominant_color = profile.dominant_color
 
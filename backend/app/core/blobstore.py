@@ -0,0 +1,148 @@
+"""Content-addressed image blob store.
+
+Generated images arrive as data: URLs (megabytes of base64 for a 1024px
+PNG). Storing those in Job.result / DesignProfile.profile JSON and the job
+cache bloats rows, cache memory and every /jobs and /history response.
+Instead the bytes go into a blob store keyed by their SHA-256, and JSON only
+holds a short reference:
+
+    blob:<sha256>.<ext>
+
+resolve_image_url() turns a reference into a URL served by
+GET /api/blobs/{sha256}.{ext}. Identical images are stored once.
+
+LocalBlobStore shards files as <root>/ab/cd/<sha256>.<ext>; MemoryBlobStore
+is an in-process stand-in (tests, object-storage experiments). Plain http(s)
+URLs and legacy data: URLs pass through untouched.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger("fmd.blobstore")
+
+BLOB_SCHEME = "blob:"
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "gif": "image/gif",
+    "svg": "image/svg+xml",
+}
+_EXTENSIONS = {ct: ext for ext, ct in CONTENT_TYPES.items()} | {"image/jpg": "jpg"}
+
+REF_PATTERN = re.compile(r"^[0-9a-f]{64}\.(?:" + "|".join(CONTENT_TYPES) + r")$")
+_DATA_URL = re.compile(r"^data:(?P<ct>[\w.+/-]+);base64,(?P<data>.*)$", re.DOTALL)
+
+
+class BlobStore(ABC):
+    """Immutable blobs addressed by "<sha256>.<ext>" references."""
+
+    @abstractmethod
+    async def put(self, ref: str, data: bytes) -> None:
+        """Store data under ref; a no-op when the blob already exists."""
+
+    @abstractmethod
+    async def get(self, ref: str) -> bytes | None: ...
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str | Path) -> None:
+        self._root = Path(root)
+
+    def path(self, ref: str) -> Path:
+        return self._root / ref[:2] / ref[2:4] / ref
+
+    def _write(self, ref: str, data: bytes) -> None:
+        target = self.path(ref)
+        if target.exists():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _read(self, ref: str) -> bytes | None:
+        try:
+            return self.path(ref).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    async def put(self, ref: str, data: bytes) -> None:
+        await asyncio.to_thread(self._write, ref, data)
+
+    async def get(self, ref: str) -> bytes | None:
+        return await asyncio.to_thread(self._read, ref)
+
+
+class MemoryBlobStore(BlobStore):
+    def __init__(self) -> None:
+        self._blobs: dict[str, bytes] = {}
+
+    async def put(self, ref: str, data: bytes) -> None:
+        self._blobs.setdefault(ref, data)
+
+    async def get(self, ref: str) -> bytes | None:
+        return self._blobs.get(ref)
+
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = LocalBlobStore(settings.BLOB_STORE_DIR)
+    return _store
+
+
+def set_blob_store(store: BlobStore | None) -> None:
+    """Swap the active store (tests); None re-selects from settings."""
+    global _store
+    _store = store
+
+
+async def put_blob(data: bytes, content_type: str) -> str:
+    """Store bytes and return their "blob:<sha256>.<ext>" reference."""
+    ext = _EXTENSIONS.get(content_type.lower(), "png")
+    ref = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+    await get_blob_store().put(ref, data)
+    return BLOB_SCHEME + ref
+
+
+async def externalize_image_url(url: str | None) -> str | None:
+    """Move a base64 data: URL into the blob store; other URLs pass through."""
+    if not url or not url.startswith("data:"):
+        return url
+    match = _DATA_URL.match(url)
+    if not match or match["ct"].lower() not in _EXTENSIONS:
+        return url
+    try:
+        data = base64.b64decode(match["data"], validate=True)
+    except (binascii.Error, ValueError):
+        logger.warning("Undecodable data URL (%d chars) left inline", len(url))
+        return url
+    return await put_blob(data, match["ct"])
+
+
+def resolve_image_url(url: str | None) -> str | None:
+    """Turn a blob reference into its public URL; other URLs pass through."""
+    if not url or not url.startswith(BLOB_SCHEME):
+        return url
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}/api/blobs/{url[len(BLOB_SCHEME):]}"
@@ -0,0 +1,492 @@
+"""Pluggable cache / queue / lock backends for app.core.redis.
+
+MemoryBackend keeps everything in process (development, tests).
+RedisBackend talks to a real Redis server so API replicas and the separate
+worker process share jobs, cache entries and locks.
+
+Backends store raw strings; JSON encoding lives in app.core.redis.
+
+Queues support two consumption styles: dequeue() pops and forgets, while
+reserve()/ack() give at-least-once delivery. A reserved item is leased for
+`visibility` seconds; if it is not acked in time, reclaim_expired() puts it
+back on the queue, or on the "<queue>:dead" list once it has been delivered
+`max_attempts` times.
+
+Pub/sub is fire-and-forget: subscribe() returns a Subscription that only
+sees messages published after it was entered.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+logger = logging.getLogger("fmd.cache")
+
+
+class Subscription(ABC):
+    """One pub/sub channel subscription; use as an async context manager."""
+
+    async def __aenter__(self) -> "Subscription":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    @abstractmethod
+    async def start(self) -> None: ...
+
+    @abstractmethod
+    async def stop(self) -> None: ...
+
+    @abstractmethod
+    async def get(self, timeout: float) -> str | None:
+        """Next message, or None if nothing arrived within `timeout` seconds."""
+
+
+class CacheBackend(ABC):
+    """Interface shared by the in-memory and Redis implementations."""
+
+    # ── Queue ────────────────────────────────────────────────────────────
+    @abstractmethod
+    async def enqueue(self, queue: str, item: str) -> None: ...
+
+    @abstractmethod
+    async def dequeue(self, queue: str, timeout: float) -> str | None:
+        """Pop the oldest item, waiting up to `timeout` seconds."""
+
+    @abstractmethod
+    async def queue_length(self, queue: str) -> int: ...
+
+    @abstractmethod
+    async def reserve(
+        self, queue: str, timeout: float, visibility: int
+    ) -> tuple[str, int] | None:
+        """Lease the oldest item; returns (item, delivery attempt number)."""
+
+    @abstractmethod
+    async def ack(self, queue: str, item: str) -> None:
+        """Finish a reserved item so it is never redelivered."""
+
+    @abstractmethod
+    async def reclaim_expired(
+        self, queue: str, *, visibility: int, max_attempts: int
+    ) -> tuple[list[str], list[str]]:
+        """Requeue items whose lease expired; returns (requeued, dead_lettered)."""
+
+    # ── Cache ────────────────────────────────────────────────────────────
+    @abstractmethod
+    async def get(self, key: str) -> str | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: int) -> None: ...
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        """Fetch several keys in one round-trip; missing keys yield None."""
+
+    @abstractmethod
+    async def set_many(self, mapping: dict[str, str], ttl: int) -> None:
+        """Store several keys in one round-trip, all with the same TTL."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    # ── Pub/sub ──────────────────────────────────────────────────────────
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None: ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> Subscription: ...
+
+    # ── Locks ────────────────────────────────────────────────────────────
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl: int) -> bool: ...
+
+    @abstractmethod
+    async def release_lock(self, key: str) -> None: ...
+
+    def stats(self) -> dict:
+        """Backend counters for monitoring; empty when not tracked."""
+        return {}
+
+    async def close(self) -> None:
+        """Release connections. No-op for backends without any."""
+
+
+class _MemorySubscription(Subscription):
+    def __init__(self, subscribers: dict[str, set[asyncio.Queue[str]]], channel: str) -> None:
+        self._subscribers = subscribers
+        self._channel = channel
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+
+    async def start(self) -> None:
+        self._subscribers.setdefault(self._channel, set()).add(self._queue)
+
+    async def stop(self) -> None:
+        queues = self._subscribers.get(self._channel)
+        if queues is not None:
+            queues.discard(self._queue)
+            if not queues:
+                del self._subscribers[self._channel]
+
+    async def get(self, timeout: float) -> str | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class MemoryBackend(CacheBackend):
+    """Single-process backend built on asyncio.Queue and a bounded LRU dict.
+
+    The cache is capped by entry count and by size (key + value length;
+    values are ASCII JSON so this is their byte size). The least recently
+    used entries are evicted first, and a background task sweeps expired
+    entries and locks every `sweep_interval` seconds so keys that are never
+    read again do not accumulate.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+    ) -> None:
+        self._queues: dict[str, asyncio.Queue[str]] = {}
+        self._leases: dict[str, dict[str, float]] = {}  # queue -> item -> lease expiry
+        self._attempts: dict[str, dict[str, int]] = {}  # queue -> item -> deliveries
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()  # key -> (value, expire_ts)
+        self._locks: dict[str, float] = {}  # key -> expire_ts
+        self._subscribers: dict[str, set[asyncio.Queue[str]]] = {}
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._sweep_interval = sweep_interval
+        self._sweeper: asyncio.Task | None = None
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(key: str, value: str) -> int:
+        return len(key) + len(value)
+
+    def _remove(self, key: str) -> None:
+        value, _ = self._cache.pop(key)
+        self._bytes -= self._size(key, value)
+
+    def _evict_overflow(self) -> None:
+        while self._cache and (
+            len(self._cache) > self._max_entries or self._bytes > self._max_bytes
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
+
+    def sweep(self) -> int:
+        """Drop expired cache entries and locks; returns entries removed."""
+        now = time.time()
+        expired = [k for k, (_, expire_ts) in self._cache.items() if expire_ts < now]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        for key in [k for k, expire_ts in self._locks.items() if expire_ts < now]:
+            del self._locks[key]
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.debug("Swept %d expired cache entries", removed)
+
+    def _ensure_sweeper(self) -> None:
+        loop = asyncio.get_running_loop()
+        if (
+            self._sweeper is None
+            or self._sweeper.done()
+            or self._sweeper.get_loop() is not loop
+        ):
+            self._sweeper = loop.create_task(self._sweep_loop())
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._cache),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    async def close(self) -> None:
+        if self._sweeper is not None and not self._sweeper.done():
+            self._sweeper.cancel()
+        self._sweeper = None
+
+    def _queue(self, name: str) -> asyncio.Queue[str]:
+        q = self._queues.get(name)
+        if q is None:
+            q = self._queues[name] = asyncio.Queue()
+        return q
+
+    async def enqueue(self, queue: str, item: str) -> None:
+        await self._queue(queue).put(item)
+
+    async def dequeue(self, queue: str, timeout: float) -> str | None:
+        try:
+            return await asyncio.wait_for(self._queue(queue).get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def queue_length(self, queue: str) -> int:
+        return self._queue(queue).qsize()
+
+    async def reserve(
+        self, queue: str, timeout: float, visibility: int
+    ) -> tuple[str, int] | None:
+        item = await self.dequeue(queue, timeout)
+        if item is None:
+            return None
+        self._leases.setdefault(queue, {})[item] = time.time() + visibility
+        attempts = self._attempts.setdefault(queue, {})
+        attempts[item] = attempts.get(item, 0) + 1
+        return item, attempts[item]
+
+    async def ack(self, queue: str, item: str) -> None:
+        self._leases.get(queue, {}).pop(item, None)
+        self._attempts.get(queue, {}).pop(item, None)
+
+    async def reclaim_expired(
+        self, queue: str, *, visibility: int, max_attempts: int
+    ) -> tuple[list[str], list[str]]:
+        now = time.time()
+        leases = self._leases.get(queue, {})
+        attempts = self._attempts.get(queue, {})
+        requeued: list[str] = []
+        dead: list[str] = []
+        for item in [i for i, expiry in leases.items() if expiry <= now]:
+            del leases[item]
+            if attempts.get(item, 0) >= max_attempts:
+                attempts.pop(item, None)
+                await self.enqueue(f"{queue}:dead", item)
+                dead.append(item)
+            else:
+                await self.enqueue(queue, item)
+                requeued.append(item)
+        return requeued, dead
+
+    async def get(self, key: str) -> str | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expire_ts = entry
+        if time.time() > expire_ts:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._ensure_sweeper()
+        if key in self._cache:
+            self._remove(key)
+        size = self._size(key, value)
+        if size > self._max_bytes:
+            # Larger than the whole budget: storing it would flush everything
+            self.evictions += 1
+            return
+        self._cache[key] = (value, time.time() + ttl)
+        self._bytes += size
+        self._evict_overflow()
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        return [await self.get(k) for k in keys]
+
+    async def set_many(self, mapping: dict[str, str], ttl: int) -> None:
+        for key, value in mapping.items():
+            await self.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            if key in self._cache:
+                self._remove(key)
+
+    async def publish(self, channel: str, message: str) -> None:
+        for queue in self._subscribers.get(channel, ()):
+            queue.put_nowait(message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        return _MemorySubscription(self._subscribers, channel)
+
+    async def acquire_lock(self, key: str, ttl: int) -> bool:
+        now = time.time()
+        existing = self._locks.get(key)
+        if existing and existing > now:
+            return False
+        self._locks[key] = now + ttl
+        return True
+
+    async def release_lock(self, key: str) -> None:
+        self._locks.pop(key, None)
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, client, channel: str) -> None:
+        self._pubsub = client.pubsub()
+        self._channel = channel
+
+    async def start(self) -> None:
+        await self._pubsub.subscribe(self._channel)
+
+    async def stop(self) -> None:
+        await self._pubsub.unsubscribe(self._channel)
+        await self._pubsub.aclose()
+
+    async def get(self, timeout: float) -> str | None:
+        # get_message returns None for (ignored) subscribe confirmations too,
+        # so keep reading until a real message or the deadline
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self._pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is not None and message["type"] == "message":
+                return message["data"]
+
+
+class RedisBackend(CacheBackend):
+    """Redis implementation using a pooled redis.asyncio client.
+
+    Queues are Redis lists (LPUSH / BRPOP), cache entries are plain string
+    keys with EX, locks are SET NX EX. Multi-key operations use MGET and a
+    non-transactional pipeline so they cost one round-trip.
+    """
+
+    def __init__(self, url: str = "", *, max_connections: int = 50, client=None) -> None:
+        if client is None:
+            import redis.asyncio as aioredis
+
+            pool = aioredis.ConnectionPool.from_url(
+                url, max_connections=max_connections, decode_responses=True
+            )
+            client = aioredis.Redis(connection_pool=pool)
+        self._redis = client
+
+    async def enqueue(self, queue: str, item: str) -> None:
+        await self._redis.lpush(queue, item)
+
+    async def dequeue(self, queue: str, timeout: float) -> str | None:
+        popped = await self._redis.brpop([queue], timeout=timeout)
+        if popped is None:
+            return None
+        _, item = popped
+        return item
+
+    async def queue_length(self, queue: str) -> int:
+        return await self._redis.llen(queue)
+
+    # Reserved items move atomically (BLMOVE) from the queue list to
+    # "<queue>:processing"; their lease expiry lives in the "<queue>:inflight"
+    # sorted set and their delivery count in the "<queue>:attempts" hash.
+
+    async def reserve(
+        self, queue: str, timeout: float, visibility: int
+    ) -> tuple[str, int] | None:
+        item = await self._redis.blmove(queue, f"{queue}:processing", timeout, "RIGHT", "LEFT")
+        if item is None:
+            return None
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(f"{queue}:inflight", {item: time.time() + visibility})
+            pipe.hincrby(f"{queue}:attempts", item, 1)
+            _, attempts = await pipe.execute()
+        return item, int(attempts)
+
+    async def ack(self, queue: str, item: str) -> None:
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(f"{queue}:processing", 1, item)
+            pipe.zrem(f"{queue}:inflight", item)
+            pipe.hdel(f"{queue}:attempts", item)
+            await pipe.execute()
+
+    async def reclaim_expired(
+        self, queue: str, *, visibility: int, max_attempts: int
+    ) -> tuple[list[str], list[str]]:
+        processing, inflight = f"{queue}:processing", f"{queue}:inflight"
+        now = time.time()
+
+        # A consumer that died between BLMOVE and ZADD leaves an item with no
+        # lease; give it one so it is reclaimed after a full visibility window
+        held = await self._redis.lrange(processing, 0, -1)
+        if held:
+            scores = await self._redis.zmscore(inflight, held)
+            orphans = {item: now + visibility for item, score in zip(held, scores) if score is None}
+            if orphans:
+                await self._redis.zadd(inflight, orphans, nx=True)
+
+        requeued: list[str] = []
+        dead: list[str] = []
+        for item in await self._redis.zrangebyscore(inflight, "-inf", now):
+            # ZREM is the claim: only one reclaiming worker gets 1 back
+            if not await self._redis.zrem(inflight, item):
+                continue
+            attempts = int(await self._redis.hget(f"{queue}:attempts", item) or 0)
+            target = f"{queue}:dead" if attempts >= max_attempts else queue
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.lrem(processing, 1, item)
+                pipe.lpush(target, item)
+                if target != queue:
+                    pipe.hdel(f"{queue}:attempts", item)
+                await pipe.execute()
+            (dead if target != queue else requeued).append(item)
+        return requeued, dead
+
+    async def get(self, key: str) -> str | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._redis.set(key, value, ex=ttl)
+
+    async def get_many(self, keys: list[str]) -> list[str | None]:
+        if not keys:
+            return []
+        return await self._redis.mget(keys)
+
+    async def set_many(self, mapping: dict[str, str], ttl: int) -> None:
+        if not mapping:
+            return
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def publish(self, channel: str, message: str) -> None:
+        await self._redis.publish(channel, message)
+
+    def subscribe(self, channel: str) -> Subscription:
+        return _RedisSubscription(self._redis, channel)
+
+    async def acquire_lock(self, key: str, ttl: int) -> bool:
+        return bool(await self._redis.set(key, "1", nx=True, ex=ttl))
+
+    async def release_lock(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
@@ -6,13 +7,85 @@ _BASE_DIR = Path(__file__).resolve().parent.parent.parent
 _DB_PATH = _BASE_DIR / "fmd.db"
 
 
+def _default_data_dir() -> Path:
+    """Where generated files go by default: FMD_DATA_DIR, else the XDG data dir.
+
+    Kept outside the source tree so dev and test runs leave nothing in the repo.
+    """
+    if os.getenv("FMD_DATA_DIR"):
+        return Path(os.environ["FMD_DATA_DIR"])
+    xdg = os.getenv("XDG_DATA_HOME")
+    return (Path(xdg) if xdg else Path.home() / ".local" / "share") / "fmd"
+
+
+_DATA_DIR = _default_data_dir()
+
+
 class Settings(BaseSettings):
     DATABASE_URL: str = f"sqlite+aiosqlite:///{_DB_PATH}"
     REDIS_URL: str = ""  # empty = use in-memory queue
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    # In-memory backend bounds (used when REDIS_URL is empty)
+    MEMORY_CACHE_MAX_ENTRIES: int = 10_000
+    MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    MEMORY_CACHE_SWEEP_SECONDS: float = 60.0
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002", "http://localhost:3003", "http://localhost:3004"]
     ENV: str = "dev"
+    # "inline": POST /designs/{id}/process runs the pipeline inside the API
+    # process. "queue": it only enqueues; app.worker consumes the queue. Queue
+    # mode requires REDIS_URL; without it jobs run inline (with a startup warning).
+    JOB_EXECUTION_MODE: str = "inline"
+    QUEUE_VISIBILITY_TIMEOUT_SECONDS: int = 360  # lease per delivery; keep > JOB_TIMEOUT_SECONDS
+    QUEUE_MAX_ATTEMPTS: int = 3  # deliveries before a job is dead-lettered
+    QUEUE_REAP_INTERVAL_SECONDS: float = 30.0
+    QUEUE_MAX_DEPTH: int = 0  # queue mode: reject new jobs with 503 above this; 0 = unlimited
     WORKER_CONCURRENCY: int = 2
     JOB_TIMEOUT_SECONDS: int = 300
+    WORKER_QUEUE_WARN_DEPTH: int = 100  # log a backlog warning above this many queued jobs
+    WORKER_PROCESSES: int = 0  # worker supervisor children; 0 = one per CPU core
+    CPU_POOL_WORKERS: int | None = None  # app.core.executor; None = CPU count, 0 = threads
+    PROFILE_MEMO_SIZE: int = 2048  # memoised generate_profile results per process; 0 disables
+
+    # Provider fan-out in POST /api/search
+    SEARCH_PROVIDER_TIMEOUT_SECONDS: float = 8.0  # per-provider deadline
+    SEARCH_TOTAL_TIMEOUT_SECONDS: float = 10.0  # overall request budget
+
+    # Search result cache, keyed by (profile_hash, provider, limit)
+    SEARCH_CACHE_TTL_SECONDS: dict[str, int] = {"mock": 86400, "api": 3600, "search": 1800}
+    SEARCH_CACHE_DEFAULT_TTL_SECONDS: int = 900
+    SEARCH_CACHE_STALE_SECONDS: int = 600  # served stale while refreshing
+
+    # Shared outbound HTTP client pool (app.core.http)
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 10
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = True  # used only when the `h2` package is installed
+
+    # Generated images (app.core.blobstore), served at /api/blobs/{ref}
+    BLOB_STORE_DIR: str = str(_DATA_DIR / "blobs")
+    PUBLIC_BASE_URL: str = "http://localhost:8000"  # prefix for blob URLs in API responses
+
+    # Image backend chain hedging (app.services.image_generator._hedged): start the
+    # next backend when the newest one is slower than FACTOR x its observed latency,
+    # or than DELAY before it has one (above typical ComfyUI/HuggingFace run times)
+    IMAGE_HEDGE_DELAY_SECONDS: float = 45.0
+    IMAGE_HEDGE_LATENCY_FACTOR: float = 2.0
+    IMAGE_HEDGE_MIN_DELAY_SECONDS: float = 5.0
+    IMAGE_HEDGE_MAX_RUNNING: int = 2  # backends in flight at once per image
+
+    # Image backend health (app.services.backend_health)
+    BACKEND_FAILURE_THRESHOLD: int = 3  # consecutive failures before the breaker opens
+    BACKEND_OPEN_SECONDS: float = 60.0  # skip an open backend this long, then try once
+    BACKEND_PROBE_TTL_SECONDS: float = 30.0  # reuse availability probes (ComfyUI) this long
+    BACKEND_EWMA_ALPHA: float = 0.3
+
+    # Durable generated-image cache (app.services.generation_cache); "" disables it
+    GENERATION_CACHE_DIR: str = str(_DATA_DIR / "generation_cache")
+    GENERATION_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
 
     STABILITY_API_KEY: str = ""
     UNSPLASH_ACCESS_KEY: str = ""
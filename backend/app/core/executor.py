@@ -0,0 +1,55 @@
+"""Off-loop execution for CPU-bound work.
+
+Pillow decoding and pixel quantisation in profile generation can take
+hundreds of milliseconds on a large canvas; run on the event loop they
+stall every other request or job. run_cpu_bound() ships such calls to a
+process pool (spawned once, lazily) so they run on other cores.
+
+CPU_POOL_WORKERS selects the pool size: None = os.cpu_count(), 0 = use the
+loop's default thread pool instead (no extra processes; the supervisor
+sets this for its children, which already occupy one core each).
+Functions and arguments must be picklable (module-level functions).
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger("fmd.executor")
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor | None:
+    global _pool
+    if settings.CPU_POOL_WORKERS == 0:
+        return None
+    if _pool is None:
+        workers = settings.CPU_POOL_WORKERS or os.cpu_count() or 1
+        # spawn: forking a process that runs an event loop and open sockets is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info("CPU process pool started (%d workers)", workers)
+    return _pool
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run fn(*args, **kwargs) off the event loop and return its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_cpu_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
@@ -0,0 +1,139 @@
+"""Shared outbound HTTP client.
+
+Providers and image generators used to open a fresh httpx.AsyncClient per
+call, paying a TCP+TLS handshake every time. Instead one pooled client per
+process is created in the FastAPI lifespan (and in the worker), and every
+outbound call goes through get_http_client().
+
+  - keep-alive connections are reused across requests
+  - HTTP/2 is negotiated when the optional `h2` package is installed
+  - concurrent connections are capped globally and per host
+  - timeouts default to Settings; callers may still pass a per-request
+    timeout for slow backends (image generation)
+"""
+import asyncio
+import importlib.util
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger("fmd.http")
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """Wraps a transport and caps in-flight requests per host.
+
+    httpx only limits the pool as a whole, so one slow backend could
+    otherwise take every connection. A slot is held until the response body
+    has been read and closed, not just until the headers arrive.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int) -> None:
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slots.get(request.url.host)
+        if slot is None:
+            slot = self._slots[request.url.host] = asyncio.Semaphore(self._max_per_host)
+
+        await slot.acquire()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                slot.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+    transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_available())
+    return httpx.AsyncClient(
+        transport=_PerHostLimitTransport(transport, settings.HTTP_MAX_CONNECTIONS_PER_HOST),
+        timeout=httpx.Timeout(
+            settings.HTTP_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client, creating it on first use.
+
+    A client is bound to the event loop it was created on, so a new one is
+    built when called from a different loop (e.g. per-test loops).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+
+async def init_http_client() -> None:
+    get_http_client()
+    logger.info(
+        "HTTP client pool ready (http2=%s, max_connections=%d, per_host=%d)",
+        _http2_available(),
+        settings.HTTP_MAX_CONNECTIONS,
+        settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+    )
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -1,21 +1,45 @@
 """Redis client with in-memory fallback.
 
-When REDIS_URL is empty, uses a simple asyncio.Queue + dict for development
-so the app runs without a Redis server.
+When REDIS_URL is empty, uses an in-process backend (asyncio.Queue + dict)
+for development so the app runs without a Redis server. When it is set,
+every API replica and worker process shares the same Redis queue, cache
+and locks. Keys follow the fmd:{env}:* scheme in docs/03_data_redis.md.
 """
-import asyncio
 import json
-import time
 
+from app.core.cache_backend import CacheBackend, MemoryBackend, RedisBackend, Subscription
 from app.core.config import settings
 
-# ---------------------------------------------------------------------------
-# In-memory fallback (no Redis required)
-# ---------------------------------------------------------------------------
+_backend: CacheBackend | None = None
 
-_mem_queue: asyncio.Queue[str] = asyncio.Queue()
-_mem_cache: dict[str, tuple[str, float]] = {}  # key -> (value_json, expire_ts)
-_mem_locks: dict[str, float] = {}  # key -> expire_ts
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        if settings.REDIS_URL:
+            _backend = RedisBackend(
+                settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS
+            )
+        else:
+            _backend = MemoryBackend(
+                max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+                max_bytes=settings.MEMORY_CACHE_MAX_BYTES,
+                sweep_interval=settings.MEMORY_CACHE_SWEEP_SECONDS,
+            )
+    return _backend
+
+
+def set_backend(backend: CacheBackend | None) -> None:
+    """Swap the active backend (tests); None re-selects from settings."""
+    global _backend
+    _backend = backend
+
+
+async def close_backend() -> None:
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+    _backend = None
 
 
 def _key(pattern: str) -> str:
@@ -24,18 +48,24 @@ def _key(pattern: str) -> str:
 
 # Queue
 QUEUE_KEY = _key("fmd:{env}:queue:process")
+DEAD_LETTER_KEY = f"{QUEUE_KEY}:dead"
 
 
 def job_key(job_id: str) -> str:
     return _key(f"fmd:{{env}}:job:{job_id}")
 
 
+def job_channel(job_id: str) -> str:
+    return _key(f"fmd:{{env}}:events:job:{job_id}")
+
+
 def profile_key(profile_hash: str) -> str:
     return _key(f"fmd:{{env}}:profile:{profile_hash}")
 
 
-def search_key(profile_hash: str, provider: str) -> str:
-    return _key(f"fmd:{{env}}:search:{profile_hash}:{provider}")
+def search_key(profile_hash: str, provider: str, limit: int | None = None) -> str:
+    key = _key(f"fmd:{{env}}:search:{profile_hash}:{provider}")
+    return key if limit is None else f"{key}:{limit}"
 
 
 def lock_key(design_id: str) -> str:
@@ -43,41 +73,80 @@ def lock_key(design_id: str) -> str:
 
 
 async def enqueue_job(job_id: str) -> None:
-    await _mem_queue.put(job_id)
+    await get_backend().enqueue(QUEUE_KEY, job_id)
 
 
 async def dequeue_job(timeout: int = 0) -> str | None:
-    try:
-        if timeout <= 0:
-            return await asyncio.wait_for(_mem_queue.get(), timeout=5)
-        return await asyncio.wait_for(_mem_queue.get(), timeout=timeout)
-    except asyncio.TimeoutError:
-        return None
+    return await get_backend().dequeue(QUEUE_KEY, timeout if timeout > 0 else 5)
+
+
+async def queue_depth() -> int:
+    return await get_backend().queue_length(QUEUE_KEY)
+
+
+async def reserve_job(timeout: int = 0) -> tuple[str, int] | None:
+    """Lease the next job for QUEUE_VISIBILITY_TIMEOUT_SECONDS; (job_id, attempt)."""
+    return await get_backend().reserve(
+        QUEUE_KEY, timeout if timeout > 0 else 5, settings.QUEUE_VISIBILITY_TIMEOUT_SECONDS
+    )
+
+
+async def ack_job(job_id: str) -> None:
+    await get_backend().ack(QUEUE_KEY, job_id)
+
+
+async def reclaim_expired_jobs() -> tuple[list[str], list[str]]:
+    """Requeue jobs whose worker vanished; returns (requeued, dead_lettered)."""
+    return await get_backend().reclaim_expired(
+        QUEUE_KEY,
+        visibility=settings.QUEUE_VISIBILITY_TIMEOUT_SECONDS,
+        max_attempts=settings.QUEUE_MAX_ATTEMPTS,
+    )
 
 
 async def cache_set(key: str, value: dict, ttl: int = 3600) -> None:
-    _mem_cache[key] = (json.dumps(value), time.time() + ttl)
+    await get_backend().set(key, json.dumps(value), ttl)
 
 
 async def cache_get(key: str) -> dict | None:
-    entry = _mem_cache.get(key)
-    if entry is None:
-        return None
-    value_json, expire_ts = entry
-    if time.time() > expire_ts:
-        del _mem_cache[key]
+    raw = await get_backend().get(key)
+    if raw is None:
         return None
-    return json.loads(value_json)
+    return json.loads(raw)
+
+
+async def cache_set_many(values: dict[str, dict], ttl: int = 3600) -> None:
+    await get_backend().set_many({k: json.dumps(v) for k, v in values.items()}, ttl)
+
+
+async def cache_get_many(keys: list[str]) -> list[dict | None]:
+    raws = await get_backend().get_many(keys)
+    return [json.loads(raw) if raw is not None else None for raw in raws]
+
+
+async def cache_delete(*keys: str) -> None:
+    await get_backend().delete(*keys)
+
+
+async def publish_job_status(job_id: str, status: dict, ttl: int = 3600) -> None:
+    """Cache a job's latest status and push it to live subscribers."""
+    payload = json.dumps(status)
+    backend = get_backend()
+    await backend.set(job_key(job_id), payload, ttl)
+    await backend.publish(job_channel(job_id), payload)
+
+
+def subscribe_job(job_id: str) -> Subscription:
+    return get_backend().subscribe(job_channel(job_id))
+
+
+def cache_stats() -> dict:
+    return get_backend().stats()
 
 
 async def acquire_lock(key: str, ttl: int = 300) -> bool:
-    now = time.time()
-    existing = _mem_locks.get(key)
-    if existing and existing > now:
-        return False
-    _mem_locks[key] = now + ttl
-    return True
+    return await get_backend().acquire_lock(key, ttl)
 
 
 async def release_lock(key: str) -> None:
-    _mem_locks.pop(key, None)
+    await get_backend().release_lock(key)
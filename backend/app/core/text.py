@@ -0,0 +1,69 @@
+"""Shared text tokenization for the whole pipeline.
+
+Profile keywords, query embeddings, provider tag extraction and candidate
+ranking all split text into words. They used to each call re.findall with
+inline string patterns. This module holds the precompiled patterns and one
+tokenizer:
+
+- a token is a maximal run of ASCII letters or of Hangul syllables (mixed
+  runs such as "logo디자인" yield "logo" and "디자인");
+- tokens are lowercased; with intern=True they are also interned
+  (sys.intern). Interning is for long-lived, repeating inputs (query
+  keywords, profile keywords); it costs about 1 us per candidate, so
+  candidate titles and tags on the ranking hot path are not interned.
+
+There is no memo either: candidate titles and descriptions are mostly
+unique, so a cache would only add insertion cost and churn.
+
+benchmarks/bench_tokenize.py measures the per-candidate cost.
+"""
+import re
+import sys
+
+EN_WORD = re.compile(r"[a-zA-Z]+")
+KO_WORD = re.compile(r"[가-힣]+")
+WORD = re.compile(r"[a-zA-Z]+|[가-힣]+")
+HTML_TAG = re.compile(r"<[^>]+>")
+
+_EN_START = re.compile(r"[a-zA-Z]")
+_KO_START = re.compile(r"[가-힣]")
+
+_intern = sys.intern
+
+
+def tokenize(
+    text: str | None, *, min_len: int = 2, hangul: bool = False, intern: bool = False
+) -> list[str]:
+    """Lowercase word tokens of at least `min_len` characters.
+
+    English-only by default; `hangul=True` also yields Hangul runs.
+    """
+    if not text:
+        return []
+    pattern = WORD if hangul else EN_WORD
+    if intern:
+        return [_intern(t) for t in pattern.findall(text.lower()) if len(t) >= min_len]
+    return [t for t in pattern.findall(text.lower()) if len(t) >= min_len]
+
+
+def is_english(token: str) -> bool:
+    """Whether the token starts with an ASCII letter."""
+    return _EN_START.match(token) is not None
+
+
+def is_korean(token: str) -> bool:
+    """Whether the token starts with a Hangul syllable."""
+    return _KO_START.match(token) is not None
+
+
+def en_words(text: str) -> list[str]:
+    """ASCII letter runs, case preserved (for prompts sent to image backends)."""
+    return EN_WORD.findall(text)
+
+
+def ko_words(text: str) -> list[str]:
+    return KO_WORD.findall(text)
+
+
+def strip_tags(html: str) -> str:
+    return HTML_TAG.sub("", html)
@@ -0,0 +1,57 @@
+"""Korean → English translation map for common design/general terms.
+
+Used through app.services.translation, which compiles the keys into a
+matching automaton; add new terms here.
+"""
+
+KO_EN_MAP: dict[str, str] = {
+    # Animals
+    "고양이": "cat", "강아지": "dog", "개": "dog", "새": "bird", "나비": "butterfly",
+    "물고기": "fish", "토끼": "rabbit", "곰": "bear", "사자": "lion", "호랑이": "tiger",
+    "말": "horse", "용": "dragon", "여우": "fox", "늑대": "wolf", "펭귄": "penguin",
+    # Nature
+    "꽃": "flower", "나무": "tree", "숲": "forest", "산": "mountain", "바다": "ocean",
+    "하늘": "sky", "별": "star", "달": "moon", "해": "sun", "구름": "cloud",
+    "비": "rain", "눈": "snow", "강": "river", "호수": "lake", "잎": "leaf",
+    # Design terms
+    "로고": "logo", "아이콘": "icon", "배너": "banner", "포스터": "poster",
+    "카드": "card", "버튼": "button", "배경": "background", "패턴": "pattern",
+    "일러스트": "illustration", "캐릭터": "character", "그래픽": "graphic",
+    "타이포": "typography", "레이아웃": "layout", "웹": "web", "앱": "app",
+    "모바일": "mobile", "대시보드": "dashboard", "디자인": "design",
+    "미니멀": "minimal", "모던": "modern", "빈티지": "vintage", "레트로": "retro",
+    "플랫": "flat", "심플": "simple", "귀여운": "cute", "귀엽다": "cute",
+    "깔끔한": "clean", "세련된": "elegant", "고급": "premium", "럭셔리": "luxury",
+    # Objects
+    "집": "house", "건물": "building", "차": "car", "자동차": "car",
+    "음식": "food", "커피": "coffee", "책": "book", "음악": "music",
+    "카메라": "camera", "전화": "phone", "컴퓨터": "computer", "게임": "game",
+    "하트": "heart", "사랑": "love", "사람": "person", "얼굴": "face",
+    "악기": "instrument", "기타": "guitar", "피아노": "piano", "드럼": "drum",
+    "바이올린": "violin", "트럼펫": "trumpet", "플루트": "flute",
+    "시계": "clock", "꽃병": "vase", "의자": "chair", "테이블": "table",
+    "가방": "bag", "신발": "shoes", "옷": "clothing", "모자": "hat",
+    "태양": "sun", "화살표": "arrow", "체크": "check", "별표": "asterisk",
+    "스포츠": "sports", "축구": "soccer", "농구": "basketball", "야구": "baseball",
+    "여행": "travel", "지도": "map", "비행기": "airplane", "기차": "train",
+    "의료": "medical", "건강": "health", "교육": "education", "학교": "school",
+    # Colors (adjective form — for use in image prompts)
+    "빨간": "red", "빨강": "red", "빨간색": "red",
+    "파란": "blue", "파랑": "blue", "파란색": "blue",
+    "초록": "green", "녹색": "green", "초록색": "green",
+    "노란": "yellow", "노랑": "yellow", "노란색": "yellow",
+    "보라": "purple", "보라색": "purple",
+    "검정": "black", "검은": "black", "검은색": "black", "검정색": "black",
+    "흰": "white", "하얀": "white", "흰색": "white", "하얀색": "white",
+    "분홍": "pink", "분홍색": "pink",
+    "주황": "orange", "주황색": "orange",
+    "갈색": "brown",
+    "회색": "gray", "회색빛": "gray",
+    # Style/mood
+    "따뜻한": "warm", "차가운": "cool", "밝은": "bright", "어두운": "dark",
+    "부드러운": "soft", "강한": "bold", "재미있는": "fun", "전문적": "professional",
+    "자연": "nature", "추상": "abstract", "기하학": "geometric",
+    # Categories
+    "사진": "photo", "그림": "painting", "스케치": "sketch", "만화": "cartoon",
+    "애니": "anime", "수채화": "watercolor", "벡터": "vector", "입체": "3d",
+}
@@ -4,12 +4,18 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.designs import queue_mode
 from app.api.router import api_router
 from app.core.config import settings
 from app.core.database import engine, Base, async_session
+from app.core.executor import shutdown_cpu_pool
+from app.core.http import close_http_client, init_http_client
+from app.core.redis import close_backend
+from app.services.backend_health import get_health_registry
 from app.models import *  # noqa: F401,F403 — ensure all models registered
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("fmd.api")
 
 
 @asynccontextmanager
@@ -32,8 +38,21 @@ async def lifespan(app: FastAPI):
                 db.add(Provider(id=pid, name=pname, base_url="", enabled=True))
         await db.commit()
 
+    if settings.JOB_EXECUTION_MODE == "queue" and not queue_mode():
+        logger.warning(
+            "JOB_EXECUTION_MODE=queue but REDIS_URL is empty: workers cannot see the "
+            "in-memory queue, so jobs will run inline in the API process"
+        )
+
+    # Pooled outbound HTTP client shared by providers and image generators
+    await init_http_client()
+
     yield
 
+    await close_http_client()
+    await close_backend()
+    shutdown_cpu_pool()
+
 
 app = FastAPI(title="FMD API", version="0.1.0", lifespan=lifespan)
 
@@ -49,4 +68,4 @@ app.include_router(api_router)
 
 @app.get("/health")
 def health():
-    return {"status": "ok"}
+    return {"status": "ok", "image_backends": get_health_registry().snapshot()}
@@ -2,6 +2,7 @@ from app.models.session import Session
 from app.models.design import Design
 from app.models.job import Job
 from app.models.design_profile import DesignProfile
+from app.models.profile_artifact import ProfileArtifact
 from app.models.provider import Provider
 from app.models.search_run import SearchRun
 from app.models.search_result import SearchResult
@@ -11,6 +12,7 @@ __all__ = [
     "Design",
     "Job",
     "DesignProfile",
+    "ProfileArtifact",
     "Provider",
     "SearchRun",
     "SearchResult",
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import String, Text, Integer, DateTime, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.core.types import JSONType, StringArray
+
+
+class ProfileArtifact(Base):
+    """Content-addressed results of the processing pipeline.
+
+    Keyed by the raw profile_hash (sorted keywords + dominant color), so any
+    design that resolves to the same profile reuses the embedding and the
+    generated style variations instead of recomputing them. Canvas designs
+    append their canvas hash ("<profile_hash>:<sha256[:32]>"), since their
+    drawing conditions the generated images.
+    """
+
+    __tablename__ = "profile_artifacts"
+
+    profile_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    keywords: Mapped[list] = mapped_column(StringArray(), default=list)
+    negative_keywords: Mapped[list] = mapped_column(StringArray(), default=list)
+    dominant_color: Mapped[str | None] = mapped_column(String(7))
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary)
+    ai_image_url: Mapped[str | None] = mapped_column(Text)
+    ai_image_method: Mapped[str | None] = mapped_column(String(50))
+    style_variations: Mapped[list] = mapped_column(JSONType(), default=list)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
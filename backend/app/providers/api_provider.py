@@ -11,17 +11,14 @@ marketplace search pages so the demo remains functional.
 """
 import logging
 import os
-import re
 from urllib.parse import quote_plus
 
-import httpx
-
+from app.core.http import get_http_client
+from app.core.text import is_english
 from app.providers.base import BaseProvider
 
 logger = logging.getLogger("fmd.api_provider")
 
-_TIMEOUT = 10.0
-
 
 class ApiProvider(BaseProvider):
     """Searches public image APIs for design-related results."""
@@ -41,7 +38,7 @@ class ApiProvider(BaseProvider):
         limit: int = 20,
     ) -> list[dict]:
         # Use only English keywords for API/marketplace searches
-        en_keywords = [k for k in keywords if re.match(r"[a-zA-Z]", k)]
+        en_keywords = [k for k in keywords if is_english(k)]
         query = " ".join(en_keywords[:5]) if en_keywords else "design"
         if category:
             query = f"{category} {query}"
@@ -115,17 +112,17 @@ class ApiProvider(BaseProvider):
     # ------------------------------------------------------------------
     async def _search_openverse(self, query: str, limit: int) -> list[dict]:
         """Search Openverse for CC-licensed images (no API key required)."""
-        async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-            resp = await client.get(
-                "https://api.openverse.org/v1/images/",
-                params={
-                    "q": query,
-                    "page_size": min(limit, 20),
-                    "license_type": "commercial,modification",
-                },
-                headers={"User-Agent": "FMD-Portfolio/1.0 (design-search-demo)"},
-            )
-            resp.raise_for_status()
+        client = get_http_client()
+        resp = await client.get(
+            "https://api.openverse.org/v1/images/",
+            params={
+                "q": query,
+                "page_size": min(limit, 20),
+                "license_type": "commercial,modification",
+            },
+            headers={"User-Agent": "FMD-Portfolio/1.0 (design-search-demo)"},
+        )
+        resp.raise_for_status()
 
         data = resp.json()
         results = []
@@ -164,13 +161,13 @@ class ApiProvider(BaseProvider):
         if color:
             params["color"] = self._hex_to_unsplash_color(color)
 
-        async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-            resp = await client.get(
-                "https://api.unsplash.com/search/photos",
-                params=params,
-                headers={"Authorization": f"Client-ID {self._unsplash_key}"},
-            )
-            resp.raise_for_status()
+        client = get_http_client()
+        resp = await client.get(
+            "https://api.unsplash.com/search/photos",
+            params=params,
+            headers={"Authorization": f"Client-ID {self._unsplash_key}"},
+        )
+        resp.raise_for_status()
 
         data = resp.json()
         results = []
@@ -199,13 +196,13 @@ class ApiProvider(BaseProvider):
         if color:
             params["color"] = color.lstrip("#")
 
-        async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-            resp = await client.get(
-                "https://api.pexels.com/v1/search",
-                params=params,
-                headers={"Authorization": self._pexels_key},
-            )
-            resp.raise_for_status()
+        client = get_http_client()
+        resp = await client.get(
+            "https://api.pexels.com/v1/search",
+            params=params,
+            headers={"Authorization": self._pexels_key},
+        )
+        resp.raise_for_status()
 
         data = resp.json()
         results = []
@@ -240,12 +237,12 @@ class ApiProvider(BaseProvider):
         if color:
             params["colors"] = self._hex_to_pixabay_color(color)
 
-        async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-            resp = await client.get(
-                "https://pixabay.com/api/",
-                params=params,
-            )
-            resp.raise_for_status()
+        client = get_http_client()
+        resp = await client.get(
+            "https://pixabay.com/api/",
+            params=params,
+        )
+        resp.raise_for_status()
 
         data = resp.json()
         results = []
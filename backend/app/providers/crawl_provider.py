@@ -9,12 +9,12 @@ Do NOT use this provider in production. It is kept only as a reference.
 """
 import logging
 import random
-import re
 from urllib.parse import quote_plus
 
 import httpx
 from bs4 import BeautifulSoup
 
+from app.core.text import tokenize
 from app.providers.base import BaseProvider
 
 logger = logging.getLogger("fmd.crawl_provider")
@@ -179,8 +179,8 @@ class CrawlProvider(BaseProvider):
 
     def _extract_tags(self, text: str, query: str) -> list[str]:
         """Extract tags from result text + query."""
-        words = set(re.findall(r"[a-zA-Z]{3,}", text.lower()))
-        query_words = set(re.findall(r"[a-zA-Z]{3,}", query.lower()))
+        words = set(tokenize(text, min_len=3))
+        query_words = set(tokenize(query, min_len=3))
         # Combine and limit
         tags = list((words & query_words) | query_words)
         return tags[:8]
@@ -3,13 +3,76 @@
 Keyword matching: score each item by tag overlap with query keywords.
 Category filter: hard-filter when category is given, then score by tags.
 ranking.py re-ranks by keyword + color + embedding scores afterward.
+
+Matching runs against an inverted index over DESIGN_REFS (term -> item ids,
+tag -> item ids, category -> item ids), built once on first search, so a
+query only touches items that share a term with it.
 """
-import re
+import heapq
+from collections import Counter
 
+from app.core.text import is_english, tokenize
 from app.data.design_refs import DESIGN_REFS
 from app.providers.base import BaseProvider
 
 
+class _RefIndex:
+    """Posting lists over a list of design reference dicts."""
+
+    def __init__(self, refs: list[dict]) -> None:
+        self.refs = refs
+        self.terms: dict[str, list[int]] = {}  # tag or title word -> ids
+        self.tags: dict[str, list[int]] = {}  # tag -> ids
+        self.categories: dict[str, list[int]] = {}  # category -> ids
+        for i, item in enumerate(refs):
+            tag_set = {t.lower() for t in item.get("tags", [])}
+            title_words = set(tokenize(item.get("title", ""), min_len=1))
+            for term in tag_set | title_words:
+                self.terms.setdefault(term, []).append(i)
+            for tag in tag_set:
+                self.tags.setdefault(tag, []).append(i)
+            self.categories.setdefault(item.get("category", ""), []).append(i)
+
+    def search(self, kw_set: set[str], category: str | None, limit: int) -> list[int]:
+        """Ids of the best `limit` items, best first; ties keep dataset order."""
+        overlap: Counter[int] = Counter()
+        for kw in kw_set:
+            overlap.update(self.terms.get(kw, ()))
+
+        if not category:
+            best = heapq.nsmallest(limit, overlap, key=lambda i: (-overlap[i], i))
+            if len(best) < limit:
+                # Items with no overlap still count (score 0), in dataset order
+                for i in range(len(self.refs)):
+                    if len(best) >= limit:
+                        break
+                    if i not in overlap:
+                        best.append(i)
+            return best
+
+        # Hard filter: category match, or at least 3 keyword hits
+        cat = category.lower()
+        in_category = set(self.categories.get(cat, ()))
+        eligible = in_category.union(self.tags.get(cat, ()))
+        eligible.update(i for i, hits in overlap.items() if hits >= 3)
+
+        def rank_key(i: int) -> tuple[float, int]:
+            cat_bonus = 2.0 if i in in_category else 0.0
+            return -(overlap[i] + cat_bonus), i
+
+        return heapq.nsmallest(limit, eligible, key=rank_key)
+
+
+_index: _RefIndex | None = None
+
+
+def _get_index() -> _RefIndex:
+    global _index
+    if _index is None or _index.refs is not DESIGN_REFS:
+        _index = _RefIndex(DESIGN_REFS)
+    return _index
+
+
 class MockProvider(BaseProvider):
     provider_id = "mock"
 
@@ -21,36 +84,15 @@ class MockProvider(BaseProvider):
         limit: int = 20,
     ) -> list[dict]:
         # Normalize query keywords to lowercase English
-        en_kws = [k.lower() for k in keywords if re.match(r"[a-zA-Z]", k)]
+        en_kws = [k.lower() for k in keywords if is_english(k)]
         kw_set = set(en_kws)
 
-        scored: list[tuple[float, dict]] = []
-
-        for item in DESIGN_REFS:
-            item_cat = item.get("category", "")
-            tag_set = {t.lower() for t in item.get("tags", [])}
-            title_words = {w.lower() for w in re.findall(r"[a-zA-Z]+", item.get("title", ""))}
-
-            # Hard filter: if category specified, skip non-matching categories
-            if category and category.lower() not in (item_cat, *tag_set):
-                # Still include if multiple tags match strongly
-                kw_overlap = len(kw_set & (tag_set | title_words))
-                if kw_overlap < 3:
-                    continue
-
-            # Score: weighted tag overlap
-            kw_overlap = len(kw_set & (tag_set | title_words))
-            cat_bonus = 2.0 if category and category.lower() == item_cat else 0.0
-            score = kw_overlap + cat_bonus
-
-            scored.append((score, item))
-
-        # Sort by score descending; stable tie-break by original order
-        scored.sort(key=lambda x: -x[0])
+        index = _get_index()
 
         # Return as plain dicts (exclude internal 'category' field from results)
         results = []
-        for _, item in scored[:limit]:
+        for i in index.search(kw_set, category, limit):
+            item = index.refs[i]
             results.append({
                 "title": item["title"],
                 "image_url": item.get("image_url"),
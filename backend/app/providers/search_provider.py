@@ -11,10 +11,9 @@ API keys are optional for demo; Openverse fallback always works.
 """
 import logging
 import os
-import re
-
-import httpx
 
+from app.core.http import get_http_client
+from app.core.text import is_english, is_korean, strip_tags, tokenize
 from app.providers.base import BaseProvider
 
 logger = logging.getLogger("fmd.search_provider")
@@ -37,8 +36,8 @@ class SearchProvider(BaseProvider):
         category: str | None = None,
         limit: int = 20,
     ) -> list[dict]:
-        en_kws = [k for k in keywords if re.match(r"[a-zA-Z]", k)]
-        ko_kws = [k for k in keywords if re.match(r"[가-힣]", k)]
+        en_kws = [k for k in keywords if is_english(k)]
+        ko_kws = [k for k in keywords if is_korean(k)]
 
         results: list[dict] = []
         half = max(limit // 2, 5)
@@ -107,33 +106,33 @@ class SearchProvider(BaseProvider):
     async def _naver_image_search(self, query: str, limit: int) -> list[dict]:
         """Naver Image Search — Korean design content with thumbnails."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    "https://openapi.naver.com/v1/search/image",
-                    params={"query": query, "display": min(limit, 10), "sort": "sim"},
-                    headers={
-                        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-                        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
-                    },
-                )
-                if resp.status_code == 200:
-                    items = resp.json().get("items", [])
-                    results = []
-                    for item in items:
-                        title = re.sub(r"<[^>]+>", "", item.get("title", "Design"))
-                        link = item.get("link") or item.get("originallink", "")
-                        if not link.startswith("http"):
-                            continue
-                        results.append({
-                            "title": title,
-                            "image_url": item.get("thumbnail"),
-                            "product_url": link,
-                            "price": None,
-                            "color_hex": None,
-                            "tags": self._tags(title, query),
-                        })
-                    return results
-                logger.warning("Naver API returned %d", resp.status_code)
+            client = get_http_client()
+            resp = await client.get(
+                "https://openapi.naver.com/v1/search/image",
+                params={"query": query, "display": min(limit, 10), "sort": "sim"},
+                headers={
+                    "X-Naver-Client-Id": NAVER_CLIENT_ID,
+                    "X-Naver-Client-Secret": NAVER_CLIENT_SECRET,
+                },
+            )
+            if resp.status_code == 200:
+                items = resp.json().get("items", [])
+                results = []
+                for item in items:
+                    title = strip_tags(item.get("title", "Design"))
+                    link = item.get("link") or item.get("originallink", "")
+                    if not link.startswith("http"):
+                        continue
+                    results.append({
+                        "title": title,
+                        "image_url": item.get("thumbnail"),
+                        "product_url": link,
+                        "price": None,
+                        "color_hex": None,
+                        "tags": self._tags(title, query),
+                    })
+                return results
+            logger.warning("Naver API returned %d", resp.status_code)
         except Exception as exc:
             logger.warning("Naver error: %s", exc)
         return []
@@ -143,35 +142,35 @@ class SearchProvider(BaseProvider):
     async def _google_search(self, query: str, limit: int) -> list[dict]:
         """Google Custom Search — web results with optional thumbnails."""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    "https://www.googleapis.com/customsearch/v1",
-                    params={
-                        "key": GOOGLE_API_KEY,
-                        "cx": GOOGLE_CX,
-                        "q": query,
-                        "num": min(limit, 10),
-                    },
-                )
-                if resp.status_code == 200:
-                    items = resp.json().get("items", [])
-                    results = []
-                    for item in items:
-                        title = item.get("title", "")
-                        snippet = item.get("snippet", "")
-                        pagemap = item.get("pagemap", {})
-                        thumbnails = pagemap.get("cse_thumbnail", [])
-                        img_url = thumbnails[0].get("src") if thumbnails else None
-                        results.append({
-                            "title": title,
-                            "image_url": img_url,
-                            "product_url": item.get("link"),
-                            "price": None,
-                            "color_hex": None,
-                            "tags": self._tags(title + " " + snippet, query),
-                        })
-                    return results
-                logger.warning("Google API returned %d: %s", resp.status_code, resp.text[:120])
+            client = get_http_client()
+            resp = await client.get(
+                "https://www.googleapis.com/customsearch/v1",
+                params={
+                    "key": GOOGLE_API_KEY,
+                    "cx": GOOGLE_CX,
+                    "q": query,
+                    "num": min(limit, 10),
+                },
+            )
+            if resp.status_code == 200:
+                items = resp.json().get("items", [])
+                results = []
+                for item in items:
+                    title = item.get("title", "")
+                    snippet = item.get("snippet", "")
+                    pagemap = item.get("pagemap", {})
+                    thumbnails = pagemap.get("cse_thumbnail", [])
+                    img_url = thumbnails[0].get("src") if thumbnails else None
+                    results.append({
+                        "title": title,
+                        "image_url": img_url,
+                        "product_url": item.get("link"),
+                        "price": None,
+                        "color_hex": None,
+                        "tags": self._tags(title + " " + snippet, query),
+                    })
+                return results
+            logger.warning("Google API returned %d: %s", resp.status_code, resp.text[:120])
         except Exception as exc:
             logger.warning("Google error: %s", exc)
         return []
@@ -185,39 +184,39 @@ class SearchProvider(BaseProvider):
         direct thumbnail URLs and links to the original source pages.
         """
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    "https://api.openverse.org/v1/images/",
-                    params={
-                        "q": query,
-                        "page_size": min(limit, 10),
-                        "license_type": "commercial,modification",
-                    },
-                    headers={"User-Agent": "FMD-Portfolio/1.0 (design-search-demo)"},
-                )
-                if resp.status_code == 200:
-                    items = resp.json().get("results", [])
-                    results = []
-                    for item in items:
-                        title = item.get("title") or item.get("creator", "Design")
-                        product_url = (
-                            item.get("foreign_landing_url")
-                            or item.get("url", "")
-                        )
-                        if not product_url.startswith("http"):
-                            continue
-                        # Prefer thumbnail; fall back to full image URL
-                        img_url = item.get("thumbnail") or item.get("url")
-                        results.append({
-                            "title": title,
-                            "image_url": img_url,
-                            "product_url": product_url,
-                            "price": None,
-                            "color_hex": None,
-                            "tags": self._tags(title, query),
-                        })
-                    return results
-                logger.warning("Openverse returned %d", resp.status_code)
+            client = get_http_client()
+            resp = await client.get(
+                "https://api.openverse.org/v1/images/",
+                params={
+                    "q": query,
+                    "page_size": min(limit, 10),
+                    "license_type": "commercial,modification",
+                },
+                headers={"User-Agent": "FMD-Portfolio/1.0 (design-search-demo)"},
+            )
+            if resp.status_code == 200:
+                items = resp.json().get("results", [])
+                results = []
+                for item in items:
+                    title = item.get("title") or item.get("creator", "Design")
+                    product_url = (
+                        item.get("foreign_landing_url")
+                        or item.get("url", "")
+                    )
+                    if not product_url.startswith("http"):
+                        continue
+                    # Prefer thumbnail; fall back to full image URL
+                    img_url = item.get("thumbnail") or item.get("url")
+                    results.append({
+                        "title": title,
+                        "image_url": img_url,
+                        "product_url": product_url,
+                        "price": None,
+                        "color_hex": None,
+                        "tags": self._tags(title, query),
+                    })
+                return results
+            logger.warning("Openverse returned %d", resp.status_code)
         except Exception as exc:
             logger.warning("Openverse search error: %s", exc)
         return []
@@ -225,6 +224,6 @@ class SearchProvider(BaseProvider):
     # ── Helpers ──────────────────────────────────────────────────────────────
 
     def _tags(self, text: str, query: str) -> list[str]:
-        words = set(re.findall(r"[a-zA-Z가-힣]{2,}", text.lower()))
-        q_words = set(re.findall(r"[a-zA-Z가-힣]{2,}", query.lower()))
+        words = set(tokenize(text, hangul=True))
+        q_words = set(tokenize(query, hangul=True))
         return list((words & q_words) | q_words)[:10]
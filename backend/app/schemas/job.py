@@ -14,6 +14,7 @@ class JobStatus(BaseModel):
     progress: float
     error_code: str | None = None
     ai_image_url: str | None = None          # kept for backward compat
-    style_variations: list[StyleVariation] | None = None
+    style_variations: list[StyleVariation] | None = None  # grows as each style finishes
+    usable: bool = False                     # at least one style variation is ready
     keywords: list[str] | None = None
     dominant_color: str | None = None
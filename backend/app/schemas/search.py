@@ -21,5 +21,13 @@ class SearchResultItem(BaseModel):
     explanation: list[str]
 
 
+class ProviderRunInfo(BaseModel):
+    provider_id: str
+    status: str          # "done" | "cached" | "timeout" | "failed"
+    cache: str           # "hit" | "stale" | "miss"
+    result_count: int
+
+
 class SearchResponse(BaseModel):
     results: list[SearchResultItem]
+    providers: list[ProviderRunInfo] = []
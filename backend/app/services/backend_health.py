@@ -0,0 +1,190 @@
+"""Health registry for the image backends.
+
+Without it every generation re-probes ComfyUI's /system_stats and retries
+backends that are known to be down, paying their timeouts on each request
+during an outage. The registry keeps, per backend:
+
+- a circuit breaker: after BACKEND_FAILURE_THRESHOLD consecutive failures
+  the backend is skipped for BACKEND_OPEN_SECONDS; then a single trial
+  request is let through (half-open) and its outcome closes or re-opens
+  the breaker;
+- an EWMA of successful response latency, used to reorder the chain and
+  to time hedges (hedge_delay);
+- cached probe results (e.g. ComfyUI availability) for BACKEND_PROBE_TTL_SECONDS.
+
+State is per process: each worker learns backend health on its own.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from app.core.config import settings
+
+logger = logging.getLogger("fmd.backend_health")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class BackendHealth:
+    state: str = CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    trial_in_flight: bool = False
+    ewma_latency: float | None = None
+    successes: int = 0
+    failures: int = 0
+
+
+class HealthRegistry:
+    def __init__(
+        self,
+        *,
+        failure_threshold: int | None = None,
+        open_seconds: float | None = None,
+        probe_ttl: float | None = None,
+        ewma_alpha: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = max(1, failure_threshold or settings.BACKEND_FAILURE_THRESHOLD)
+        self._open_seconds = (
+            open_seconds if open_seconds is not None else settings.BACKEND_OPEN_SECONDS
+        )
+        self._probe_ttl = probe_ttl if probe_ttl is not None else settings.BACKEND_PROBE_TTL_SECONDS
+        self._alpha = ewma_alpha if ewma_alpha is not None else settings.BACKEND_EWMA_ALPHA
+        self._clock = clock
+        self._backends: dict[str, BackendHealth] = {}
+        self._probes: dict[str, tuple[float, bool]] = {}
+        self._probe_locks: dict[str, asyncio.Lock] = {}
+
+    def _get(self, name: str) -> BackendHealth:
+        return self._backends.setdefault(name, BackendHealth())
+
+    def allow(self, name: str) -> bool:
+        """Whether a request may be sent to `name` now (claims the half-open trial)."""
+        health = self._get(name)
+        if health.state == OPEN:
+            if self._clock() - health.opened_at < self._open_seconds:
+                return False
+            health.state = HALF_OPEN
+            health.trial_in_flight = False
+            logger.info("Backend %s half-open, sending a trial request", name)
+        if health.state == HALF_OPEN:
+            if health.trial_in_flight:
+                return False
+            health.trial_in_flight = True
+        return True
+
+    def record_success(self, name: str, latency: float) -> None:
+        health = self._get(name)
+        if health.state != CLOSED:
+            logger.info("Backend %s recovered, closing breaker", name)
+        health.state = CLOSED
+        health.consecutive_failures = 0
+        health.trial_in_flight = False
+        health.successes += 1
+        self._observe(health, latency)
+
+    def record_failure(self, name: str) -> None:
+        health = self._get(name)
+        health.failures += 1
+        health.consecutive_failures += 1
+        health.trial_in_flight = False
+        if health.state == HALF_OPEN or health.consecutive_failures >= self._threshold:
+            if health.state != OPEN:
+                logger.warning(
+                    "Backend %s failed %d time(s), opening breaker for %.0fs",
+                    name, health.consecutive_failures, self._open_seconds,
+                )
+            health.state = OPEN
+            health.opened_at = self._clock()
+
+    def record_cancelled(self, name: str, elapsed: float) -> None:
+        """A request abandoned after `elapsed` seconds (another backend won).
+
+        Not a failure, but the backend took at least that long, so the
+        latency estimate is raised when it was lower.
+        """
+        health = self._get(name)
+        health.trial_in_flight = False
+        if health.ewma_latency is not None and elapsed > health.ewma_latency:
+            self._observe(health, elapsed)
+
+    def _observe(self, health: BackendHealth, latency: float) -> None:
+        if health.ewma_latency is None:
+            health.ewma_latency = latency
+        else:
+            health.ewma_latency += self._alpha * (latency - health.ewma_latency)
+
+    def hedge_delay(self, name: str, default: float) -> float:
+        """Seconds to wait on `name` before hedging with the next backend.
+
+        IMAGE_HEDGE_LATENCY_FACTOR x the observed latency, so a healthy but
+        slow backend (ComfyUI, HuggingFace) is not routinely hedged; `default`
+        until there is an estimate.
+        """
+        latency = self._get(name).ewma_latency
+        if latency is None:
+            return default
+        return max(
+            settings.IMAGE_HEDGE_MIN_DELAY_SECONDS, settings.IMAGE_HEDGE_LATENCY_FACTOR * latency
+        )
+
+    def order(self, names: list[str]) -> list[str]:
+        """Reorder `names` by observed latency, fastest first.
+
+        Backends without a latency estimate keep their configured slot, so a
+        fresh process uses the configured priority until it has measurements.
+        """
+        measured = [n for n in names if self._get(n).ewma_latency is not None]
+        ranked = iter(sorted(measured, key=lambda n: self._backends[n].ewma_latency))
+        measured_set = set(measured)
+        return [next(ranked) if n in measured_set else n for n in names]
+
+    async def probe(self, name: str, check: Callable[[], Awaitable[bool]]) -> bool:
+        """Run an availability check, cached for the probe TTL."""
+        cached = self._probes.get(name)
+        if cached and cached[0] > self._clock():
+            return cached[1]
+        lock = self._probe_locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            cached = self._probes.get(name)
+            if cached and cached[0] > self._clock():
+                return cached[1]
+            ok = await check()
+            self._probes[name] = (self._clock() + self._probe_ttl, ok)
+            return ok
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            name: {
+                "state": h.state,
+                "consecutive_failures": h.consecutive_failures,
+                "ewma_latency_seconds": (
+                    round(h.ewma_latency, 3) if h.ewma_latency is not None else None
+                ),
+                "successes": h.successes,
+                "failures": h.failures,
+            }
+            for name, h in self._backends.items()
+        }
+
+
+_registry: HealthRegistry | None = None
+
+
+def get_health_registry() -> HealthRegistry:
+    global _registry
+    if _registry is None:
+        _registry = HealthRegistry()
+    return _registry
+
+
+def set_health_registry(registry: HealthRegistry | None) -> None:
+    """Swap the active registry (tests); None starts a fresh one."""
+    global _registry
+    _registry = registry
@@ -0,0 +1,150 @@
+"""One-pass analysis of a submitted sketch canvas.
+
+A canvas arrives as a base64 PNG data URL. analyze_canvas() decodes it once
+and derives everything the pipeline needs from that single decode: colours
+and palette (app.services.color_analysis), edge density, stroke coverage and
+aspect ratio. Pixel work runs on a reduced working image (at most
+ANALYSIS_SIDE px per side).
+
+The result holds only the derived features and the image's SHA-256, with no
+pixels and no payload, so it stays cheap to pickle back from the CPU pool.
+ControlNet gets the original PNG payload (canvas_payload) from the caller,
+which already has it.
+"""
+import base64
+import binascii
+import hashlib
+import io
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+from app.core.executor import run_cpu_bound
+from app.services.color_analysis import ColorAnalysis, analyze_colors
+
+ANALYSIS_SIDE = 256
+_WHITE_THRESHOLD = 240
+_EDGE_THRESHOLD = 32
+
+# SDXL works best around one megapixel, in multiples of 64
+_GENERATION_AREA = 1024 * 1024
+_GENERATION_MULTIPLE = 64
+_MAX_ASPECT = 4.0
+
+
+@dataclass(frozen=True)
+class CanvasAnalysis:
+    width: int
+    height: int
+    colors: ColorAnalysis
+    edge_density: float  # share of working-image pixels on a strong edge
+    ink_coverage: float  # share of non-white pixels
+    ink_bbox: tuple[float, float, float, float] | None  # (x0, y0, x1, y1), 0..1
+    sha256: str  # of the image bytes, as canvas_sha256()
+
+    @property
+    def aspect(self) -> float:
+        return self.width / self.height
+
+    def generation_size(self) -> tuple[int, int]:
+        return generation_size(self.width, self.height)
+
+    def summary(self) -> dict:
+        """JSON-friendly features for the design profile."""
+        return {
+            "width": self.width,
+            "height": self.height,
+            "aspect": round(self.aspect, 4),
+            "edge_density": self.edge_density,
+            "ink_coverage": self.ink_coverage,
+            "ink_bbox": list(self.ink_bbox) if self.ink_bbox else None,
+        }
+
+
+def generation_size(width: int, height: int) -> tuple[int, int]:
+    """Image size for generation: about 1 MP in the canvas's aspect ratio."""
+    aspect = min(max(width / height, 1 / _MAX_ASPECT), _MAX_ASPECT)
+    gen_width = math.sqrt(_GENERATION_AREA * aspect)
+    gen_height = gen_width / aspect
+
+    def _snap(v: float) -> int:
+        return max(_GENERATION_MULTIPLE, round(v / _GENERATION_MULTIPLE) * _GENERATION_MULTIPLE)
+
+    return _snap(gen_width), _snap(gen_height)
+
+
+def canvas_payload(canvas_data: str) -> str:
+    """The bare base64 PNG of a canvas data URL."""
+    return canvas_data.split(",", 1)[1] if "," in canvas_data else canvas_data
+
+
+def canvas_sha256(canvas_data: str) -> str:
+    """SHA-256 of the canvas image bytes (of the base64 text if undecodable)."""
+    payload = canvas_payload(canvas_data)
+    try:
+        data = base64.b64decode(payload)
+    except (binascii.Error, ValueError):
+        data = payload.encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _strokes(gray: np.ndarray) -> tuple[float, float, tuple[float, float, float, float] | None]:
+    h, w = gray.shape
+    dx = np.abs(np.diff(gray, axis=1)) > _EDGE_THRESHOLD
+    dy = np.abs(np.diff(gray, axis=0)) > _EDGE_THRESHOLD
+    edges = np.zeros_like(gray, dtype=bool)
+    edges[:, 1:] |= dx
+    edges[1:, :] |= dy
+    edge_density = round(float(edges.mean()), 4)
+
+    ink = gray <= _WHITE_THRESHOLD
+    ink_coverage = round(float(ink.mean()), 4)
+    if not ink.any():
+        return edge_density, ink_coverage, None
+    cols = np.flatnonzero(ink.any(axis=0))
+    rows = np.flatnonzero(ink.any(axis=1))
+    bbox = (
+        round(cols[0] / w, 4),
+        round(rows[0] / h, 4),
+        round((cols[-1] + 1) / w, 4),
+        round((rows[-1] + 1) / h, 4),
+    )
+    return edge_density, ink_coverage, bbox
+
+
+def analyze_canvas(canvas_data: str) -> CanvasAnalysis | None:
+    """Decode a base64 canvas (data URL or bare) and analyse it; None if undecodable."""
+    try:
+        data = base64.b64decode(canvas_payload(canvas_data))
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception:
+        return None
+
+    width, height = img.size
+    work = img.convert("RGB")
+    if max(work.size) > ANALYSIS_SIDE:
+        scale = ANALYSIS_SIDE / max(work.size)
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        # Nearest keeps exact colours for the palette
+        work = work.resize(size, Image.Resampling.NEAREST)
+
+    # "Ink" = any channel below the white threshold, i.e. the min channel
+    gray = np.asarray(work, dtype=np.int16).min(axis=2)
+    edge_density, ink_coverage, ink_bbox = _strokes(gray)
+    return CanvasAnalysis(
+        width=width,
+        height=height,
+        colors=analyze_colors(work, max_side=None),
+        edge_density=edge_density,
+        ink_coverage=ink_coverage,
+        ink_bbox=ink_bbox,
+        sha256=hashlib.sha256(data).hexdigest(),
+    )
+
+
+async def analyze_canvas_async(canvas_data: str) -> CanvasAnalysis | None:
+    """analyze_canvas in the CPU pool, off the event loop."""
+    return await run_cpu_bound(analyze_canvas, canvas_data)
@@ -0,0 +1,64 @@
+"""Dominant colour and palette of an image, computed on arrays.
+
+Pixels are quantised to 32-step RGB bins (8 levels per channel, 512 bins),
+near-white pixels (all channels > 240, i.e. empty canvas) are ignored, and
+the bins are counted with numpy.bincount instead of a Counter over Python
+tuples. Images larger than `max_side` are first reduced with nearest-
+neighbour sampling, which keeps exact pixel colours, so a 2000x2000 canvas
+is analysed in milliseconds with the same proportions.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image
+
+_STEP = 32
+_LEVELS = 256 // _STEP
+_WHITE_THRESHOLD = 240
+
+
+@dataclass(frozen=True)
+class PaletteColor:
+    hex: str
+    proportion: float  # share of the non-white pixels, 0..1
+
+
+@dataclass(frozen=True)
+class ColorAnalysis:
+    dominant: str | None
+    palette: list[PaletteColor]
+
+
+def _bin_hex(code: int) -> str:
+    r, g, b = code // (_LEVELS * _LEVELS), code // _LEVELS % _LEVELS, code % _LEVELS
+    return f"#{r * _STEP:02x}{g * _STEP:02x}{b * _STEP:02x}"
+
+
+def color_histogram(img: Image.Image, max_side: int | None = 256) -> np.ndarray:
+    """Counts of non-white pixels per quantised colour bin (length 512)."""
+    img = img.convert("RGB")
+    if max_side and max(img.size) > max_side:
+        scale = max_side / max(img.size)
+        size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(size, Image.Resampling.NEAREST)
+    pixels = np.asarray(img, dtype=np.uint8).reshape(-1, 3)
+    pixels = pixels[~(pixels > _WHITE_THRESHOLD).all(axis=1)]
+    bins = (pixels // _STEP).astype(np.int32)
+    codes = (bins[:, 0] * _LEVELS + bins[:, 1]) * _LEVELS + bins[:, 2]
+    return np.bincount(codes, minlength=_LEVELS ** 3)
+
+
+def analyze_colors(img: Image.Image, top_n: int = 5, max_side: int | None = 256) -> ColorAnalysis:
+    """Dominant colour and the top_n palette colours with their proportions."""
+    counts = color_histogram(img, max_side)
+    total = int(counts.sum())
+    if total == 0:
+        return ColorAnalysis(dominant=None, palette=[])
+    # Stable sort: equal counts keep bin order, so results are deterministic
+    order = np.argsort(-counts, kind="stable")[:top_n]
+    palette = [
+        PaletteColor(hex=_bin_hex(int(code)), proportion=round(int(counts[code]) / total, 4))
+        for code in order
+        if counts[code]
+    ]
+    return ColorAnalysis(dominant=palette[0].hex, palette=palette)
@@ -3,18 +3,28 @@
 ComfyUI exposes a JSON-based workflow API at /prompt and /history.
 Set COMFYUI_URL (default: http://localhost:8188) to connect.
 
+Completion is awaited on ComfyUI's /ws progress stream (by client_id), so
+the result is fetched as soon as execution finishes; without the
+`websockets` package, or if the socket fails, /history is polled instead.
+
 Supported experiments:
 - SDXL text-to-image with configurable CFG / steps / seed
 - ControlNet (Canny edge) conditioning from a canvas image
 """
 import asyncio
 import base64
+import json
 import logging
 import os
 import uuid
 from typing import Optional
 
-import httpx
+from app.core.http import get_http_client
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:  # websockets not installed: poll /history instead
+    ws_connect = None
 
 logger = logging.getLogger("fmd.comfyui")
 
@@ -149,49 +159,125 @@ def _build_controlnet_workflow(
 async def _queue_prompt(workflow: dict, client_id: str) -> Optional[str]:
     """POST workflow to ComfyUI /prompt, return prompt_id."""
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(
-                f"{COMFYUI_URL}/prompt",
-                json={"prompt": workflow, "client_id": client_id},
-            )
-            resp.raise_for_status()
-            return resp.json()["prompt_id"]
+        client = get_http_client()
+        resp = await client.post(
+            f"{COMFYUI_URL}/prompt",
+            json={"prompt": workflow, "client_id": client_id},
+        )
+        resp.raise_for_status()
+        return resp.json()["prompt_id"]
     except Exception as exc:
         logger.error("ComfyUI /prompt failed: %s", exc)
         return None
 
 
+async def _fetch_image(img_info: dict) -> Optional[bytes]:
+    """Download one output image via /view."""
+    client = get_http_client()
+    img_resp = await client.get(
+        f"{COMFYUI_URL}/view",
+        params={
+            "filename": img_info["filename"],
+            "subfolder": img_info.get("subfolder", ""),
+            "type": img_info.get("type", "output"),
+        },
+    )
+    if img_resp.status_code == 200:
+        return img_resp.content
+    return None
+
+
+async def _image_from_history(prompt_id: str) -> tuple[bool, Optional[bytes]]:
+    """Look the prompt up in /history; returns (finished, image bytes)."""
+    client = get_http_client()
+    resp = await client.get(f"{COMFYUI_URL}/history/{prompt_id}")
+    data = resp.json()
+    if prompt_id not in data:
+        return False, None
+    outputs = data[prompt_id].get("outputs", {})
+    for node_output in outputs.values():
+        for img_info in node_output.get("images", []):
+            image = await _fetch_image(img_info)
+            if image:
+                return True, image
+    return True, None
+
+
 async def _poll_result(prompt_id: str, timeout: float = 120.0) -> Optional[bytes]:
     """Poll /history until image is ready, return PNG bytes."""
     deadline = asyncio.get_event_loop().time() + timeout
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        while asyncio.get_event_loop().time() < deadline:
-            await asyncio.sleep(2.0)
-            try:
-                resp = await client.get(f"{COMFYUI_URL}/history/{prompt_id}")
-                data = resp.json()
-                if prompt_id not in data:
-                    continue
-                outputs = data[prompt_id].get("outputs", {})
-                for node_output in outputs.values():
-                    images = node_output.get("images", [])
-                    for img_info in images:
-                        # Fetch image bytes
-                        img_resp = await client.get(
-                            f"{COMFYUI_URL}/view",
-                            params={
-                                "filename": img_info["filename"],
-                                "subfolder": img_info.get("subfolder", ""),
-                                "type": img_info.get("type", "output"),
-                            },
-                        )
-                        if img_resp.status_code == 200:
-                            return img_resp.content
-            except Exception as exc:
-                logger.warning("ComfyUI poll error: %s", exc)
+    while asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(2.0)
+        try:
+            finished, image = await _image_from_history(prompt_id)
+            if finished and image:
+                return image
+        except Exception as exc:
+            logger.warning("ComfyUI poll error: %s", exc)
     return None
 
 
+def _ws_url(client_id: str) -> str:
+    base = COMFYUI_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+    return f"{base.rstrip('/')}/ws?clientId={client_id}"
+
+
+async def _open_ws(client_id: str):
+    """Connect to ComfyUI's progress WebSocket; None means use polling."""
+    if ws_connect is None:
+        return None
+    try:
+        return await ws_connect(_ws_url(client_id), max_size=None, open_timeout=3.0)
+    except Exception as exc:
+        logger.info("ComfyUI WebSocket unavailable (%s), polling instead", exc)
+        return None
+
+
+async def _wait_ws(ws, prompt_id: str, timeout: float = 120.0) -> Optional[bytes]:
+    """Wait on the WebSocket until `prompt_id` has executed, return PNG bytes.
+
+    "executed" messages carry each output node's images; "executing" with
+    node None marks the end of the prompt. Falls back to polling if the
+    stream breaks before that.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    images: list[dict] = []
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            raw = await asyncio.wait_for(ws.recv(), remaining)
+            if isinstance(raw, bytes):  # binary latent previews
+                continue
+            message = json.loads(raw)
+            data = message.get("data") or {}
+            if data.get("prompt_id") != prompt_id:
+                continue
+            kind = message.get("type")
+            if kind == "executed":
+                images += (data.get("output") or {}).get("images", [])
+            elif kind == "execution_error":
+                logger.warning("ComfyUI execution error: %s", data.get("exception_message"))
+                return None
+            elif kind == "executing" and data.get("node") is None:
+                break
+    except asyncio.TimeoutError:
+        return None
+    except Exception as exc:
+        logger.warning("ComfyUI WebSocket error (%s), polling instead", exc)
+        return await _poll_result(prompt_id, max(0.0, deadline - loop.time()))
+
+    for img_info in images:
+        image = await _fetch_image(img_info)
+        if image:
+            return image
+    # Cached executions may not re-send outputs; /history still has them
+    _, image = await _image_from_history(prompt_id)
+    return image
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -224,12 +310,21 @@ async def generate_via_comfyui(
         )
         method = "comfyui_sdxl"
 
-    prompt_id = await _queue_prompt(workflow, client_id)
-    if not prompt_id:
-        logger.warning("ComfyUI unavailable, skipping")
-        return {"image_base64": None, "image_url": None, "method": method, "error": "ComfyUI unavailable"}
+    # Subscribe before queueing so no progress message is missed
+    ws = await _open_ws(client_id)
+    try:
+        prompt_id = await _queue_prompt(workflow, client_id)
+        if not prompt_id:
+            logger.warning("ComfyUI unavailable, skipping")
+            return {"image_base64": None, "image_url": None, "method": method, "error": "ComfyUI unavailable"}
 
-    image_bytes = await _poll_result(prompt_id)
+        if ws is not None:
+            image_bytes = await _wait_ws(ws, prompt_id)
+        else:
+            image_bytes = await _poll_result(prompt_id)
+    finally:
+        if ws is not None:
+            await ws.close()
     if not image_bytes:
         return {"image_base64": None, "image_url": None, "method": method, "error": "timeout"}
 
@@ -247,8 +342,8 @@ async def generate_via_comfyui(
 async def is_comfyui_available() -> bool:
     """Quick health-check for ComfyUI server."""
     try:
-        async with httpx.AsyncClient(timeout=3.0) as client:
-            resp = await client.get(f"{COMFYUI_URL}/system_stats")
-            return resp.status_code == 200
+        client = get_http_client()
+        resp = await client.get(f"{COMFYUI_URL}/system_stats", timeout=3.0)
+        return resp.status_code == 200
     except Exception:
         return False
@@ -1,31 +1,104 @@
 """Lightweight TF-IDF text embedder — pure Python stdlib only.
 
 No numpy, no sklearn required.
-Converts a keyword list into a normalised float vector stored as JSON bytes,
-then computes cosine similarity against product title + tags at ranking time.
+Converts a keyword list into a normalised float vector stored as compact
+binary bytes, then computes cosine similarity against product title + tags
+at ranking time.
+
+Stored format (little-endian):
+    b"FMDE" | version u8 | term count u16 | float32 x count | terms, "\n"-joined UTF-8
+Rows written before this format hold JSON ({"terms": [...], "vec": [...]});
+decode_embedding reads both.
 """
 import json
 import math
-import re
+import struct
 from collections import Counter
+from dataclasses import dataclass, field
+
+from app.core.text import tokenize
+
+_MAGIC = b"FMDE"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBH")
 
 
 def _tokenize(text: str) -> list[str]:
     """Lowercase and split on non-alpha chars; drop single-char tokens."""
-    return [t for t in re.findall(r"[a-zA-Z]+", text.lower()) if len(t) > 1]
+    return tokenize(text)
+
+
+@dataclass(frozen=True)
+class QueryEmbedding:
+    """Decoded query vector: decode once per request, reuse for every candidate."""
+
+    terms: tuple[str, ...]
+    vec: tuple[float, ...]
+    index: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "index", {t: i for i, t in enumerate(self.terms)})
+
+    def encode(self) -> bytes:
+        header = _HEADER.pack(_MAGIC, _VERSION, len(self.terms))
+        floats = struct.pack(f"<{len(self.vec)}f", *self.vec)
+        return header + floats + "\n".join(self.terms).encode()
+
+    def similarity(self, title: str, tags: list[str]) -> float:
+        """Cosine similarity against product title + tags, in [0.0, 1.0]."""
+        if not self.terms:
+            return 0.0
+
+        # Build product token bag aligned to query vocabulary
+        product_text = title + " " + " ".join(tags)
+        product_tokens = _tokenize(product_text)
+        if not product_tokens:
+            return 0.0
+
+        p_counts = Counter(product_tokens)
+        # Same weighting scheme as query embedding
+        p_weighted = [math.log1p(p_counts.get(term, 0)) for term in self.terms]
+        p_mag = math.sqrt(sum(v ** 2 for v in p_weighted)) or 1.0
+        p_vec_norm = [v / p_mag for v in p_weighted]
+
+        # Dot product of two unit vectors = cosine similarity
+        dot = sum(q * p for q, p in zip(self.vec, p_vec_norm))
+        return round(max(0.0, min(1.0, dot)), 4)
+
+
+def decode_embedding(data: bytes | None) -> QueryEmbedding | None:
+    """Parse stored embedding bytes (binary or legacy JSON); None if unreadable."""
+    if not data:
+        return None
+    try:
+        if data[:1] == b"{":
+            payload = json.loads(data.decode())
+            return QueryEmbedding(tuple(payload["terms"]), tuple(payload["vec"]))
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        offset = _HEADER.size
+        vec = struct.unpack_from(f"<{count}f", data, offset)
+        text = data[offset + 4 * count:].decode()
+        terms = tuple(text.split("\n")) if count else ()
+        if len(terms) != count:
+            return None
+        return QueryEmbedding(terms, vec)
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
 
 
 def build_query_embedding(keywords: list[str]) -> bytes:
     """Create a TF-IDF-inspired unit vector from a keyword list.
 
-    Returns JSON bytes suitable for storage in DesignProfile.embedding.
+    Returns binary bytes suitable for storage in DesignProfile.embedding.
     """
     tokens: list[str] = []
     for kw in keywords:
-        tokens.extend(_tokenize(kw))
+        tokens.extend(tokenize(kw, intern=True))
 
     if not tokens:
-        return json.dumps({"terms": [], "vec": []}).encode()
+        return QueryEmbedding((), ()).encode()
 
     counts = Counter(tokens)
     # Weight: log(1 + count) gives diminishing returns for repeated terms
@@ -33,45 +106,28 @@ def build_query_embedding(keywords: list[str]) -> bytes:
 
     # Normalise to unit vector so cosine similarity is just a dot product
     magnitude = math.sqrt(sum(v ** 2 for v in weighted.values())) or 1.0
-    terms = sorted(weighted.keys())
-    vec = [round(weighted[t] / magnitude, 6) for t in terms]
+    terms = tuple(sorted(weighted.keys()))
+    vec = tuple(weighted[t] / magnitude for t in terms)
 
-    return json.dumps({"terms": terms, "vec": vec}).encode()
+    return QueryEmbedding(terms, vec).encode()
 
 
-def cosine_similarity(embedding_bytes: bytes, title: str, tags: list[str]) -> float:
+def cosine_similarity(
+    embedding: bytes | QueryEmbedding, title: str, tags: list[str]
+) -> float:
     """Compute cosine similarity between a stored query embedding and product text.
 
     Args:
-        embedding_bytes: value from DesignProfile.embedding (JSON bytes)
+        embedding: value from DesignProfile.embedding, or an already decoded
+                   QueryEmbedding (preferred when scoring many products)
         title: product title string
         tags: product tags list
 
     Returns:
         float in [0.0, 1.0]
     """
-    try:
-        payload = json.loads(embedding_bytes.decode())
-        q_terms: list[str] = payload["terms"]
-        q_vec: list[float] = payload["vec"]
-    except Exception:
-        return 0.0
-
-    if not q_terms:
-        return 0.0
-
-    # Build product token bag aligned to query vocabulary
-    product_text = title + " " + " ".join(tags)
-    product_tokens = _tokenize(product_text)
-    if not product_tokens:
-        return 0.0
-
-    p_counts = Counter(product_tokens)
-    # Same weighting scheme as query embedding
-    p_weighted = [math.log1p(p_counts.get(term, 0)) for term in q_terms]
-    p_mag = math.sqrt(sum(v ** 2 for v in p_weighted)) or 1.0
-    p_vec_norm = [v / p_mag for v in p_weighted]
-
-    # Dot product of two unit vectors = cosine similarity
-    dot = sum(q * p for q, p in zip(q_vec, p_vec_norm))
-    return round(max(0.0, min(1.0, dot)), 4)
+    if not isinstance(embedding, QueryEmbedding):
+        embedding = decode_embedding(embedding)
+        if embedding is None:
+            return 0.0
+    return embedding.similarity(title, tags)
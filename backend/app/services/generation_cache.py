@@ -0,0 +1,170 @@
+"""Durable cache of generated images, in front of the whole fallback chain.
+
+generate_design_image is deterministic in its inputs (seed defaults to 42),
+so a repeat prompt can be answered from disk in milliseconds instead of
+another 10-60 s round trip to an image backend.
+
+Key: SHA-256 over (enhanced prompt, configured backend chain, cfg, steps,
+seed, width, height, control image hash). Including the backend chain means
+enabling e.g. ComfyUI does not keep serving images cached from Pollinations.
+
+Entries are JSON files sharded under GENERATION_CACHE_DIR. Total size is
+capped at GENERATION_CACHE_MAX_BYTES; the least recently used entries (file
+mtime, refreshed on every hit) are evicted first. Several processes may
+share the directory: an entry evicted by another process is just a miss.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from app.core.config import settings
+
+logger = logging.getLogger("fmd.generation_cache")
+
+
+def generation_key(
+    enhanced_prompt: str,
+    *,
+    backend: str,
+    cfg: float,
+    steps: int,
+    seed: int,
+    width: int,
+    height: int,
+    control_image_b64: str | None = None,
+) -> str:
+    control_hash = (
+        hashlib.sha256(control_image_b64.encode()).hexdigest() if control_image_b64 else ""
+    )
+    raw = json.dumps(
+        [enhanced_prompt, backend, float(cfg), steps, seed, width, height, control_hash]
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class GenerationCache:
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self._root = Path(root)
+        self._max_bytes = max_bytes
+        self._index: OrderedDict[str, int] | None = None  # key -> file size, LRU first
+        self._bytes = 0
+        # _get/_put run in worker threads (asyncio.to_thread), several at once
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self._root / key[:2] / f"{key}.json"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            if self._root.exists():
+                for path in self._root.glob("*/*.json"):
+                    try:
+                        st = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, path.stem, st.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+            self._bytes = sum(self._index.values())
+        return self._index
+
+    def _forget(self, key: str) -> None:
+        index = self._load_index()
+        size = index.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+
+    def _get(self, key: str) -> dict | None:
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            try:
+                result = json.loads(path.read_bytes())
+                os.utime(path)  # mark as recently used for other processes too
+            except (OSError, ValueError):
+                # Missing, unreadable, or evicted by another process meanwhile
+                self._forget(key)
+                self.misses += 1
+                return None
+            if key in index:
+                index.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def _put(self, key: str, result: dict) -> None:
+        data = json.dumps(result).encode()
+        if len(data) > self._max_bytes:
+            return
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._forget(key)
+            index[key] = len(data)
+            self._bytes += len(data)
+            while self._bytes > self._max_bytes and index:
+                old_key = next(iter(index))
+                self._forget(old_key)
+                self._path(old_key).unlink(missing_ok=True)
+                self.evictions += 1
+
+    async def get(self, key: str) -> dict | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, result: dict) -> None:
+        # image_base64 duplicates the data: URL; it is rebuilt by the caller
+        stored = {k: v for k, v in result.items() if k != "image_base64"}
+        try:
+            await asyncio.to_thread(self._put, key, stored)
+        except OSError as e:
+            logger.warning("Could not cache generated image: %s", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._index or {}
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache: GenerationCache | None = None
+
+
+def get_generation_cache() -> GenerationCache | None:
+    """The process-wide cache, or None when GENERATION_CACHE_DIR is empty."""
+    global _cache
+    if _cache is not None:
+        return _cache
+    if settings.GENERATION_CACHE_DIR:
+        _cache = GenerationCache(settings.GENERATION_CACHE_DIR, settings.GENERATION_CACHE_MAX_BYTES)
+    return _cache
+
+
+def set_generation_cache(cache: GenerationCache | None) -> None:
+    """Swap the active cache (tests); None re-selects from settings."""
+    global _cache
+    _cache = cache
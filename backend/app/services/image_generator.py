@@ -4,7 +4,17 @@
   2. Stability AI API       — when STABILITY_API_KEY is set
   3. HuggingFace Inference  — when HF_TOKEN is set (free tier available)
   4. Stable Horde           — free crowdsourced SD (STABLE_HORDE_API_KEY, registered account)
-  5. placehold.co           — static placeholder (last resort)
+  5. Pollinations.ai        — free, no key
+  6. Openverse              — open-licensed image search
+  7. local SVG              — last resort
+
+The chain is hedged: backends start in priority order, and the next one is
+started early if the newest running backend is slower than expected. That
+means IMAGE_HEDGE_LATENCY_FACTOR x its observed latency, or
+IMAGE_HEDGE_DELAY_SECONDS before it has any. At most IMAGE_HEDGE_MAX_RUNNING
+backends run at once. The first usable image wins and the slower requests
+are cancelled. Backends with an open circuit breaker are skipped, and the
+generators are reordered by observed latency (app.services.backend_health).
 
 Free setup options (pick one):
   - HuggingFace free token: https://huggingface.co/settings/tokens → HF_TOKEN=hf_xxx
@@ -14,10 +24,17 @@ Free setup options (pick one):
 import asyncio
 import logging
 import os
+from collections.abc import Awaitable, Callable
 from typing import Optional
 from urllib.parse import quote, quote_plus
 
-import httpx
+from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.text import en_words as _en_words
+from app.core.text import ko_words
+from app.services.backend_health import HealthRegistry, get_health_registry
+from app.services.generation_cache import generation_key, get_generation_cache
+from app.services.translation import lookup, translate_text, translate_word
 
 logger = logging.getLogger("fmd.image_generator")
 
@@ -29,6 +46,28 @@ HF_MODEL = os.getenv("HF_MODEL", "black-forest-labs/FLUX.1-schnell")
 STABLE_HORDE_KEY = os.getenv("STABLE_HORDE_API_KEY", "")  # empty = skip (anonymous has 2h queue)
 STABLE_HORDE_URL = "https://stablehorde.net/api/v2"
 
+# Fallback results that mean "no real image": never cached, so the next
+# request tries the real backends again
+_UNCACHEABLE_METHODS = {"svg_local", "placeholder"}
+
+# Stock-image search, not generation: never promoted ahead of the generators
+_PINNED_LAST = {"openverse"}
+
+
+def _backend_chain() -> str:
+    """Identify the configured backends (part of the generation cache key)."""
+    parts = []
+    if COMFYUI_URL:
+        parts.append(f"comfyui={COMFYUI_URL}")
+    if STABILITY_API_KEY:
+        parts.append("stability")
+    if HF_TOKEN:
+        parts.append(f"hf={HF_MODEL}")
+    if STABLE_HORDE_KEY:
+        parts.append("stable_horde")
+    parts += ["pollinations", "openverse"]
+    return "|".join(parts)
+
 
 async def generate_design_image(
     prompt: str,
@@ -37,85 +76,229 @@ async def generate_design_image(
     cfg: float = 7.0,
     steps: int = 20,
     seed: int = 42,
+    width: int = 1024,
+    height: int = 1024,
     control_image_b64: Optional[str] = None,
 ) -> dict:
     """Generate an AI reference image from a text prompt.
 
     Priority order:
       ComfyUI (local) → Stability AI → Pollinations.ai → placeholder
+
+    Results are served from the durable generation cache when the same
+    inputs were generated before.
     """
     enhanced_prompt = _enhance_prompt(prompt, style)
 
+    cache = get_generation_cache()
+    if cache is None:
+        return await _generate_uncached(
+            prompt, style, enhanced_prompt, cfg, steps, seed, width, height, control_image_b64
+        )
+
+    key = generation_key(
+        enhanced_prompt,
+        backend=_backend_chain(),
+        cfg=cfg,
+        steps=steps,
+        seed=seed,
+        width=width,
+        height=height,
+        control_image_b64=control_image_b64,
+    )
+    cached = await cache.get(key)
+    if cached is not None:
+        logger.info("Generation cache hit (%s)", cached.get("method"))
+        url = cached.get("image_url") or ""
+        cached["image_base64"] = url.split(",", 1)[1] if url.startswith("data:") else None
+        return cached
+
+    result = await _generate_uncached(
+        prompt, style, enhanced_prompt, cfg, steps, seed, width, height, control_image_b64
+    )
+    if is_generated_image(result):
+        await cache.put(key, result)
+    return result
+
+
+async def _generate_uncached(
+    prompt: str,
+    style: str,
+    enhanced_prompt: str,
+    cfg: float,
+    steps: int,
+    seed: int,
+    width: int,
+    height: int,
+    control_image_b64: Optional[str],
+) -> dict:
+    """Run the backend priority chain with hedging; SVG if nothing answers."""
+    health = get_health_registry()
+    attempts = dict(
+        _backend_attempts(
+            style, enhanced_prompt, cfg, steps, seed, width, height, control_image_b64
+        )
+    )
+    # Generators are reordered by observed latency; the image search stays last
+    names = health.order([n for n in attempts if n not in _PINNED_LAST])
+    names += [n for n in attempts if n in _PINNED_LAST]
+    result = await _hedged(
+        [(n, attempts[n]) for n in names],
+        settings.IMAGE_HEDGE_DELAY_SECONDS,
+        health,
+        max_running=settings.IMAGE_HEDGE_MAX_RUNNING,
+    )
+    if result is not None:
+        return result
+
+    # Local SVG fallback (last resort), labelled with the prompt's subject
+    logger.info("All image sources failed — generating local SVG")
+    return _svg_result(enhanced_prompt, _prompt_keywords(enhanced_prompt))
+
+
+def _backend_attempts(
+    style: str,
+    enhanced_prompt: str,
+    cfg: float,
+    steps: int,
+    seed: int,
+    width: int,
+    height: int,
+    control_image_b64: Optional[str],
+) -> list[tuple[str, Callable[[], Awaitable[dict]]]]:
+    """Configured backends in priority order, as (name, start) pairs."""
+    attempts: list[tuple[str, Callable[[], Awaitable[dict]]]] = []
+
     # 1. ComfyUI (local SDXL) — preferred when available
     if COMFYUI_URL:
-        from app.services.comfyui_generator import generate_via_comfyui, is_comfyui_available
-        if await is_comfyui_available():
+        async def _comfyui() -> dict:
+            from app.services.comfyui_generator import generate_via_comfyui, is_comfyui_available
+            if not await get_health_registry().probe("comfyui", is_comfyui_available):
+                return {}
             logger.info("Using ComfyUI at %s", COMFYUI_URL)
-            result = await generate_via_comfyui(
+            return await generate_via_comfyui(
                 enhanced_prompt,
                 cfg=cfg,
                 steps=steps,
                 seed=seed,
+                width=width,
+                height=height,
                 control_image_b64=control_image_b64,
             )
-            if result.get("image_url"):
-                return result
-            logger.warning("ComfyUI returned no image, falling through")
+        attempts.append(("comfyui", _comfyui))
 
     # 2. Stability AI (cloud)
     if STABILITY_API_KEY:
-        return await _generate_via_stability(enhanced_prompt)
+        attempts.append(("stability", lambda: _generate_via_stability(enhanced_prompt)))
 
     # 3. HuggingFace Inference API (free with free token)
     if HF_TOKEN:
-        logger.info("Using HuggingFace Inference API (%s)", HF_MODEL)
-        result = await _hf_inference_result(enhanced_prompt)
-        if result.get("image_url"):
-            return result
+        attempts.append(("huggingface", lambda: _hf_inference_result(enhanced_prompt)))
 
     # 4. Stable Horde (registered account only — anonymous queue is ~2h)
     if STABLE_HORDE_KEY:
-        logger.info("Using Stable Horde")
-        result = await _stable_horde_result(enhanced_prompt)
-        if result.get("image_url"):
-            return result
+        attempts.append(("stable_horde", lambda: _stable_horde_result(enhanced_prompt)))
 
     # 5. Pollinations.ai — free AI image generation (no API key needed)
-    logger.info("Using Pollinations.ai (free, no API key needed)")
-    result = await _pollinations_fetch(enhanced_prompt)
-    if result.get("image_url"):
-        return result
+    attempts.append(("pollinations", lambda: _pollinations_fetch(enhanced_prompt)))
 
-    # 6. Openverse — open-licensed image search (fallback when Pollinations fails)
+    # 6. Openverse — open-licensed image search
     # enhanced_prompt is already in English (Korean translated), so results are relevant
-    logger.info("Pollinations failed — falling back to Openverse")
-    result = await _openverse_fetch(enhanced_prompt, style)
-    if result.get("image_url"):
-        return result
+    attempts.append(("openverse", lambda: _openverse_fetch(enhanced_prompt, style)))
+    return attempts
 
-    # 7. Local SVG fallback (last resort)
-    logger.info("All image sources failed — generating local SVG")
-    return _svg_result(prompt, [])
+
+def is_generated_image(result: object) -> bool:
+    """Whether a result is a real image, not the SVG/placeholder fallback."""
+    return (
+        isinstance(result, dict)
+        and bool(result.get("image_url"))
+        and result.get("method") not in _UNCACHEABLE_METHODS
+    )
+
+
+async def _hedged(
+    attempts: list[tuple[str, Callable[[], Awaitable[dict]]]],
+    hedge_delay: float,
+    health: HealthRegistry | None = None,
+    *,
+    max_running: int = 2,
+) -> dict | None:
+    """Return the first acceptable image from a hedged run of `attempts`.
+
+    The first backend starts immediately. The next one is started when every
+    running backend has failed, or when the newest running backend has not
+    answered within its hedge delay, while fewer than `max_running` backends
+    are running. The first acceptable image wins and the remaining requests
+    are cancelled. Returns None if all backends fail.
+
+    The hedge delay is `hedge_delay` seconds. With a health registry it is
+    derived from the backend's observed latency instead, once there is one.
+    Backends whose circuit breaker is open are skipped and every outcome is
+    recorded.
+    """
+    loop = asyncio.get_running_loop()
+    running: dict[asyncio.Task, tuple[str, float]] = {}
+    remaining = list(attempts)
+    newest: tuple[str, float] | None = None  # (name, hedge deadline)
+
+    def _launch_next() -> None:
+        nonlocal newest
+        while remaining:
+            name, start = remaining.pop(0)
+            if health is not None and not health.allow(name):
+                logger.info("Skipping image backend %s (circuit open)", name)
+                continue
+            logger.info("Starting image backend %s", name)
+            now = loop.time()
+            running[asyncio.ensure_future(start())] = (name, now)
+            delay = health.hedge_delay(name, hedge_delay) if health is not None else hedge_delay
+            newest = (name, now + delay)
+            return
+
+    try:
+        while remaining or running:
+            if not running:
+                _launch_next()
+                if not running:
+                    break
+            can_hedge = remaining and len(running) < max_running
+            done, _ = await asyncio.wait(
+                running,
+                timeout=max(0.0, newest[1] - loop.time()) if can_hedge else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                logger.info(
+                    "No image from %s in time, hedging with %s", newest[0], remaining[0][0]
+                )
+                _launch_next()
+                continue
+            for task in done:
+                name, started = running.pop(task)
+                if task.exception() is None and is_generated_image(task.result()):
+                    if health is not None:
+                        health.record_success(name, loop.time() - started)
+                    return task.result()
+                if task.exception() is not None:
+                    logger.warning("Image backend %s failed: %s", name, task.exception())
+                else:
+                    logger.warning("Image backend %s returned no usable image", name)
+                if health is not None:
+                    health.record_failure(name)
+        return None
+    finally:
+        for task, (name, started) in running.items():
+            task.cancel()
+            if health is not None:
+                health.record_cancelled(name, loop.time() - started)
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
 
 
 def _translate_ko_to_en(text: str) -> str:
     """Replace Korean words in text with English equivalents before sending to AI models."""
-    import re as _re
-    from app.services.profile_generator import _KO_EN_MAP
-
-    ko_words = _re.findall(r"[가-힣]+", text)
-    result = text
-    # Longer matches first to avoid partial replacements (e.g. "강아지" before "강아")
-    for kw in sorted(set(ko_words), key=len, reverse=True):
-        en = _KO_EN_MAP.get(kw)
-        if not en:
-            for ko, en_val in _KO_EN_MAP.items():
-                if ko in kw or kw in ko:
-                    en = en_val
-                    break
-        if en:
-            result = result.replace(kw, en)
-    return result
+    return translate_text(text)
 
 
 def _enhance_prompt(prompt: str, style: str) -> str:
@@ -138,50 +321,51 @@ def _enhance_prompt(prompt: str, style: str) -> str:
 
 
 async def _generate_via_stability(prompt: str) -> dict:
-    """Call Stability AI API to generate image."""
+    """Call Stability AI API to generate image; {} on failure (the chain moves on)."""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                STABILITY_API_URL,
-                headers={
-                    "Authorization": f"Bearer {STABILITY_API_KEY}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                },
-                json={
-                    "text_prompts": [
-                        {"text": prompt, "weight": 1.0},
-                        {"text": "blurry, low quality, text, watermark", "weight": -1.0},
-                    ],
-                    "cfg_scale": 7,
-                    "width": 512,
-                    "height": 512,
-                    "steps": 30,
-                    "samples": 1,
-                },
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                artifacts = data.get("artifacts", [])
-                if artifacts:
-                    img_b64 = artifacts[0]["base64"]
-                    return {
-                        "image_base64": img_b64,
-                        "image_url": f"data:image/png;base64,{img_b64}",
-                        "method": "stability_api",
-                    }
+        client = get_http_client()
+        response = await client.post(
+            STABILITY_API_URL,
+            timeout=30.0,
+            headers={
+                "Authorization": f"Bearer {STABILITY_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+            json={
+                "text_prompts": [
+                    {"text": prompt, "weight": 1.0},
+                    {"text": "blurry, low quality, text, watermark", "weight": -1.0},
+                ],
+                "cfg_scale": 7,
+                "width": 512,
+                "height": 512,
+                "steps": 30,
+                "samples": 1,
+            },
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            artifacts = data.get("artifacts", [])
+            if artifacts:
+                img_b64 = artifacts[0]["base64"]
+                return {
+                    "image_base64": img_b64,
+                    "image_url": f"data:image/png;base64,{img_b64}",
+                    "method": "stability_api",
+                }
 
-            logger.warning(
-                "Stability API returned %d: %s",
-                response.status_code,
-                response.text[:200],
-            )
-            return await _pollinations_fetch(prompt)
+        logger.warning(
+            "Stability API returned %d: %s",
+            response.status_code,
+            response.text[:200],
+        )
+        return {}
 
     except Exception as e:
         logger.error("Stability API error: %s", e)
-        return await _pollinations_fetch(prompt)
+        return {}
 
 
 async def _pollinations_fetch(prompt: str, style: str = "design-asset") -> dict:
@@ -192,9 +376,7 @@ async def _pollinations_fetch(prompt: str, style: str = "design-asset") -> dict:
       2. Top 4 keywords joined
       3. Individual keywords as fallback
     """
-    import re
     import base64
-    from app.services.profile_generator import _KO_EN_MAP
 
     _SUFFIX_NOISE = {
         "professional", "asset", "background", "high", "quality",
@@ -203,20 +385,14 @@ async def _pollinations_fetch(prompt: str, style: str = "design-asset") -> dict:
     }
 
     # Build English keyword list from prompt
-    en_words = re.findall(r"[a-zA-Z]+", prompt)
+    en_words = _en_words(prompt)
     label_words = [w for w in en_words if w.lower() not in _SUFFIX_NOISE]
 
     # Translate Korean words to English
-    ko_words = re.findall(r"[가-힣]+", prompt)
-    for kw in ko_words:
-        en = _KO_EN_MAP.get(kw)
+    for kw in ko_words(prompt):
+        en = translate_word(kw)
         if en:
             label_words.append(en)
-        else:
-            for ko, en_val in _KO_EN_MAP.items():
-                if ko in kw or kw in ko:
-                    label_words.append(en_val)
-                    break
 
     # Deduplicate while preserving order
     seen: set[str] = set()
@@ -236,66 +412,69 @@ async def _pollinations_fetch(prompt: str, style: str = "design-asset") -> dict:
     else:
         candidates.append(prompt)
 
-    async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-        for candidate in candidates:
-            encoded = quote(candidate)
-            # nologo=true removes watermark; model=flux gives best design quality
-            urls_to_try = [
-                f"https://image.pollinations.ai/prompt/{encoded}?model=flux&width=512&height=512&nologo=true",
-                f"https://image.pollinations.ai/prompt/{encoded}?width=512&height=512&nologo=true",
-                f"https://image.pollinations.ai/prompt/{encoded}",
-            ]
-            for url in urls_to_try:
-                try:
-                    resp = await client.get(url)
-                    if (resp.status_code == 200
-                            and "image" in resp.headers.get("content-type", "")
-                            and len(resp.content) > 1000):
-                        img_b64 = base64.b64encode(resp.content).decode()
-                        ct = resp.headers.get("content-type", "image/jpeg").split(";")[0]
-                        logger.info("Pollinations.ai OK for '%s' (%d bytes)", candidate, len(resp.content))
-                        return {
-                            "image_base64": img_b64,
-                            "image_url": f"data:{ct};base64,{img_b64}",
-                            "method": "pollinations_ai",
-                        }
-                    logger.warning("Pollinations.ai: %d for '%s'", resp.status_code, candidate)
-                    if resp.status_code != 530:
-                        break  # Non-530 errors won't be fixed by trying another URL
-                except Exception as exc:
-                    logger.warning("Pollinations.ai error for '%s': %s", candidate, exc)
-                    break
+    client = get_http_client()
+    for candidate in candidates:
+        encoded = quote(candidate)
+        # nologo=true removes watermark; model=flux gives best design quality
+        urls_to_try = [
+            f"https://image.pollinations.ai/prompt/{encoded}?model=flux&width=512&height=512&nologo=true",
+            f"https://image.pollinations.ai/prompt/{encoded}?width=512&height=512&nologo=true",
+            f"https://image.pollinations.ai/prompt/{encoded}",
+        ]
+        for url in urls_to_try:
+            try:
+                resp = await client.get(url, timeout=30.0, follow_redirects=True)
+                if (resp.status_code == 200
+                        and "image" in resp.headers.get("content-type", "")
+                        and len(resp.content) > 1000):
+                    img_b64 = base64.b64encode(resp.content).decode()
+                    ct = resp.headers.get("content-type", "image/jpeg").split(";")[0]
+                    logger.info("Pollinations.ai OK for '%s' (%d bytes)", candidate, len(resp.content))
+                    return {
+                        "image_base64": img_b64,
+                        "image_url": f"data:{ct};base64,{img_b64}",
+                        "method": "pollinations_ai",
+                    }
+                logger.warning("Pollinations.ai: %d for '%s'", resp.status_code, candidate)
+                if resp.status_code != 530:
+                    break  # Non-530 errors won't be fixed by trying another URL
+            except Exception as exc:
+                logger.warning("Pollinations.ai error for '%s': %s", candidate, exc)
+                break
 
     # All Pollinations attempts failed — let caller try next source
     logger.info("Pollinations unavailable — returning empty for next fallback")
     return {}
 
 
+# Style-suffix words added by _enhance_prompt; not the subject of the image
+_NOISE = {
+    "professional", "asset", "clean", "high", "quality", "vector",
+    "style", "digital", "vibrant", "colors", "interface", "figma",
+    "solid", "lines", "white", "design", "background",
+}
+
+
+def _prompt_keywords(prompt: str) -> list[str]:
+    """English subject words of an enhanced prompt (Openverse query, SVG label)."""
+    en_words = [w for w in _en_words(prompt) if w.lower() not in _NOISE]
+    for kw in ko_words(prompt):
+        en = lookup(kw)
+        if en:
+            en_words.append(en)
+    return en_words
+
+
 async def _openverse_fetch(prompt: str, style: str = "design-asset") -> dict:
     """Fetch a relevant open-licensed image from Openverse (free, no API key).
 
     Openverse indexes CC-licensed images from Wikipedia, Flickr, etc.
     Falls back to local SVG if no results found.
     """
-    import re as _re
     import base64
-    from app.services.profile_generator import _KO_EN_MAP
 
     # Build English query from prompt
-    en_words = _re.findall(r"[a-zA-Z]+", prompt)
-    _NOISE = {
-        "professional", "asset", "clean", "high", "quality", "vector",
-        "style", "digital", "vibrant", "colors", "interface", "figma",
-        "solid", "lines", "white", "design", "background",
-    }
-    en_words = [w for w in en_words if w.lower() not in _NOISE]
-
-    ko_words = _re.findall(r"[가-힣]+", prompt)
-    for kw in ko_words:
-        en = _KO_EN_MAP.get(kw)
-        if en:
-            en_words.append(en)
-
+    en_words = _prompt_keywords(prompt)
     if not en_words:
         return _svg_result(prompt, [])
 
@@ -307,41 +486,41 @@ async def _openverse_fetch(prompt: str, style: str = "design-asset") -> dict:
 
     headers = {"User-Agent": "FMD-Portfolio/1.0 (design-search-demo)"}
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for q in queries:
-            try:
-                resp = await client.get(
-                    "https://api.openverse.org/v1/images/",
-                    params={"q": q, "page_size": 5, "license_type": "commercial,modification"},
-                    headers=headers,
-                )
-                if resp.status_code == 200:
-                    results = resp.json().get("results", [])
-                    # Prefer images that have actual thumbnail URLs
-                    for item in results:
-                        img_url = (
-                            item.get("thumbnail")
-                            or item.get("url")
-                        )
-                        if img_url and img_url.startswith("http"):
-                            # Fetch and encode as base64
-                            try:
-                                img_resp = await client.get(img_url)
-                                if (img_resp.status_code == 200
-                                        and "image" in img_resp.headers.get("content-type", "")
-                                        and len(img_resp.content) > 500):
-                                    img_b64 = base64.b64encode(img_resp.content).decode()
-                                    ct = img_resp.headers.get("content-type", "image/jpeg").split(";")[0]
-                                    logger.info("Openverse OK for '%s' (%d bytes)", q, len(img_resp.content))
-                                    return {
-                                        "image_base64": img_b64,
-                                        "image_url": f"data:{ct};base64,{img_b64}",
-                                        "method": "openverse",
-                                    }
-                            except Exception:
-                                continue
-            except Exception as exc:
-                logger.warning("Openverse error for '%s': %s", q, exc)
+    client = get_http_client()
+    for q in queries:
+        try:
+            resp = await client.get(
+                "https://api.openverse.org/v1/images/",
+                params={"q": q, "page_size": 5, "license_type": "commercial,modification"},
+                headers=headers,
+            )
+            if resp.status_code == 200:
+                results = resp.json().get("results", [])
+                # Prefer images that have actual thumbnail URLs
+                for item in results:
+                    img_url = (
+                        item.get("thumbnail")
+                        or item.get("url")
+                    )
+                    if img_url and img_url.startswith("http"):
+                        # Fetch and encode as base64
+                        try:
+                            img_resp = await client.get(img_url)
+                            if (img_resp.status_code == 200
+                                    and "image" in img_resp.headers.get("content-type", "")
+                                    and len(img_resp.content) > 500):
+                                img_b64 = base64.b64encode(img_resp.content).decode()
+                                ct = img_resp.headers.get("content-type", "image/jpeg").split(";")[0]
+                                logger.info("Openverse OK for '%s' (%d bytes)", q, len(img_resp.content))
+                                return {
+                                    "image_base64": img_b64,
+                                    "image_url": f"data:{ct};base64,{img_b64}",
+                                    "method": "openverse",
+                                }
+                        except Exception:
+                            continue
+        except Exception as exc:
+            logger.warning("Openverse error for '%s': %s", q, exc)
 
     logger.info("Openverse: no results — falling back to local SVG")
     return _svg_result(prompt, en_words)
@@ -382,22 +561,22 @@ async def _dicebear_fetch(keywords: list[str]) -> dict:
     # 'shapes' gives clean geometric design visuals; 'icons' gives icon-style output
     styles = ["shapes", "icons"]
     try:
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            for style in styles:
-                url = (
-                    f"https://api.dicebear.com/9.x/{style}/svg"
-                    f"?seed={quote(seed)}&size=512&radius=12"
-                )
-                resp = await client.get(url)
-                if resp.status_code == 200 and len(resp.content) > 200:
-                    img_b64 = base64.b64encode(resp.content).decode()
-                    logger.info("DiceBear OK (%s, seed=%s)", style, seed)
-                    return {
-                        "image_base64": img_b64,
-                        "image_url": f"data:image/svg+xml;base64,{img_b64}",
-                        "method": "dicebear",
-                    }
-                logger.warning("DiceBear: %d for style=%s", resp.status_code, style)
+        client = get_http_client()
+        for style in styles:
+            url = (
+                f"https://api.dicebear.com/9.x/{style}/svg"
+                f"?seed={quote(seed)}&size=512&radius=12"
+            )
+            resp = await client.get(url, follow_redirects=True)
+            if resp.status_code == 200 and len(resp.content) > 200:
+                img_b64 = base64.b64encode(resp.content).decode()
+                logger.info("DiceBear OK (%s, seed=%s)", style, seed)
+                return {
+                    "image_base64": img_b64,
+                    "image_url": f"data:image/svg+xml;base64,{img_b64}",
+                    "method": "dicebear",
+                }
+            logger.warning("DiceBear: %d for style=%s", resp.status_code, style)
     except Exception as exc:
         logger.warning("DiceBear error: %s", exc)
     return {}
@@ -411,25 +590,26 @@ async def _hf_inference_result(prompt: str) -> dict:
     """
     import base64
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(
-                f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}",
-                headers={
-                    "Authorization": f"Bearer {HF_TOKEN}",
-                    "Content-Type": "application/json",
-                },
-                json={"inputs": prompt},
-            )
-            if resp.status_code == 200 and "image" in resp.headers.get("content-type", ""):
-                img_b64 = base64.b64encode(resp.content).decode()
-                ct = resp.headers.get("content-type", "image/jpeg").split(";")[0]
-                return {
-                    "image_base64": img_b64,
-                    "image_url": f"data:{ct};base64,{img_b64}",
-                    "method": "huggingface",
-                    "model": HF_MODEL,
-                }
-            logger.warning("HuggingFace returned %d: %s", resp.status_code, resp.text[:100])
+        client = get_http_client()
+        resp = await client.post(
+            f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}",
+            timeout=60.0,
+            headers={
+                "Authorization": f"Bearer {HF_TOKEN}",
+                "Content-Type": "application/json",
+            },
+            json={"inputs": prompt},
+        )
+        if resp.status_code == 200 and "image" in resp.headers.get("content-type", ""):
+            img_b64 = base64.b64encode(resp.content).decode()
+            ct = resp.headers.get("content-type", "image/jpeg").split(";")[0]
+            return {
+                "image_base64": img_b64,
+                "image_url": f"data:{ct};base64,{img_b64}",
+                "method": "huggingface",
+                "model": HF_MODEL,
+            }
+        logger.warning("HuggingFace returned %d: %s", resp.status_code, resp.text[:100])
     except Exception as exc:
         logger.error("HuggingFace error: %s", exc)
     return {}
@@ -443,25 +623,26 @@ async def _stable_horde_result(prompt: str, timeout: float = 120.0) -> dict:
     """
     headers = {"apikey": STABLE_HORDE_KEY, "Content-Type": "application/json"}
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(
-                f"{STABLE_HORDE_URL}/generate/async",
-                headers=headers,
-                json={
-                    "prompt": prompt,
-                    "params": {
-                        "width": 512,
-                        "height": 512,
-                        "steps": 20,
-                        "cfg_scale": 7,
-                        "sampler_name": "k_dpmpp_2m",
-                    },
-                    "models": ["stable_diffusion"],
-                    "r2": False,
-                    "nsfw": False,
-                    "censor_nsfw": True,
+        client = get_http_client()
+        resp = await client.post(
+            f"{STABLE_HORDE_URL}/generate/async",
+            headers=headers,
+            timeout=15.0,
+            json={
+                "prompt": prompt,
+                "params": {
+                    "width": 512,
+                    "height": 512,
+                    "steps": 20,
+                    "cfg_scale": 7,
+                    "sampler_name": "k_dpmpp_2m",
                 },
-            )
+                "models": ["stable_diffusion"],
+                "r2": False,
+                "nsfw": False,
+                "censor_nsfw": True,
+            },
+        )
         if resp.status_code != 202:
             logger.warning("Stable Horde queue failed: %d", resp.status_code)
             return {}
@@ -473,34 +654,36 @@ async def _stable_horde_result(prompt: str, timeout: float = 120.0) -> dict:
 
     # Poll until done
     deadline = asyncio.get_event_loop().time() + timeout
-    async with httpx.AsyncClient(timeout=15.0) as client:
-        while asyncio.get_event_loop().time() < deadline:
-            await asyncio.sleep(5.0)
-            try:
-                check = await client.get(
-                    f"{STABLE_HORDE_URL}/generate/check/{job_id}",
+    client = get_http_client()
+    while asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(5.0)
+        try:
+            check = await client.get(
+                f"{STABLE_HORDE_URL}/generate/check/{job_id}",
+                headers=headers,
+                timeout=15.0,
+            )
+            check_data = check.json()
+            wait_time = check_data.get("wait_time", "?")
+            logger.info("Stable Horde wait_time=%s done=%s", wait_time, check_data.get("done"))
+            if check_data.get("done"):
+                status = await client.get(
+                    f"{STABLE_HORDE_URL}/generate/status/{job_id}",
                     headers=headers,
+                    timeout=15.0,
                 )
-                check_data = check.json()
-                wait_time = check_data.get("wait_time", "?")
-                logger.info("Stable Horde wait_time=%s done=%s", wait_time, check_data.get("done"))
-                if check_data.get("done"):
-                    status = await client.get(
-                        f"{STABLE_HORDE_URL}/generate/status/{job_id}",
-                        headers=headers,
-                    )
-                    gens = status.json().get("generations", [])
-                    if gens:
-                        img_b64 = gens[0].get("img", "")
-                        if img_b64:
-                            return {
-                                "image_base64": img_b64,
-                                "image_url": f"data:image/webp;base64,{img_b64}",
-                                "method": "stable_horde",
-                            }
-                    break
-            except Exception as exc:
-                logger.warning("Stable Horde poll error: %s", exc)
+                gens = status.json().get("generations", [])
+                if gens:
+                    img_b64 = gens[0].get("img", "")
+                    if img_b64:
+                        return {
+                            "image_base64": img_b64,
+                            "image_url": f"data:image/webp;base64,{img_b64}",
+                            "method": "stable_horde",
+                        }
+                break
+        except Exception as exc:
+            logger.warning("Stable Horde poll error: %s", exc)
 
     logger.warning("Stable Horde timed out or returned no image")
     return {}
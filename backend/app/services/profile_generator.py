@@ -3,65 +3,20 @@
 Supports both text prompt analysis and canvas image analysis.
 Handles Korean input by translating keywords to English for marketplace search.
 """
-import base64
+import copy
 import hashlib
-import io
-import re
-from collections import Counter
-
-
-# Korean → English translation map for common design/general terms
-_KO_EN_MAP = {
-    # Animals
-    "고양이": "cat", "강아지": "dog", "개": "dog", "새": "bird", "나비": "butterfly",
-    "물고기": "fish", "토끼": "rabbit", "곰": "bear", "사자": "lion", "호랑이": "tiger",
-    "말": "horse", "용": "dragon", "여우": "fox", "늑대": "wolf", "펭귄": "penguin",
-    # Nature
-    "꽃": "flower", "나무": "tree", "숲": "forest", "산": "mountain", "바다": "ocean",
-    "하늘": "sky", "별": "star", "달": "moon", "해": "sun", "구름": "cloud",
-    "비": "rain", "눈": "snow", "강": "river", "호수": "lake", "잎": "leaf",
-    # Design terms
-    "로고": "logo", "아이콘": "icon", "배너": "banner", "포스터": "poster",
-    "카드": "card", "버튼": "button", "배경": "background", "패턴": "pattern",
-    "일러스트": "illustration", "캐릭터": "character", "그래픽": "graphic",
-    "타이포": "typography", "레이아웃": "layout", "웹": "web", "앱": "app",
-    "모바일": "mobile", "대시보드": "dashboard", "디자인": "design",
-    "미니멀": "minimal", "모던": "modern", "빈티지": "vintage", "레트로": "retro",
-    "플랫": "flat", "심플": "simple", "귀여운": "cute", "귀엽다": "cute",
-    "깔끔한": "clean", "세련된": "elegant", "고급": "premium", "럭셔리": "luxury",
-    # Objects
-    "집": "house", "건물": "building", "차": "car", "자동차": "car",
-    "음식": "food", "커피": "coffee", "책": "book", "음악": "music",
-    "카메라": "camera", "전화": "phone", "컴퓨터": "computer", "게임": "game",
-    "하트": "heart", "사랑": "love", "사람": "person", "얼굴": "face",
-    "악기": "instrument", "기타": "guitar", "피아노": "piano", "드럼": "drum",
-    "바이올린": "violin", "트럼펫": "trumpet", "플루트": "flute",
-    "시계": "clock", "꽃병": "vase", "의자": "chair", "테이블": "table",
-    "가방": "bag", "신발": "shoes", "옷": "clothing", "모자": "hat",
-    "태양": "sun", "화살표": "arrow", "체크": "check", "별표": "asterisk",
-    "스포츠": "sports", "축구": "soccer", "농구": "basketball", "야구": "baseball",
-    "여행": "travel", "지도": "map", "비행기": "airplane", "기차": "train",
-    "의료": "medical", "건강": "health", "교육": "education", "학교": "school",
-    # Colors (adjective form — for use in image prompts)
-    "빨간": "red", "빨강": "red", "빨간색": "red",
-    "파란": "blue", "파랑": "blue", "파란색": "blue",
-    "초록": "green", "녹색": "green", "초록색": "green",
-    "노란": "yellow", "노랑": "yellow", "노란색": "yellow",
-    "보라": "purple", "보라색": "purple",
-    "검정": "black", "검은": "black", "검은색": "black", "검정색": "black",
-    "흰": "white", "하얀": "white", "흰색": "white", "하얀색": "white",
-    "분홍": "pink", "분홍색": "pink",
-    "주황": "orange", "주황색": "orange",
-    "갈색": "brown",
-    "회색": "gray", "회색빛": "gray",
-    # Style/mood
-    "따뜻한": "warm", "차가운": "cool", "밝은": "bright", "어두운": "dark",
-    "부드러운": "soft", "강한": "bold", "재미있는": "fun", "전문적": "professional",
-    "자연": "nature", "추상": "abstract", "기하학": "geometric",
-    # Categories
-    "사진": "photo", "그림": "painting", "스케치": "sketch", "만화": "cartoon",
-    "애니": "anime", "수채화": "watercolor", "벡터": "vector", "입체": "3d",
-}
+from collections import OrderedDict
+
+from app.core.config import settings
+from app.core.text import is_english, is_korean, tokenize
+from app.services.canvas_analysis import (
+    CanvasAnalysis,
+    analyze_canvas,
+    analyze_canvas_async,
+    canvas_sha256,
+)
+from app.services.translation import lookup, translate_word
+
 
 # Korean stopwords
 _KO_STOPWORDS = {
@@ -79,21 +34,145 @@ _EN_STOPWORDS = {
 }
 
 
+class ProfileMemo:
+    """Bounded LRU of computed profiles, keyed by normalised input.
+
+    generate_profile is pure, and repeat prompts dominate traffic. Keys are
+    (whitespace-collapsed lowercase text, lowercase category, canvas
+    SHA-256): every derived field is invariant under that normalisation, and
+    the verbatim source_text/category are put back on each hit.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(entry)
+
+    def put(self, key: tuple, profile: dict) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = copy.deepcopy(profile)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+profile_memo = ProfileMemo(settings.PROFILE_MEMO_SIZE)
+
+
+def _memo_key(
+    text_prompt: str | None,
+    category: str | None,
+    canvas_data: str | None,
+    canvas: CanvasAnalysis | None,
+    image_sha256: str | None,
+) -> tuple:
+    if image_sha256 is None:
+        if canvas_data:
+            image_sha256 = canvas_sha256(canvas_data)
+        elif canvas is not None:
+            image_sha256 = canvas.sha256
+    text = " ".join(text_prompt.lower().split()) if text_prompt else None
+    return (text, category.lower() if category else None, image_sha256)
+
+
+def _with_source(profile: dict, text_prompt: str | None, category: str | None) -> dict:
+    profile["profile"]["source_text"] = text_prompt
+    profile["profile"]["category"] = category
+    return profile
+
+
 def generate_profile(
     text_prompt: str | None,
     category: str | None,
     canvas_data: str | None = None,
+    *,
+    canvas: CanvasAnalysis | None = None,
+    image_sha256: str | None = None,
+) -> dict:
+    """Return a dict with profile data from text and/or canvas.
+
+    Pass `canvas` when the canvas was already analysed; otherwise
+    `canvas_data` is analysed here. `image_sha256` (Design.input_image_sha256)
+    saves hashing the canvas for the memo key.
+    """
+    key = _memo_key(text_prompt, category, canvas_data, canvas, image_sha256)
+    cached = profile_memo.get(key)
+    if cached is not None:
+        return _with_source(cached, text_prompt, category)
+    profile = _compute_profile(text_prompt, category, canvas_data, canvas)
+    profile_memo.put(key, profile)
+    return profile
+
+
+async def generate_profile_async(
+    text_prompt: str | None,
+    category: str | None,
+    canvas_data: str | None = None,
+    *,
+    canvas: CanvasAnalysis | None = None,
+    image_sha256: str | None = None,
+) -> dict:
+    """generate_profile without blocking the event loop.
+
+    Memo hits return immediately. Otherwise canvas analysis (image decode +
+    pixel quantisation) runs in the CPU pool and the rest inline.
+    """
+    key = _memo_key(text_prompt, category, canvas_data, canvas, image_sha256)
+    cached = profile_memo.get(key)
+    if cached is not None:
+        return _with_source(cached, text_prompt, category)
+    if canvas is None and canvas_data:
+        canvas = await analyze_canvas_async(canvas_data)
+    profile = _compute_profile(text_prompt, category, canvas_data, canvas)
+    profile_memo.put(key, profile)
+    return profile
+
+
+def _compute_profile(
+    text_prompt: str | None,
+    category: str | None,
+    canvas_data: str | None,
+    canvas: CanvasAnalysis | None,
 ) -> dict:
-    """Return a dict with profile data from text and/or canvas."""
     keywords = _extract_keywords(text_prompt)
     dominant_color = _guess_color_from_text(text_prompt)
+    palette = None
 
-    if canvas_data:
-        canvas_color = _extract_dominant_color_from_canvas(canvas_data)
-        if canvas_color:
-            dominant_color = canvas_color
-        canvas_keywords = _extract_canvas_keywords(canvas_data)
-        keywords.extend(canvas_keywords)
+    if canvas is None and canvas_data:
+        canvas = analyze_canvas(canvas_data)
+    if canvas_data or canvas is not None:
+        colors = canvas.colors if canvas else None
+        if colors and colors.dominant:
+            dominant_color = colors.dominant
+            palette = [{"hex": c.hex, "proportion": c.proportion} for c in colors.palette]
+        keywords.extend(_extract_canvas_keywords(canvas))
 
     if category:
         keywords.append(category.lower())
@@ -109,7 +188,9 @@ def generate_profile(
         "profile": {
             "source_text": text_prompt,
             "category": category,
-            "has_canvas": canvas_data is not None,
+            "has_canvas": canvas_data is not None or canvas is not None,
+            "palette": palette,
+            "canvas": canvas.summary() if canvas else None,
         },
         "keywords": keywords,
         "negative_keywords": [],
@@ -122,7 +203,7 @@ def _extract_keywords(text: str | None) -> list[str]:
         return []
 
     # Extract both English and Korean words
-    words = re.findall(r"[a-zA-Z]+|[가-힣]+", text.lower())
+    words = tokenize(text, min_len=1, hangul=True, intern=True)
 
     result = []
     for w in words:
@@ -132,8 +213,8 @@ def _extract_keywords(text: str | None) -> list[str]:
             continue
 
         # Translate Korean to English if possible
-        if re.match(r"[가-힣]", w):
-            en = _KO_EN_MAP.get(w)
+        if is_korean(w):
+            en = lookup(w)
             if en:
                 result.append(en)
             # Also keep the Korean word for color matching etc.
@@ -142,14 +223,13 @@ def _extract_keywords(text: str | None) -> list[str]:
             result.append(w)
 
     # If all keywords are Korean with no translations, try substring matching
-    en_words = [w for w in result if re.match(r"[a-zA-Z]", w)]
+    en_words = [w for w in result if is_english(w)]
     if not en_words:
         for w in words:
-            if re.match(r"[가-힣]", w):
-                for ko, en in _KO_EN_MAP.items():
-                    if ko in w or w in ko:
-                        result.append(en)
-                        break
+            if is_korean(w):
+                en = translate_word(w)
+                if en:
+                    result.append(en)
 
     return list(dict.fromkeys(result))  # dedupe preserving order
 
@@ -182,41 +262,11 @@ def _guess_color_from_text(text: str | None) -> str | None:
     return None
 
 
-def _extract_dominant_color_from_canvas(canvas_data: str) -> str | None:
-    """Extract dominant color from base64 canvas PNG data using Pillow."""
-    try:
-        from PIL import Image
-
-        if "," in canvas_data:
-            canvas_data = canvas_data.split(",", 1)[1]
-
-        img_bytes = base64.b64decode(canvas_data)
-        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-
-        pixels = list(img.getdata())
-        non_white = [(r, g, b) for r, g, b in pixels if not (r > 240 and g > 240 and b > 240)]
-
-        if not non_white:
-            return None
-
-        quantized = [
-            (r // 32 * 32, g // 32 * 32, b // 32 * 32)
-            for r, g, b in non_white
-        ]
-        counter = Counter(quantized)
-        most_common = counter.most_common(1)[0][0]
-
-        return f"#{most_common[0]:02x}{most_common[1]:02x}{most_common[2]:02x}"
-
-    except Exception:
-        return None
-
-
-def _extract_canvas_keywords(canvas_data: str) -> list[str]:
+def _extract_canvas_keywords(canvas: CanvasAnalysis | None) -> list[str]:
     """Extract basic keywords from canvas image properties."""
     keywords = ["sketch", "drawing"]
 
-    color = _extract_dominant_color_from_canvas(canvas_data)
+    color = canvas.colors.dominant if canvas else None
     if color:
         r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
         if r > 150 and g < 100 and b < 100:
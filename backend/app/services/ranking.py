@@ -4,10 +4,18 @@ Weights are injectable via RankingWeights so that:
   - Unit tests can supply custom weights without monkey-patching
   - The Config Studio admin panel can pass live-edited weights per request
   - A/B experiments can assign different RankingWeights instances per session
+
+rank_results scores the whole candidate batch at once with NumPy
+(_score_batch). tests/test_ranking.py keeps the original per-item loop as
+the reference the batch engine must match score for score.
 """
+import heapq
+import math
 from dataclasses import dataclass
 
-from app.services.embedder import cosine_similarity as _cosine_similarity
+import numpy as np
+
+from app.services.embedder import QueryEmbedding, _tokenize, decode_embedding
 
 
 @dataclass
@@ -54,18 +62,22 @@ def _keyword_score(title: str, tags: list[str], keywords: list[str]) -> float:
     return min(matches / max(len(keywords), 1), 1.0)
 
 
-def _color_score(product_color: str | None, dominant_color: str | None) -> float:
-    if not product_color or not dominant_color:
-        return 0.0
+def _parse_hex(color: str | None) -> tuple[int, int, int] | None:
+    if not color:
+        return None
     try:
-        pr = int(product_color[1:3], 16)
-        pg = int(product_color[3:5], 16)
-        pb = int(product_color[5:7], 16)
-        dr = int(dominant_color[1:3], 16)
-        dg = int(dominant_color[3:5], 16)
-        db = int(dominant_color[5:7], 16)
+        return int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
     except (ValueError, IndexError):
+        return None
+
+
+def _color_score(product_color: str | None, dominant_color: str | None) -> float:
+    product_rgb = _parse_hex(product_color)
+    dominant_rgb = _parse_hex(dominant_color)
+    if product_rgb is None or dominant_rgb is None:
         return 0.0
+    pr, pg, pb = product_rgb
+    dr, dg, db = dominant_rgb
 
     distance = ((pr - dr) ** 2 + (pg - dg) ** 2 + (pb - db) ** 2) ** 0.5
     max_distance = (255**2 * 3) ** 0.5  # ~441.67
@@ -111,6 +123,181 @@ def _build_explanation(kw_score: float, color_score: float, embedding_score: flo
     return reasons
 
 
+_MAX_COLOR_DISTANCE = (255**2 * 3) ** 0.5
+_PRUNE_MARGIN = 1e-4
+
+
+def _term_match_matrix(
+    titles_lower: list[str], tags_lower: list[list[str]], terms: list[str]
+) -> np.ndarray:
+    """Bool matrix [candidate, term]: term is a substring of the title or equals a tag."""
+    matches = np.zeros((len(titles_lower), len(terms)), dtype=bool)
+    if not terms:
+        return matches
+    title_arr = np.array(titles_lower, dtype=str)
+    column = {}
+    for j, term in enumerate(terms):
+        matches[:, j] = np.char.find(title_arr, term) >= 0
+        column.setdefault(term, []).append(j)
+    for i, tags in enumerate(tags_lower):
+        for tag in tags:
+            cols = column.get(tag)
+            if cols is not None:
+                matches[i, cols] = True
+    return matches
+
+
+def _embedding_scores(
+    query: QueryEmbedding, titles: list[str], tags: list[list[str]]
+) -> np.ndarray:
+    """Vectorised QueryEmbedding.similarity for a whole batch.
+
+    Candidates are tokenised once into a term-count matrix aligned with the
+    query vocabulary. Accumulation runs term by term so floating-point
+    results match the scalar function.
+    """
+    n = len(titles)
+    q_terms = query.terms
+    q_vec = query.vec
+    if not q_terms:
+        return np.zeros(n)
+
+    index = query.index
+    counts = np.zeros((n, len(q_terms)), dtype=np.int64)
+    for i, (title, item_tags) in enumerate(zip(titles, tags)):
+        for token in _tokenize(title + " " + " ".join(item_tags)):
+            j = index.get(token)
+            if j is not None:
+                counts[i, j] += 1
+
+    # log1p via a lookup table built with math.log1p (same values as the scalar path)
+    log_table = np.array([math.log1p(c) for c in range(int(counts.max()) + 1)])
+    weighted = log_table[counts]
+
+    sum_sq = np.zeros(n)
+    for j in range(len(q_terms)):
+        sum_sq = sum_sq + weighted[:, j] ** 2
+    magnitude = np.sqrt(sum_sq)
+    magnitude[magnitude == 0.0] = 1.0
+
+    dot = np.zeros(n)
+    for j, q in enumerate(q_vec[: len(q_terms)]):
+        dot = dot + q * (weighted[:, j] / magnitude)
+    clipped = np.maximum(0.0, np.minimum(1.0, dot))
+    return np.array([round(float(v), 4) for v in clipped])
+
+
+def _score_batch(
+    raw_results: list[dict],
+    keywords: list[str],
+    negative_keywords: list[str],
+    dominant_color: str | None,
+    embedding: bytes | None,
+    weights: RankingWeights,
+    top_k: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Compute every ranking signal for all candidates at once.
+
+    Returns arrays indexed like raw_results: kw, color, emb, overall, plus
+    `candidates`, the indices that can still reach the top_k. With top_k
+    set, the embedding (the only costly signal) is skipped for candidates
+    whose best case, emb = 1.0, stays below the k-th worst case, emb = 0.0;
+    their emb and overall are left at 0.
+    """
+    n = len(raw_results)
+    titles = [item.get("title", "") for item in raw_results]
+    tags = [item.get("tags", []) for item in raw_results]
+    titles_lower = [t.lower() for t in titles]
+    tags_lower = [[t.lower() for t in item_tags] for item_tags in tags]
+
+    # ── Keyword score and negative-keyword penalty ───────────────────────
+    kw_terms = [k.lower() for k in keywords]
+    neg_terms = [k.lower() for k in negative_keywords]
+    matches = _term_match_matrix(titles_lower, tags_lower, kw_terms + neg_terms)
+    if kw_terms:
+        kw_hits = matches[:, : len(kw_terms)].sum(axis=1)
+        kw = np.minimum(kw_hits / max(len(kw_terms), 1), 1.0)
+    else:
+        kw = np.zeros(n)
+    has_negative = matches[:, len(kw_terms):].any(axis=1)
+
+    # ── Color score ──────────────────────────────────────────────────────
+    color = np.zeros(n)
+    dominant_rgb = _parse_hex(dominant_color)
+    if dominant_rgb is not None:
+        rgb = np.zeros((n, 3), dtype=np.int64)
+        valid = np.zeros(n, dtype=bool)
+        for i, item in enumerate(raw_results):
+            parsed = _parse_hex(item.get("color_hex"))
+            if parsed is not None:
+                rgb[i] = parsed
+                valid[i] = True
+        sq_dist = ((rgb - np.array(dominant_rgb)) ** 2).sum(axis=1)
+        # Squared distances are small integers; take roots per distinct value
+        # with Python's ** 0.5 so results are identical to _color_score
+        uniq, inverse = np.unique(sq_dist, return_inverse=True)
+        distance = np.array([int(v) ** 0.5 for v in uniq])[inverse]
+        color = np.where(valid, np.maximum(1.0 - distance / _MAX_COLOR_DISTANCE, 0.0), 0.0)
+
+    # ── Meta score and duplicate-URL penalty (order dependent) ───────────
+    no_image = np.array([not item.get("image_url") for item in raw_results], dtype=bool)
+    seen_before = np.zeros(n, dtype=bool)
+    distinct_so_far = np.zeros(n, dtype=np.int64)
+    has_url = np.zeros(n, dtype=bool)
+    seen: set[str] = set()
+    for i, item in enumerate(raw_results):
+        url = item.get("product_url")
+        if url:
+            has_url[i] = True
+            seen_before[i] = url in seen
+            seen.add(url)
+        distinct_so_far[i] = len(seen)
+    meta = np.ones(n)
+    meta = np.where(no_image, meta * 0.8, meta)
+    meta = np.where(seen_before, meta * 0.9, meta)
+    duplicate = has_url & (distinct_so_far > 1)
+
+    # ── Embedding score, pruned by score bounds when only top_k is needed ─
+    candidates = np.arange(n)
+    emb = np.zeros(n)
+    query = decode_embedding(embedding)
+    if query is not None:
+        if top_k is not None and 0 < top_k < n:
+            penalty = np.where(has_negative, weights.p_negative_kw, 1.0)
+            penalty = np.where(duplicate, penalty * weights.p_duplicate_url, penalty)
+            lower = (
+                weights.w_color * color + weights.w_keyword * kw + weights.w_meta * meta
+            ) * penalty
+            upper = lower + weights.w_embedding * penalty
+            kth_lower = np.partition(lower, n - top_k)[n - top_k]
+            # Margin covers rounding to 4 decimals and float error in the bounds
+            candidates = np.flatnonzero(upper >= kth_lower - _PRUNE_MARGIN)
+        emb[candidates] = _embedding_scores(
+            query, [titles[i] for i in candidates], [tags[i] for i in candidates]
+        )
+
+    # ── Aggregation ──────────────────────────────────────────────────────
+    if embedding is not None:
+        overall = (
+            weights.w_embedding * emb
+            + weights.w_color * color
+            + weights.w_keyword * kw
+            + weights.w_meta * meta
+        )
+    else:
+        overall = (
+            weights.w_color_noem * color
+            + weights.w_keyword_noem * kw
+            + weights.w_meta_noem * meta
+        )
+
+    # ── Penalties ────────────────────────────────────────────────────────
+    overall = np.where(has_negative, overall * weights.p_negative_kw, overall)
+    overall = np.where(duplicate, overall * weights.p_duplicate_url, overall)
+
+    return {"kw": kw, "color": color, "emb": emb, "overall": overall, "candidates": candidates}
+
+
 def rank_results(
     raw_results: list[dict],
     keywords: list[str],
@@ -118,6 +305,7 @@ def rank_results(
     dominant_color: str | None,
     embedding: bytes | None = None,
     weights: RankingWeights = DEFAULT_WEIGHTS,
+    top_k: int | None = None,
 ) -> list[dict]:
     """Rank raw provider results per docs/05_ranking.md algorithm.
 
@@ -132,57 +320,41 @@ def rank_results(
         weights:           RankingWeights instance. Defaults to DEFAULT_WEIGHTS.
                            Pass a custom instance to run A/B experiments or
                            apply Config-Studio-edited weights per request.
-    """
-    has_embedding = embedding is not None
-    seen_urls: set[str] = set()
-    scored = []
+        top_k:             Return only the best top_k results. Equals
+                           rank_results(...)[:top_k], but result dicts and
+                           explanations are built for the survivors only.
 
-    for item in raw_results:
-        title = item.get("title", "")
-        tags = item.get("tags", [])
-        image_url = item.get("image_url")
-        product_url = item.get("product_url")
-        color_hex = item.get("color_hex")
-
-        kw = _keyword_score(title, tags, keywords)
-        color = _color_score(color_hex, dominant_color)
-        emb = _cosine_similarity(embedding, title, tags) if embedding else 0.0
-        meta = _meta_score(image_url, product_url, seen_urls)
-
-        if product_url:
-            seen_urls.add(product_url)
-
-        # ── Aggregation ──────────────────────────────────────────────────
-        if has_embedding:
-            overall = (
-                weights.w_embedding * emb
-                + weights.w_color * color
-                + weights.w_keyword * kw
-                + weights.w_meta * meta
-            )
-        else:
-            overall = (
-                weights.w_color_noem * color
-                + weights.w_keyword_noem * kw
-                + weights.w_meta_noem * meta
-            )
-
-        # ── Penalties ────────────────────────────────────────────────────
-        if _has_negative_keyword(title, tags, negative_keywords):
-            overall *= weights.p_negative_kw
-        if product_url and product_url in seen_urls and len(seen_urls) > 1:
-            overall *= weights.p_duplicate_url
-
-        explanation = _build_explanation(kw, color, emb)
+    Produces exactly the same scores and order as the per-item reference
+    loop in tests/test_ranking.py.
+    """
+    if not raw_results or (top_k is not None and top_k <= 0):
+        return []
+
+    scores = _score_batch(
+        raw_results, keywords, negative_keywords, dominant_color, embedding, weights, top_k
+    )
+    overall = scores["overall"]
+    order = [int(i) for i in scores["candidates"]]
+    if top_k is not None and top_k < len(order):
+        rounded = {i: round(float(overall[i]), 4) for i in order}
+        # nlargest is stable, so ties keep provider order like the full sort
+        order = heapq.nlargest(top_k, order, key=rounded.__getitem__)
 
+    scored = []
+    for i in order:
+        item = raw_results[i]
+        kw = float(scores["kw"][i])
+        color = float(scores["color"][i])
+        emb = float(scores["emb"][i])
         scored.append({
             **item,
-            "score_overall": round(overall, 4),
+            "score_overall": round(float(scores["overall"][i]), 4),
             "score_keyword": round(kw, 4),
             "score_color": round(color, 4),
             "score_embedding": round(emb, 4),
-            "explanation": explanation,
+            "explanation": _build_explanation(kw, color, emb),
         })
 
     scored.sort(key=lambda x: x["score_overall"], reverse=True)
     return scored
+
@@ -0,0 +1,115 @@
+"""Korean → English term translation over app.data.ko_en.KO_EN_MAP.
+
+The map keys are compiled once into an Aho–Corasick automaton, so finding
+every known term inside a word costs one pass over its characters however
+large the map grows (instead of testing `ko in word` for every entry).
+
+translate_word() resolves a single Korean word:
+  1. exact map entry;
+  2. otherwise a term the word is a prefix of (first in map order), e.g.
+     "강아" → "dog" rather than the contained "강" (river);
+  3. otherwise the longest known term contained in the word (leftmost on
+     ties), e.g. "고양이들" → "cat".
+Whole-word results are memoised.
+"""
+from collections import deque
+from functools import lru_cache
+
+from app.core.text import KO_WORD
+from app.data.ko_en import KO_EN_MAP
+
+
+class TermAutomaton:
+    """Aho–Corasick automaton over a list of terms."""
+
+    def __init__(self, terms: list[str]) -> None:
+        self.terms = terms
+        self._goto: list[dict[str, int]] = [{}]
+        self._term: list[int] = [-1]  # term ending exactly at this node
+        self._first: list[int] = [len(terms)]  # lowest term index in the subtree
+        for index, term in enumerate(terms):
+            node = 0
+            for ch in term:
+                self._first[node] = min(self._first[node], index)
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._term.append(-1)
+                    self._first.append(len(terms))
+                node = nxt
+            self._first[node] = min(self._first[node], index)
+            if self._term[node] == -1:
+                self._term[node] = index
+
+        # Failure links and output links (nearest proper suffix that is a term)
+        self._fail = [0] * len(self._goto)
+        self._output = [-1] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                f = self._fail[child]
+                self._output[child] = f if self._term[f] != -1 else self._output[f]
+                queue.append(child)
+
+    def matches(self, text: str) -> list[tuple[int, int, int]]:
+        """All (start, end, term index) occurrences of terms in text."""
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            hit = node if self._term[node] != -1 else self._output[node]
+            while hit > 0:
+                index = self._term[hit]
+                found.append((i + 1 - len(self.terms[index]), i + 1, index))
+                hit = self._output[hit]
+        return found
+
+    def longest_match(self, text: str) -> int | None:
+        """Index of the longest term contained in text (leftmost on ties)."""
+        best = min(self.matches(text), key=lambda m: (m[0] - m[1], m[0]), default=None)
+        return best[2] if best else None
+
+    def completion(self, prefix: str) -> int | None:
+        """Index of the first term that starts with prefix."""
+        node = 0
+        for ch in prefix:
+            node = self._goto[node].get(ch)
+            if node is None:
+                return None
+        first = self._first[node]
+        return first if first < len(self.terms) else None
+
+
+_automaton = TermAutomaton(list(KO_EN_MAP))
+
+
+def lookup(word: str) -> str | None:
+    """Exact map entry for a Korean word."""
+    return KO_EN_MAP.get(word)
+
+
+@lru_cache(maxsize=4096)
+def translate_word(word: str) -> str | None:
+    """English for a Korean word: exact, prefix completion, then contained term."""
+    exact = KO_EN_MAP.get(word)
+    if exact:
+        return exact
+    index = _automaton.completion(word)
+    if index is None:
+        index = _automaton.longest_match(word)
+    return KO_EN_MAP[_automaton.terms[index]] if index is not None else None
+
+
+def translate_text(text: str) -> str:
+    """Replace each translatable Korean word in text with its English term."""
+    return KO_WORD.sub(lambda m: translate_word(m.group()) or m.group(), text)
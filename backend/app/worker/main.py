@@ -1,110 +1,230 @@
 """Background worker process.
 
 Run with: python -m app.worker.main
+
+Consumes the job queue filled by POST /designs/{id}/process when
+JOB_EXECUTION_MODE is "queue", running the same pipeline as the inline
+processor. Runs up to WORKER_CONCURRENCY jobs at once. A slot is reserved
+before a job is taken, so a busy worker leaves jobs in the shared queue for
+other workers instead of hoarding them. Each job is bounded by
+JOB_TIMEOUT_SECONDS.
+
+Jobs are leased, not popped: a job is acked only after it finished (done,
+failed or timed out). If the worker dies, the lease expires and any worker
+puts the job back on the queue; after QUEUE_MAX_ATTEMPTS deliveries it goes
+to the dead-letter list and is marked failed.
+
+SIGTERM/SIGINT stop taking jobs and let in-flight jobs finish before the
+process exits.
 """
 import asyncio
 import logging
+import signal
 import uuid
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timezone
 
-from sqlalchemy import select
-
 from app.core.config import settings
 from app.core.database import async_session
+from app.core.executor import shutdown_cpu_pool
+from app.core.http import close_http_client, init_http_client
 from app.core.redis import (
+    ack_job,
     acquire_lock,
-    cache_set,
-    dequeue_job,
-    job_key,
+    close_backend,
     lock_key,
+    publish_job_status,
+    queue_depth,
+    reclaim_expired_jobs,
     release_lock,
+    reserve_job,
 )
 from app.models.design import Design
-from app.models.design_profile import DesignProfile
 from app.models.job import Job
-from app.services.profile_generator import generate_profile
+from app.worker.processor import process_job_inline
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger("fmd.worker")
 
 
 async def process_job(job_id_str: str) -> None:
-    job_id = uuid.UUID(job_id_str)
+    """Run the full pipeline (profile, images, embedding) for a queued job.
 
+    Delivery is at-least-once, so a job may arrive again after a worker
+    died or its lease expired: finished jobs are skipped and the design lock
+    keeps two workers from processing the same design at once.
+    """
     async with async_session() as db:
-        job = await db.get(Job, job_id)
+        job = await db.get(Job, uuid.UUID(job_id_str))
         if not job:
-            logger.warning("Job %s not found, skipping", job_id)
+            logger.warning("Job %s not found, skipping", job_id_str)
             return
-
-        design = await db.get(Design, job.design_id)
-        if not design:
-            logger.warning("Design %s not found for job %s", job.design_id, job_id)
+        if job.status in ("done", "failed"):
+            logger.info("Job %s already %s, skipping redelivery", job_id_str, job.status)
             return
+        design_id = str(job.design_id)
 
-        # Acquire lock to prevent duplicate processing
-        lk = lock_key(str(design.id))
-        if not await acquire_lock(lk):
-            logger.info("Job %s already being processed (lock held)", job_id)
-            return
+    lk = lock_key(design_id)
+    if not await acquire_lock(lk, ttl=settings.JOB_TIMEOUT_SECONDS):
+        logger.info("Job %s already being processed (lock held)", job_id_str)
+        return
+    try:
+        await process_job_inline(job_id_str)
+    finally:
+        await release_lock(lk)
 
-        try:
-            # Update status → running
-            job.status = "running"
-            job.progress = 0.1
-            await db.commit()
-            await cache_set(job_key(job_id_str), {"status": "running", "progress": 0.1})
-
-            # Generate DesignProfile
-            logger.info("Generating profile for design %s", design.id)
-            profile_data = generate_profile(design.text_prompt, design.category_hint)
-
-            # Check if profile already exists (idempotent)
-            stmt = select(DesignProfile).where(DesignProfile.design_id == design.id)
-            existing_profile = (await db.execute(stmt)).scalar_one_or_none()
-
-            if not existing_profile:
-                dp = DesignProfile(
-                    design_id=design.id,
-                    profile_hash=profile_data["profile_hash"],
-                    profile=profile_data["profile"],
-                    keywords=profile_data["keywords"],
-                    negative_keywords=profile_data["negative_keywords"],
-                    dominant_color=profile_data["dominant_color"],
-                )
-                db.add(dp)
-
-            job.progress = 1.0
-            job.status = "done"
-            job.finished_at = datetime.now(timezone.utc)
-            design.status = "processed"
-            await db.commit()
-
-            await cache_set(job_key(job_id_str), {"status": "done", "progress": 1.0})
-            logger.info("Job %s completed successfully", job_id)
-
-        except Exception as e:
-            logger.error("Job %s failed: %s", job_id, e)
-            job.status = "failed"
-            job.error_code = type(e).__name__
-            job.finished_at = datetime.now(timezone.utc)
+
+async def mark_failed(job_id_str: str, error_code: str) -> None:
+    """Record a job the pipeline could not finish (timeout, dead-lettered)."""
+    async with async_session() as db:
+        job = await db.get(Job, uuid.UUID(job_id_str))
+        if not job or job.status in ("done", "failed"):
+            return
+        job.status = "failed"
+        job.error_code = error_code
+        job.finished_at = datetime.now(timezone.utc)
+        design = await db.get(Design, job.design_id)
+        if design:
             design.status = "failed"
-            await db.commit()
-            await cache_set(
-                job_key(job_id_str),
-                {"status": "failed", "error_code": type(e).__name__},
-            )
+        await db.commit()
+    await publish_job_status(job_id_str, {"status": "failed", "error_code": error_code})
+
+
+async def mark_timed_out(job_id_str: str) -> None:
+    await mark_failed(job_id_str, "JobTimeout")
+
+
+async def mark_dead_lettered(job_id_str: str) -> None:
+    await mark_failed(job_id_str, "DeadLettered")
+
+
+class WorkerPool:
+    """Lease and run jobs with at most `concurrency` in flight."""
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[None]],
+        *,
+        concurrency: int,
+        job_timeout: float,
+        on_timeout: Callable[[str], Awaitable[None]] | None = None,
+        on_dead_letter: Callable[[str], Awaitable[None]] | None = None,
+        poll_seconds: int = 1,
+        reap_interval: float = 30.0,
+    ) -> None:
+        self._handler = handler
+        self._concurrency = max(1, concurrency)
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._job_timeout = job_timeout
+        self._on_timeout = on_timeout
+        self._on_dead_letter = on_dead_letter
+        self._poll_seconds = poll_seconds
+        self._reap_interval = reap_interval
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def _run_job(self, job_id: str) -> None:
+        try:
+            try:
+                await asyncio.wait_for(self._handler(job_id), timeout=self._job_timeout)
+            except asyncio.TimeoutError:
+                logger.error("Job %s exceeded %ss, cancelled", job_id, self._job_timeout)
+                if self._on_timeout is not None:
+                    await self._on_timeout(job_id)
+            except Exception:
+                logger.exception("Job %s crashed", job_id)
+            # Reached only when the job finished or was given up on here; a
+            # cancelled (killed) worker never acks and the lease expires instead
+            await ack_job(job_id)
         finally:
-            await release_lock(lk)
+            self._slots.release()
+
+    async def reap(self) -> None:
+        """Requeue jobs whose lease expired; fail the ones out of attempts."""
+        requeued, dead = await reclaim_expired_jobs()
+        for job_id in requeued:
+            logger.warning("Lease expired for job %s, requeued", job_id)
+        for job_id in dead:
+            logger.error("Job %s exhausted its attempts, dead-lettered", job_id)
+            if self._on_dead_letter is not None:
+                await self._on_dead_letter(job_id)
+
+    async def _reap_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception("Reclaiming expired jobs failed")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self._reap_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Take jobs until `stop` is set, then wait for in-flight jobs to drain."""
+        reaper = asyncio.create_task(self._reap_loop(stop))
+        while not stop.is_set():
+            await self._slots.acquire()
+            if stop.is_set():
+                self._slots.release()
+                break
+            # Short poll so a stop request is noticed quickly
+            leased = await reserve_job(timeout=self._poll_seconds)
+            if not leased:
+                self._slots.release()
+                continue
+            job_id, attempt = leased
+            logger.info(
+                "Leased job %s (attempt %d, %d in flight)", job_id, attempt, self.in_flight + 1
+            )
+            task = asyncio.create_task(self._run_job(job_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+            if self.in_flight >= self._concurrency:
+                depth = await queue_depth()
+                if depth > settings.WORKER_QUEUE_WARN_DEPTH:
+                    logger.warning("All %d slots busy, %d jobs waiting", self._concurrency, depth)
+
+        if self._tasks:
+            logger.info("Draining %d in-flight job(s)", self.in_flight)
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await reaper
+
+
+def _install_signal_handlers(stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows, or not in the main thread
 
 
-async def worker_loop() -> None:
+async def worker_loop(stop: asyncio.Event | None = None) -> None:
     logger.info("FMD Worker started (concurrency=%d)", settings.WORKER_CONCURRENCY)
-    while True:
-        job_id = await dequeue_job(timeout=5)
-        if job_id:
-            logger.info("Dequeued job: %s", job_id)
-            await process_job(job_id)
+    if stop is None:
+        stop = asyncio.Event()
+        _install_signal_handlers(stop)
+    pool = WorkerPool(
+        process_job,
+        concurrency=settings.WORKER_CONCURRENCY,
+        job_timeout=settings.JOB_TIMEOUT_SECONDS,
+        on_timeout=mark_timed_out,
+        on_dead_letter=mark_dead_lettered,
+        reap_interval=settings.QUEUE_REAP_INTERVAL_SECONDS,
+    )
+    await init_http_client()
+    try:
+        await pool.run(stop)
+        logger.info("FMD Worker stopped")
+    finally:
+        await close_http_client()
+        await close_backend()
+        shutdown_cpu_pool()
 
 
 def main() -> None:
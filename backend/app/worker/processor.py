@@ -1,17 +1,24 @@
 """Inline job processor — runs in the same process as the API server."""
+import asyncio
+import base64
 import logging
 import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
+from app.core.blobstore import externalize_image_url
 from app.core.database import async_session
-from app.core.redis import cache_set, job_key
+from app.core.redis import cache_get, cache_set, profile_key, publish_job_status
+from app.core.text import is_english
 from app.models.design import Design
 from app.models.design_profile import DesignProfile
 from app.models.job import Job
-from app.services.profile_generator import generate_profile
-from app.services.image_generator import generate_design_image
+from app.models.profile_artifact import ProfileArtifact
+from app.services.canvas_analysis import canvas_payload, canvas_sha256, generation_size
+from app.services.profile_generator import generate_profile_async
+from app.services.image_generator import generate_design_image, is_generated_image
 from app.services.embedder import build_query_embedding
 
 logger = logging.getLogger("fmd.worker")
@@ -23,9 +30,90 @@ _STYLE_VARIANTS = [
     ("bold", "bold, high contrast, vibrant colors, expressive, saturated palette"),
 ]
 
+_ARTIFACT_CACHE_TTL = 24 * 3600
+
+
+def _ordered_variations(finished: dict[str, str]) -> list[dict]:
+    """Finished variations (style -> image_url) in canonical _STYLE_VARIANTS order."""
+    return [
+        {"style": name, "image_url": finished[name]}
+        for name, _ in _STYLE_VARIANTS
+        if name in finished
+    ]
+
+
+def _artifact_key(profile_hash: str, canvas_sha256: str | None) -> str:
+    """Key for shared pipeline outputs.
+
+    Canvas designs feed their drawing to ControlNet, so two sketches with the
+    same keywords and colour must not share images: the canvas hash is part
+    of their key.
+    """
+    return f"{profile_hash}:{canvas_sha256[:32]}" if canvas_sha256 else profile_hash
+
+
+async def _load_artifact(artifact_key: str) -> dict | None:
+    """Return stored pipeline outputs for an artifact key, if any design produced them."""
+    cached = await cache_get(profile_key(artifact_key))
+    if cached:
+        return cached
+
+    async with async_session() as db:
+        artifact = await db.get(ProfileArtifact, artifact_key)
+        if not artifact:
+            return None
+        artifact.hits += 1
+        await db.commit()
+        payload = {
+            "embedding": base64.b64encode(artifact.embedding).decode() if artifact.embedding else None,
+            "ai_image_url": artifact.ai_image_url,
+            "ai_image_method": artifact.ai_image_method,
+            "style_variations": artifact.style_variations or [],
+        }
+    await cache_set(profile_key(artifact_key), payload, ttl=_ARTIFACT_CACHE_TTL)
+    return payload
+
+
+async def _save_artifact(
+    artifact_key: str,
+    profile_data: dict,
+    embedding_bytes: bytes,
+    ai_image: dict,
+    style_variations: list[dict],
+) -> None:
+    async with async_session() as db:
+        if await db.get(ProfileArtifact, artifact_key):
+            return
+        db.add(ProfileArtifact(
+            profile_hash=artifact_key,
+            keywords=profile_data["keywords"],
+            negative_keywords=profile_data["negative_keywords"],
+            dominant_color=profile_data["dominant_color"],
+            embedding=embedding_bytes,
+            ai_image_url=ai_image["image_url"],
+            ai_image_method=ai_image["method"],
+            style_variations=style_variations,
+        ))
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Another design with the same profile finished first
+            await db.rollback()
+            return
+    await cache_set(profile_key(artifact_key), {
+        "embedding": base64.b64encode(embedding_bytes).decode(),
+        "ai_image_url": ai_image["image_url"],
+        "ai_image_method": ai_image["method"],
+        "style_variations": style_variations,
+    }, ttl=_ARTIFACT_CACHE_TTL)
+
 
 async def process_job_inline(job_id_str: str) -> None:
-    """Process a job directly (no queue). Called via asyncio.create_task."""
+    """Run the full pipeline for a job.
+
+    Called via asyncio.create_task in the API process (JOB_EXECUTION_MODE
+    "inline") or by app.worker for queued jobs.
+    """
     job_id = uuid.UUID(job_id_str)
 
     async with async_session() as db:
@@ -44,57 +132,132 @@ async def process_job_inline(job_id_str: str) -> None:
             job.status = "running"
             job.progress = 0.1
             await db.commit()
-            await cache_set(job_key(job_id_str), {"status": "running", "progress": 0.1})
+            await publish_job_status(job_id_str, {"status": "running", "progress": 0.1})
 
             # Step 1: Generate profile
             logger.info("Generating profile for design %s", design.id)
-            profile_data = generate_profile(
+            canvas_data = design.input_image_url if design.input_mode == "canvas" else None
+            # Memoised by normalised text + canvas hash; a miss analyses the
+            # canvas once, and ControlNet reuses that analysis via the profile
+            profile_data = await generate_profile_async(
                 text_prompt=design.text_prompt,
                 category=design.category_hint,
-                canvas_data=design.input_image_url if design.input_mode == "canvas" else None,
+                canvas_data=canvas_data,
+                image_sha256=design.input_image_sha256,
             )
 
-            # Compute keyword embedding for semantic ranking
-            embedding_bytes = build_query_embedding(profile_data["keywords"])
+            # Identical profiles (same keywords + color, and same drawing for
+            # canvas designs) share one set of pipeline outputs; reuse them
+            # instead of regenerating
+            artifact_key = _artifact_key(
+                profile_data["profile_hash"],
+                (design.input_image_sha256 or canvas_sha256(canvas_data)) if canvas_data else None,
+            )
+            artifact = await _load_artifact(artifact_key)
+            if artifact and artifact["style_variations"]:
+                logger.info("Reusing artifacts for profile %s", artifact_key)
+                embedding_bytes = (
+                    base64.b64decode(artifact["embedding"])
+                    if artifact["embedding"]
+                    else build_query_embedding(profile_data["keywords"])
+                )
+                job.progress = 0.4
+                await db.commit()
+                await publish_job_status(job_id_str, {"status": "running", "progress": 0.4})
 
-            job.progress = 0.4
-            await db.commit()
-            await cache_set(job_key(job_id_str), {"status": "running", "progress": 0.4})
+                style_variations = artifact["style_variations"]
+                ai_image = {
+                    "image_url": artifact["ai_image_url"],
+                    "method": artifact["ai_image_method"],
+                }
+            else:
+                # Compute keyword embedding for semantic ranking
+                embedding_bytes = build_query_embedding(profile_data["keywords"])
 
-            # Step 2: Generate 4 AI style variations in parallel
-            import asyncio as _asyncio
-            import re as _re
-            en_keywords = [k for k in profile_data["keywords"] if _re.match(r"[a-zA-Z]", k)]
-            ai_prompt = " ".join(en_keywords) if en_keywords else (design.text_prompt or "design")
-            style = (design.category_hint or "design-asset").lower()
+                job.progress = 0.4
+                await db.commit()
+                await publish_job_status(job_id_str, {"status": "running", "progress": 0.4})
 
-            async def _gen_style(variant_suffix: str):
-                return await generate_design_image(f"{ai_prompt}, {variant_suffix}", style)
+                # Step 2: Generate 4 AI style variations in parallel. Each one
+                # is persisted and published as soon as it lands, so the first
+                # image reaches the user without waiting for the slowest source.
+                en_keywords = [k for k in profile_data["keywords"] if is_english(k)]
+                ai_prompt = " ".join(en_keywords) if en_keywords else (design.text_prompt or "design")
+                style = (design.category_hint or "design-asset").lower()
+                canvas_kwargs = {}
+                canvas_info = profile_data["profile"].get("canvas")
+                if canvas_data and canvas_info:
+                    width, height = generation_size(canvas_info["width"], canvas_info["height"])
+                    canvas_kwargs = {
+                        "control_image_b64": canvas_payload(canvas_data),
+                        "width": width,
+                        "height": height,
+                    }
 
-            variations_raw = await _asyncio.gather(
-                *[_gen_style(vs) for _, vs in _STYLE_VARIANTS],
-                return_exceptions=True,
-            )
+                async def _gen_style(style_name: str, variant_suffix: str):
+                    try:
+                        return style_name, await generate_design_image(
+                            f"{ai_prompt}, {variant_suffix}", style, **canvas_kwargs
+                        )
+                    except Exception as e:
+                        return style_name, e
+
+                tasks = [
+                    asyncio.create_task(_gen_style(sname, vs)) for sname, vs in _STYLE_VARIANTS
+                ]
+                finished: dict[str, str] = {}
+                generated: set[str] = set()  # styles with a real image, not a fallback
+                style_variations: list[dict] = []
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        sname, r = await next_done
+                        if not (isinstance(r, dict) and r.get("image_url")):
+                            logger.warning("Style %s failed: %s", sname, r)
+                            continue
+                        # Image bytes go to the blob store; JSON keeps only the reference
+                        finished[sname] = await externalize_image_url(r["image_url"])
+                        if is_generated_image(r):
+                            generated.add(sname)
+                        style_variations = _ordered_variations(finished)
+                        job.progress = round(0.4 + 0.3 * len(finished) / len(_STYLE_VARIANTS), 3)
+                        job.result = {
+                            "ai_image_url": style_variations[0]["image_url"],
+                            "style_variations": style_variations,
+                        }
+                        await db.commit()
+                        await publish_job_status(job_id_str, {
+                            "status": "running",
+                            "progress": job.progress,
+                            **job.result,
+                        })
+                finally:
+                    for task in tasks:
+                        task.cancel()
 
-            style_variations: list[dict] = []
-            first_image_url: str | None = None
-            for (sname, _), r in zip(_STYLE_VARIANTS, variations_raw):
-                if isinstance(r, dict) and r.get("image_url"):
-                    style_variations.append({"style": sname, "image_url": r["image_url"]})
-                    if first_image_url is None:
-                        first_image_url = r["image_url"]
-                else:
-                    logger.warning("Style %s failed: %s", sname, r)
+                first_image_url = style_variations[0]["image_url"] if style_variations else None
+                ai_image = {"image_url": first_image_url, "method": "multi-style"}
+                logger.info("Generated %d style variations", len(style_variations))
 
-            ai_image = {"image_url": first_image_url, "method": "multi-style"}
-            logger.info("Generated %d style variations", len(style_variations))
+                # Shared artifacts never expire: only store a complete set of
+                # real images, not SVG/placeholder fallbacks from an outage
+                if len(generated) == len(_STYLE_VARIANTS):
+                    await _save_artifact(
+                        artifact_key, profile_data, embedding_bytes, ai_image, style_variations
+                    )
 
             job.progress = 0.7
             await db.commit()
-            await cache_set(job_key(job_id_str), {"status": "running", "progress": 0.7})
+            await publish_job_status(job_id_str, {
+                "status": "running",
+                "progress": 0.7,
+                "ai_image_url": ai_image["image_url"],
+                "style_variations": style_variations,
+            })
 
             # Step 3: Save profile
-            # Use design-scoped hash to avoid UNIQUE conflict across designs
+            # DesignProfile rows are per design (UNIQUE design_id and hash), so
+            # they carry a design-scoped hash; the shared pipeline outputs live
+            # in ProfileArtifact under the raw hash.
             design_scoped_hash = f"{design.id}:{profile_data['profile_hash']}"
 
             stmt = select(DesignProfile).where(DesignProfile.design_id == str(design.id))
@@ -139,7 +302,7 @@ async def process_job_inline(job_id_str: str) -> None:
             design.status = "processed"
             await db.commit()
 
-            await cache_set(job_key(job_id_str), {
+            await publish_job_status(job_id_str, {
                 "status": "done",
                 "progress": 1.0,
                 "ai_image_url": ai_image["image_url"],
@@ -156,7 +319,6 @@ async def process_job_inline(job_id_str: str) -> None:
             job.finished_at = datetime.now(timezone.utc)
             design.status = "failed"
             await db.commit()
-            await cache_set(
-                job_key(job_id_str),
-                {"status": "failed", "error_code": type(e).__name__},
+            await publish_job_status(
+                job_id_str, {"status": "failed", "error_code": type(e).__name__}
             )
@@ -0,0 +1,132 @@
+"""Multi-process worker supervisor.
+
+Run with: python -m app.worker.supervisor [--processes N]
+
+Spawns WORKER_PROCESSES worker processes (default: one per CPU core), each
+running its own event loop and WorkerPool against the shared Redis queue,
+so one box uses every core. Children that die unexpectedly are restarted.
+SIGTERM/SIGINT are forwarded to the children, which drain their in-flight
+jobs before exiting.
+
+Children use the thread executor for CPU-bound profile steps
+(CPU_POOL_WORKERS=0): each child already owns a core, so a process pool per
+child would only oversubscribe the machine.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections.abc import Callable
+from multiprocessing.process import BaseProcess
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger("fmd.supervisor")
+
+_RESTART_BACKOFF_SECONDS = 1.0
+
+
+def _run_worker() -> None:
+    from app.worker.main import main
+
+    main()
+
+
+class Supervisor:
+    """Keep `processes` copies of `target` running until stop() is called."""
+
+    def __init__(
+        self,
+        processes: int,
+        target: Callable[[], None] = _run_worker,
+        *,
+        shutdown_timeout: float | None = None,
+    ) -> None:
+        self._processes = max(1, processes)
+        self._target = target
+        self._ctx = multiprocessing.get_context("spawn")
+        self._children: list[BaseProcess] = []
+        self._stopping = False
+        self._shutdown_timeout = (
+            shutdown_timeout if shutdown_timeout is not None else settings.JOB_TIMEOUT_SECONDS + 10
+        )
+
+    @property
+    def children(self) -> list[BaseProcess]:
+        return list(self._children)
+
+    def _spawn(self, slot: int) -> BaseProcess:
+        proc = self._ctx.Process(target=self._target, name=f"fmd-worker-{slot}", daemon=False)
+        proc.start()
+        logger.info("Started %s (pid %s)", proc.name, proc.pid)
+        return proc
+
+    def start(self) -> None:
+        # Inherited by spawned children; an explicit setting still wins
+        os.environ.setdefault("CPU_POOL_WORKERS", "0")
+        self._children = [self._spawn(i) for i in range(self._processes)]
+
+    def reap(self) -> int:
+        """Restart children that exited on their own; returns how many were restarted."""
+        restarted = 0
+        for i, proc in enumerate(self._children):
+            if self._stopping or proc.is_alive():
+                continue
+            logger.warning("%s exited with code %s, restarting", proc.name, proc.exitcode)
+            proc.close()
+            self._children[i] = self._spawn(i)
+            restarted += 1
+        return restarted
+
+    def stop(self) -> None:
+        """Ask children to drain (SIGTERM), then kill any that overstay the timeout."""
+        self._stopping = True
+        for proc in self._children:
+            if proc.is_alive():
+                proc.terminate()
+        deadline = time.monotonic() + self._shutdown_timeout
+        for proc in self._children:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.warning("%s did not drain in time, killing", proc.name)
+                proc.kill()
+                proc.join()
+
+    def run(self) -> None:
+        """Start the children and supervise them until SIGTERM/SIGINT."""
+        def _request_stop(signum, frame):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, _request_stop)
+        signal.signal(signal.SIGINT, _request_stop)
+        self.start()
+        while not self._stopping:
+            if self.reap():
+                time.sleep(_RESTART_BACKOFF_SECONDS)
+            time.sleep(0.5)
+        logger.info("Stopping %d worker process(es)", len(self._children))
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run several FMD worker processes")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.WORKER_PROCESSES or os.cpu_count() or 1,
+        help="number of worker processes (default: WORKER_PROCESSES or CPU count)",
+    )
+    args = parser.parse_args()
+    if not settings.REDIS_URL:
+        logger.warning(
+            "REDIS_URL is empty: each worker process gets its own in-memory queue "
+            "and will not see jobs enqueued by the API"
+        )
+    Supervisor(args.processes).run()
+
+
+if __name__ == "__main__":
+    main()
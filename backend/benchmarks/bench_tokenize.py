@@ -0,0 +1,75 @@
+"""Per-candidate tokenization cost: inline re.findall vs app.core.text.
+
+Run from backend/:  python -m benchmarks.bench_tokenize [--rounds N]
+
+Each "candidate" is one design reference: its title and tags are tokenized
+the way ranking and the providers do it. Three variants are timed:
+
+  inline   re.findall with a string pattern + lower() + length filter
+           (the code before app.core.text)
+  shared   app.core.text.tokenize, as used for candidates (precompiled pattern)
+  interned tokenize(intern=True), as used for query/profile keywords
+"""
+import argparse
+import re
+import time
+
+from app.core.text import tokenize
+from app.data.design_refs import DESIGN_REFS
+
+
+def _candidate_texts() -> list[str]:
+    return [f"{ref.get('title', '')} {' '.join(ref.get('tags', []))}" for ref in DESIGN_REFS]
+
+
+def _inline(texts: list[str]) -> int:
+    n = 0
+    for text in texts:
+        n += len([t for t in re.findall(r"[a-zA-Z]+", text.lower()) if len(t) > 1])
+    return n
+
+
+def _shared(texts: list[str]) -> int:
+    n = 0
+    for text in texts:
+        n += len(tokenize(text))
+    return n
+
+
+def _interned(texts: list[str]) -> int:
+    n = 0
+    for text in texts:
+        n += len(tokenize(text, intern=True))
+    return n
+
+
+def _time(fn, texts: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best / len(texts) * 1e6  # µs per candidate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    texts = _candidate_texts()
+    assert _inline(texts) == _shared(texts)  # same tokens either way
+
+    results = {
+        "inline": _time(_inline, texts, args.rounds),
+        "shared": _time(_shared, texts, args.rounds),
+        "interned": _time(_interned, texts, args.rounds),
+    }
+
+    print(f"{len(texts)} candidates, best of {args.rounds} rounds")
+    for name, us in results.items():
+        print(f"  {name:<8} {us:7.2f} µs/candidate  ({results['inline'] / us:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Tests for the image backend health registry."""
+import asyncio
+
+import pytest
+
+from app.services.backend_health import CLOSED, HALF_OPEN, OPEN, HealthRegistry
+from app.services.image_generator import _hedged
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _registry(clock: FakeClock, **kwargs) -> HealthRegistry:
+    return HealthRegistry(
+        failure_threshold=kwargs.get("failure_threshold", 2),
+        open_seconds=60.0,
+        probe_ttl=30.0,
+        ewma_alpha=0.5,
+        clock=clock,
+    )
+
+
+def test_breaker_opens_after_threshold_and_half_opens():
+    clock = FakeClock()
+    health = _registry(clock)
+    health.record_failure("hf")
+    assert health.allow("hf")
+    health.record_failure("hf")
+    assert health.snapshot()["hf"]["state"] == OPEN
+    assert not health.allow("hf")
+
+    clock.now += 61
+    assert health.allow("hf")  # the single half-open trial
+    assert health.snapshot()["hf"]["state"] == HALF_OPEN
+    assert not health.allow("hf")
+
+    health.record_failure("hf")  # failed trial re-opens immediately
+    assert health.snapshot()["hf"]["state"] == OPEN
+    clock.now += 61
+    assert health.allow("hf")
+    health.record_success("hf", 1.0)
+    assert health.snapshot()["hf"]["state"] == CLOSED
+    assert health.allow("hf") and health.allow("hf")
+
+
+def test_cancelled_trial_releases_half_open_slot():
+    clock = FakeClock()
+    health = _registry(clock, failure_threshold=1)
+    health.record_failure("hf")
+    clock.now += 61
+    assert health.allow("hf")
+    health.record_cancelled("hf", 2.0)
+    assert health.allow("hf")
+
+
+def test_order_by_ewma_keeps_unmeasured_slots():
+    health = _registry(FakeClock())
+    health.record_success("comfyui", 20.0)
+    health.record_success("pollinations", 4.0)
+    assert health.order(["comfyui", "hf", "pollinations"]) == ["pollinations", "hf", "comfyui"]
+
+    health.record_success("pollinations", 40.0)  # EWMA: 4 → 22
+    assert health.snapshot()["pollinations"]["ewma_latency_seconds"] == 22.0
+    assert health.order(["comfyui", "hf", "pollinations"]) == ["comfyui", "hf", "pollinations"]
+
+
+def test_cancellation_raises_latency_estimate():
+    health = _registry(FakeClock())
+    health.record_success("hf", 2.0)
+    health.record_cancelled("hf", 10.0)
+    assert health.snapshot()["hf"]["ewma_latency_seconds"] == 6.0
+    health.record_cancelled("hf", 1.0)
+    assert health.snapshot()["hf"]["ewma_latency_seconds"] == 6.0
+
+
+@pytest.mark.asyncio
+async def test_probe_is_cached_until_ttl():
+    clock = FakeClock()
+    health = _registry(clock)
+    calls = 0
+
+    async def check() -> bool:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return True
+
+    results = await asyncio.gather(*(health.probe("comfyui", check) for _ in range(5)))
+    assert all(results) and calls == 1
+    clock.now += 31
+    assert await health.probe("comfyui", check)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_skips_open_backend_and_records_outcomes():
+    health = _registry(FakeClock(), failure_threshold=1)
+    calls = []
+
+    def backend(name, result):
+        async def run():
+            calls.append(name)
+            return result
+        return name, run
+
+    chain = [
+        backend("dead", {"image_url": None, "method": "x"}),
+        backend("ok", {"image_url": "https://img/ok", "method": "ok"}),
+    ]
+    assert (await _hedged(chain, 10.0, health))["method"] == "ok"
+    assert calls == ["dead", "ok"]
+    assert health.snapshot()["dead"]["state"] == OPEN
+    assert health.snapshot()["ok"]["successes"] == 1
+
+    calls.clear()
+    assert (await _hedged(chain, 10.0, health))["method"] == "ok"
+    assert calls == ["ok"]
+
+
+@pytest.mark.asyncio
+async def test_stability_outage_is_recorded_against_stability(monkeypatch):
+    from app.services import image_generator
+    from app.services.backend_health import set_health_registry
+
+    health = _registry(FakeClock(), failure_threshold=1)
+    set_health_registry(health)
+    monkeypatch.setattr(image_generator, "COMFYUI_URL", "")
+    monkeypatch.setattr(image_generator, "STABILITY_API_KEY", "sk-test")
+    monkeypatch.setattr(image_generator, "HF_TOKEN", "")
+    monkeypatch.setattr(image_generator, "STABLE_HORDE_KEY", "")
+
+    class FailingClient:
+        async def post(self, *args, **kwargs):
+            raise RuntimeError("stability down")
+
+    async def pollinations(prompt, style="design-asset"):
+        return {"image_url": "https://img/p.png", "method": "pollinations_ai"}
+
+    monkeypatch.setattr(image_generator, "get_http_client", lambda: FailingClient())
+    monkeypatch.setattr(image_generator, "_pollinations_fetch", pollinations)
+    try:
+        result = await image_generator._generate_uncached(
+            "logo", "logo", "logo", 7.0, 20, 42, 1024, 1024, None
+        )
+    finally:
+        set_health_registry(None)
+
+    assert result["method"] == "pollinations_ai"
+    snapshot = health.snapshot()
+    assert snapshot["stability"]["state"] == OPEN
+    assert snapshot["stability"]["successes"] == 0
+    assert snapshot["pollinations"]["successes"] == 1
@@ -0,0 +1,103 @@
+"""Tests for the content-addressed image blob store and GET /api/blobs/{ref}."""
+import base64
+import hashlib
+
+import httpx
+import pytest
+
+from app.core import blobstore
+from app.core.blobstore import LocalBlobStore, MemoryBlobStore
+from app.main import app
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4
+SHA = hashlib.sha256(PNG).hexdigest()
+DATA_URL = "data:image/png;base64," + base64.b64encode(PNG).decode()
+
+
+@pytest.fixture
+def memory_store():
+    store = MemoryBlobStore()
+    blobstore.set_blob_store(store)
+    yield store
+    blobstore.set_blob_store(None)
+
+
+async def _get(path: str, **headers) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_data_url_is_stored_once_by_hash(memory_store):
+    ref = await blobstore.externalize_image_url(DATA_URL)
+    assert ref == f"blob:{SHA}.png"
+    assert await blobstore.externalize_image_url(DATA_URL) == ref
+    assert await memory_store.get(f"{SHA}.png") == PNG
+    assert blobstore.resolve_image_url(ref).endswith(f"/api/blobs/{SHA}.png")
+
+
+@pytest.mark.asyncio
+async def test_non_data_urls_pass_through(memory_store):
+    assert await blobstore.externalize_image_url("https://img.example/a.png") == "https://img.example/a.png"
+    assert await blobstore.externalize_image_url(None) is None
+    assert blobstore.resolve_image_url("https://img.example/a.png") == "https://img.example/a.png"
+
+
+@pytest.mark.asyncio
+async def test_local_store_shards_by_hash(tmp_path):
+    store = LocalBlobStore(tmp_path)
+    ref = f"{SHA}.png"
+    await store.put(ref, PNG)
+    await store.put(ref, b"ignored: blobs are immutable")
+    assert (tmp_path / SHA[:2] / SHA[2:4] / ref).read_bytes() == PNG
+    assert await store.get(ref) == PNG
+    assert await store.get(f"{'0' * 64}.png") is None
+
+
+@pytest.mark.asyncio
+async def test_blob_endpoint_serves_with_etag(memory_store):
+    await blobstore.put_blob(PNG, "image/png")
+    res = await _get(f"/api/blobs/{SHA}.png")
+    assert res.status_code == 200
+    assert res.content == PNG
+    assert res.headers["content-type"] == "image/png"
+    assert res.headers["etag"] == f'"{SHA}"'
+    assert "immutable" in res.headers["cache-control"]
+
+    res = await _get(f"/api/blobs/{SHA}.png", **{"If-None-Match": f'"{SHA}"'})
+    assert res.status_code == 304
+    assert res.content == b""
+
+
+@pytest.mark.asyncio
+async def test_blob_endpoint_ranges(memory_store):
+    await blobstore.put_blob(PNG, "image/png")
+    res = await _get(f"/api/blobs/{SHA}.png", Range="bytes=8-15")
+    assert res.status_code == 206
+    assert res.content == PNG[8:16]
+    assert res.headers["content-range"] == f"bytes 8-15/{len(PNG)}"
+
+    res = await _get(f"/api/blobs/{SHA}.png", Range="bytes=-4")
+    assert res.content == PNG[-4:]
+
+    res = await _get(f"/api/blobs/{SHA}.png", Range=f"bytes={len(PNG)}-")
+    assert res.status_code == 416
+
+
+@pytest.mark.asyncio
+async def test_blob_endpoint_rejects_unknown_refs(memory_store):
+    assert (await _get("/api/blobs/../../etc/passwd")).status_code == 404
+    assert (await _get(f"/api/blobs/{'0' * 64}.png")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_svg_blobs_are_sandboxed(memory_store):
+    svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+    ref = (await blobstore.put_blob(svg, "image/svg+xml")).removeprefix("blob:")
+    res = await _get(f"/api/blobs/{ref}")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "image/svg+xml"
+    assert res.headers["x-content-type-options"] == "nosniff"
+    assert "sandbox" in res.headers["content-security-policy"]
+    assert "default-src 'none'" in res.headers["content-security-policy"]
@@ -0,0 +1,169 @@
+"""Tests for the cache/queue/lock backends (in-memory and Redis via fakeredis)."""
+import fakeredis
+import pytest
+
+from app.core import redis as cache
+from app.core.cache_backend import MemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        b = MemoryBackend()
+    else:
+        b = RedisBackend(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+    cache.set_backend(b)
+    yield b
+    cache.set_backend(None)
+
+
+@pytest.mark.asyncio
+async def test_queue_is_fifo(backend):
+    await cache.enqueue_job("a")
+    await cache.enqueue_job("b")
+    assert await cache.queue_depth() == 2
+    assert await cache.dequeue_job(timeout=1) == "a"
+    assert await cache.dequeue_job(timeout=1) == "b"
+    assert await cache.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_dequeue_empty_returns_none(backend):
+    assert await backend.dequeue(cache.QUEUE_KEY, 0.1) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_roundtrip(backend):
+    key = cache.job_key("job-1")
+    await cache.cache_set(key, {"status": "running", "progress": 0.4})
+    assert await cache.cache_get(key) == {"status": "running", "progress": 0.4}
+    await cache.cache_delete(key)
+    assert await cache.cache_get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_many(backend):
+    await cache.cache_set_many({"k1": {"v": 1}, "k2": {"v": 2}})
+    assert await cache.cache_get_many(["k1", "missing", "k2"]) == [{"v": 1}, None, {"v": 2}]
+    assert await cache.cache_get_many([]) == []
+
+
+@pytest.mark.asyncio
+async def test_lock_is_exclusive(backend):
+    key = cache.lock_key("design-1")
+    assert await cache.acquire_lock(key)
+    assert not await cache.acquire_lock(key)
+    await cache.release_lock(key)
+    assert await cache.acquire_lock(key)
+
+
+def test_keys_follow_env_scheme():
+    env = cache.settings.ENV
+    assert cache.QUEUE_KEY == f"fmd:{env}:queue:process"
+    assert cache.search_key("abc", "mock") == f"fmd:{env}:search:abc:mock"
+
+
+# ── Bounded in-memory cache ──────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_memory_lru_evicts_least_recently_used():
+    b = MemoryBackend(max_entries=2)
+    await b.set("a", "1", 60)
+    await b.set("b", "2", 60)
+    assert await b.get("a") == "1"  # "b" is now least recently used
+    await b.set("c", "3", 60)
+    assert await b.get("b") is None
+    assert await b.get("a") == "1"
+    assert await b.get("c") == "3"
+    assert b.stats()["evictions"] == 1
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_byte_budget():
+    b = MemoryBackend(max_bytes=20)
+    await b.set("k1", "x" * 8, 60)  # 10 bytes
+    await b.set("k2", "y" * 8, 60)  # 20 bytes total
+    await b.set("k3", "z" * 8, 60)  # evicts k1
+    assert b.stats()["bytes"] == 20
+    assert await b.get("k1") is None
+    await b.set("huge", "x" * 100, 60)  # larger than the budget: not stored
+    assert await b.get("huge") is None
+    assert await b.get("k2") is not None
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_sweep_removes_unread_expired_keys():
+    b = MemoryBackend()
+    await b.set("old", "1", -1)
+    await b.set("fresh", "2", 60)
+    assert b.sweep() == 1
+    stats = b.stats()
+    assert stats["entries"] == 1
+    assert stats["expirations"] == 1
+    assert stats["bytes"] == len("fresh") + 1
+    await b.close()
+
+
+@pytest.mark.asyncio
+async def test_memory_hit_miss_counters():
+    b = MemoryBackend()
+    await b.set("k", "v", 60)
+    await b.get("k")
+    await b.get("nope")
+    assert b.stats()["hits"] == 1
+    assert b.stats()["misses"] == 1
+    await b.close()
+
+
+# ── Leased (at-least-once) queue consumption ─────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_reserve_ack_removes_job(backend):
+    await cache.enqueue_job("a")
+    assert await cache.reserve_job(timeout=1) == ("a", 1)
+    await cache.ack_job("a")
+    assert await backend.reclaim_expired(cache.QUEUE_KEY, visibility=0, max_attempts=3) == ([], [])
+    assert await cache.queue_depth() == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_redelivered_then_dead_lettered(backend):
+    q = cache.QUEUE_KEY
+    await cache.enqueue_job("a")
+    assert await backend.reserve(q, 1, -1) == ("a", 1)
+    assert await backend.reclaim_expired(q, visibility=60, max_attempts=2) == (["a"], [])
+    assert await backend.reserve(q, 1, -1) == ("a", 2)
+    assert await backend.reclaim_expired(q, visibility=60, max_attempts=2) == ([], ["a"])
+    assert await cache.queue_depth() == 0
+    assert await backend.dequeue(cache.DEAD_LETTER_KEY, 1) == "a"
+
+
+@pytest.mark.asyncio
+async def test_live_lease_is_not_reclaimed(backend):
+    await cache.enqueue_job("a")
+    await backend.reserve(cache.QUEUE_KEY, 1, 60)
+    assert await backend.reclaim_expired(cache.QUEUE_KEY, visibility=60, max_attempts=3) == ([], [])
+
+
+# ── Pub/sub ──────────────────────────────────────────────────────────────────
+
+
+@pytest.mark.asyncio
+async def test_publish_reaches_subscribers(backend):
+    async with backend.subscribe("chan") as sub:
+        await backend.publish("chan", "hello")
+        await backend.publish("other", "ignored")
+        assert await sub.get(timeout=1) == "hello"
+        assert await sub.get(timeout=0.1) is None
+
+
+@pytest.mark.asyncio
+async def test_publish_job_status_caches_latest(backend):
+    async with cache.subscribe_job("job-1") as sub:
+        await cache.publish_job_status("job-1", {"status": "running", "progress": 0.4})
+        assert await sub.get(timeout=1) == '{"status": "running", "progress": 0.4}'
+    assert await cache.cache_get(cache.job_key("job-1")) == {"status": "running", "progress": 0.4}
@@ -0,0 +1,67 @@
+"""Tests for one-pass canvas analysis."""
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from app.services import canvas_analysis
+from app.services.canvas_analysis import analyze_canvas, canvas_sha256
+from app.services import profile_generator
+from app.services.profile_generator import ProfileMemo, generate_profile
+
+
+def _canvas(img: Image.Image) -> str:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+def _sketch() -> Image.Image:
+    img = Image.new("RGB", (800, 400), "white")
+    img.paste((20, 20, 220), (200, 100, 400, 300))  # blue block, 1/8 of the area
+    return img
+
+
+def test_features():
+    result = analyze_canvas(_canvas(_sketch()))
+    assert (result.width, result.height, result.aspect) == (800, 400, 2.0)
+    assert result.sha256 == canvas_sha256(_canvas(_sketch()))
+    assert result.colors.dominant == "#0000c0"
+    assert result.ink_coverage == 0.125
+    assert result.ink_bbox == (0.25, 0.25, 0.5, 0.75)
+    assert 0 < result.edge_density < 0.05
+
+
+def test_blank_and_invalid_canvas():
+    blank = analyze_canvas(_canvas(Image.new("RGB", (64, 64), "white")))
+    assert blank.colors.dominant is None
+    assert blank.ink_coverage == 0.0 and blank.ink_bbox is None and blank.edge_density == 0.0
+    assert analyze_canvas("data:image/png;base64,not-an-image") is None
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [((500, 500), (1024, 1024)), ((1600, 900), (1344, 768)), ((100, 1000), (512, 2048))],
+)
+def test_generation_size_follows_aspect(size, expected):
+    result = analyze_canvas(_canvas(Image.new("RGB", size, "white")))
+    assert result.generation_size() == expected
+
+
+def test_profile_decodes_canvas_once(monkeypatch):
+    monkeypatch.setattr(profile_generator, "profile_memo", ProfileMemo(8))
+    opened = []
+    real_open = Image.open
+
+    def counting_open(fp, *args, **kwargs):
+        opened.append(fp)
+        return real_open(fp, *args, **kwargs)
+
+    monkeypatch.setattr(canvas_analysis.Image, "open", counting_open)
+    profile = generate_profile("logo", None, _canvas(_sketch()))
+
+    assert len(opened) == 1
+    assert profile["dominant_color"] == "#0000c0"
+    assert "blue" in profile["keywords"] and "sketch" in profile["keywords"]
+    assert profile["profile"]["canvas"]["aspect"] == 2.0
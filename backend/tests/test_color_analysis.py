@@ -0,0 +1,77 @@
+"""Tests for array-based colour analysis."""
+import base64
+import io
+import random
+import time
+from collections import Counter
+
+from PIL import Image
+
+from app.services.color_analysis import analyze_colors, color_histogram
+from app.services.profile_generator import generate_profile
+
+
+def _counter_reference(img: Image.Image) -> Counter:
+    """The previous per-pixel implementation."""
+    pixels = list(img.convert("RGB").getdata())
+    non_white = [(r, g, b) for r, g, b in pixels if not (r > 240 and g > 240 and b > 240)]
+    return Counter((r // 32 * 32, g // 32 * 32, b // 32 * 32) for r, g, b in non_white)
+
+
+def _random_image(size=(64, 48), seed=1) -> Image.Image:
+    rng = random.Random(seed)
+    img = Image.new("RGB", size)
+    img.putdata([
+        (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        for _ in range(size[0] * size[1])
+    ])
+    return img
+
+
+def test_histogram_matches_counter_reference():
+    img = _random_image()
+    counts = color_histogram(img, max_side=None)
+    reference = _counter_reference(img)
+    assert int(counts.sum()) == sum(reference.values())
+    for (r, g, b), n in reference.items():
+        assert counts[(r // 32 * 8 + g // 32) * 8 + b // 32] == n
+
+
+def test_palette_proportions_ignore_white():
+    img = Image.new("RGB", (100, 100), "white")
+    img.paste((200, 30, 30), (0, 0, 60, 50))  # 3000 px red
+    img.paste((20, 20, 220), (0, 50, 20, 100))  # 1000 px blue
+    result = analyze_colors(img, top_n=5)
+    assert result.dominant == "#c00000"
+    assert [(c.hex, c.proportion) for c in result.palette] == [
+        ("#c00000", 0.75),
+        ("#0000c0", 0.25),
+    ]
+
+
+def test_blank_canvas_has_no_colors():
+    result = analyze_colors(Image.new("RGB", (50, 50), "white"))
+    assert result.dominant is None and result.palette == []
+
+
+def test_large_canvas_is_fast_and_keeps_proportions():
+    img = Image.new("RGB", (2000, 2000), "white")
+    img.paste((0, 160, 0), (0, 0, 1000, 2000))
+    started = time.perf_counter()
+    result = analyze_colors(img)
+    assert time.perf_counter() - started < 0.5
+    assert result.dominant == "#00a000"
+    assert result.palette[0].proportion == 1.0
+
+
+def test_profile_includes_canvas_palette():
+    img = Image.new("RGB", (40, 40), "white")
+    img.paste((200, 30, 30), (0, 0, 20, 40))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    canvas = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+    profile = generate_profile(None, None, canvas)
+    assert profile["dominant_color"] == "#c00000"
+    assert profile["profile"]["palette"] == [{"hex": "#c00000", "proportion": 1.0}]
+    assert "red" in profile["keywords"]
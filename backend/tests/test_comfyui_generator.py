@@ -0,0 +1,99 @@
+"""ComfyUI generator against a local fake ComfyUI server."""
+import asyncio
+import base64
+import socket
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from fastapi import FastAPI, Request, Response, WebSocket, WebSocketDisconnect
+
+from app.services import comfyui_generator
+
+PNG = b"\x89PNG\r\n\x1a\nfake-image"
+
+
+def _fake_comfyui(state: dict) -> FastAPI:
+    app = FastAPI()
+    sockets: dict[str, WebSocket] = {}
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket, clientId: str):
+        await websocket.accept()
+        sockets[clientId] = websocket
+        await websocket.send_json({"type": "status", "data": {"status": {}}})
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    @app.post("/prompt")
+    async def prompt(request: Request):
+        body = await request.json()
+        prompt_id = f"p-{len(state['prompts']) + 1}"
+        state["prompts"].append(body)
+        websocket = sockets.get(body["client_id"])
+        if websocket is not None:
+            async def run():
+                await asyncio.sleep(0.05)
+                data = {"prompt_id": prompt_id}
+                await websocket.send_bytes(b"\x00\x00\x00\x01preview")
+                await websocket.send_json({"type": "executing", "data": {**data, "node": "5"}})
+                await websocket.send_json({"type": "executed", "data": {
+                    **data, "node": "7",
+                    "output": {"images": [{"filename": "out.png", "subfolder": "", "type": "output"}]},
+                }})
+                await websocket.send_json({"type": "executing", "data": {**data, "node": None}})
+            asyncio.create_task(run())
+        return {"prompt_id": prompt_id}
+
+    @app.get("/history/{prompt_id}")
+    async def history(prompt_id: str):
+        state["history_calls"] += 1
+        return {prompt_id: {"outputs": {"7": {"images": [{"filename": "out.png"}]}}}}
+
+    @app.get("/view")
+    async def view(filename: str):
+        state["views"].append(filename)
+        return Response(content=PNG, media_type="image/png")
+
+    return app
+
+
+@pytest_asyncio.fixture
+async def fake_comfyui(monkeypatch):
+    state = {"prompts": [], "history_calls": 0, "views": []}
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(_fake_comfyui(state), log_level="warning"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.01)
+    monkeypatch.setattr(comfyui_generator, "COMFYUI_URL", f"http://127.0.0.1:{port}")
+    yield state
+    server.should_exit = True
+    await task
+
+
+@pytest.mark.asyncio
+async def test_generate_completes_over_websocket(fake_comfyui):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await comfyui_generator.generate_via_comfyui("a red logo", seed=7)
+    assert result["method"] == "comfyui_sdxl"
+    assert base64.b64decode(result["image_base64"]) == PNG
+    # No 2 s poll interval, no /history round trip
+    assert loop.time() - started < 1.5
+    assert fake_comfyui["history_calls"] == 0
+    assert fake_comfyui["views"] == ["out.png"]
+    assert fake_comfyui["prompts"][0]["prompt"]["5"]["inputs"]["seed"] == 7
+
+
+@pytest.mark.asyncio
+async def test_generate_polls_without_websocket(fake_comfyui, monkeypatch):
+    monkeypatch.setattr(comfyui_generator, "ws_connect", None)
+    result = await comfyui_generator.generate_via_comfyui("a red logo")
+    assert base64.b64decode(result["image_base64"]) == PNG
+    assert fake_comfyui["history_calls"] >= 1
@@ -1,7 +1,12 @@
 """Tests for the TF-IDF embedder service."""
 import json
 import pytest
-from app.services.embedder import build_query_embedding, cosine_similarity
+from app.services.embedder import (
+    QueryEmbedding,
+    build_query_embedding,
+    cosine_similarity,
+    decode_embedding,
+)
 
 
 def test_same_words_high_similarity():
@@ -25,10 +30,9 @@ def test_empty_keywords_returns_zero():
 def test_embedding_is_bytes():
     emb = build_query_embedding(["logo", "design"])
     assert isinstance(emb, bytes)
-    payload = json.loads(emb.decode())
-    assert "terms" in payload
-    assert "vec" in payload
-    assert len(payload["terms"]) == len(payload["vec"])
+    query = decode_embedding(emb)
+    assert query.terms == ("design", "logo")
+    assert len(query.terms) == len(query.vec)
 
 
 def test_partial_overlap_gives_intermediate_score():
@@ -36,3 +40,24 @@ def test_partial_overlap_gives_intermediate_score():
     full_score = cosine_similarity(emb, "Blue Logo Minimal", ["blue", "logo", "minimal"])
     partial_score = cosine_similarity(emb, "Blue Design Asset", ["blue"])
     assert full_score > partial_score > 0
+
+
+def test_legacy_json_embedding_still_decodes():
+    legacy = json.dumps({"terms": ["blue", "logo"], "vec": [0.707107, 0.707107]}).encode()
+    assert decode_embedding(legacy).terms == ("blue", "logo")
+    assert cosine_similarity(legacy, "Blue Logo", []) > 0.99
+
+
+def test_decoded_embedding_matches_bytes():
+    emb = build_query_embedding(["blue", "minimal", "logo"])
+    query = decode_embedding(emb)
+    assert isinstance(query, QueryEmbedding)
+    assert decode_embedding(query.encode()) == query
+    assert cosine_similarity(query, "Minimal Logo", ["blue"]) == cosine_similarity(
+        emb, "Minimal Logo", ["blue"]
+    )
+
+
+def test_garbage_embedding_scores_zero():
+    assert decode_embedding(b"not an embedding") is None
+    assert cosine_similarity(b"not an embedding", "Blue", []) == 0.0
@@ -0,0 +1,36 @@
+"""Tests for off-loop CPU-bound execution (core/executor.py)."""
+import base64
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.core import executor
+from app.services.profile_generator import generate_profile, generate_profile_async
+
+
+def _canvas(color=(37, 99, 235)) -> str:
+    buf = io.BytesIO()
+    Image.new("RGB", (64, 64), color).save(buf, format="PNG")
+    return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+
+
+@pytest.fixture(params=[0, 2], ids=["threads", "processes"])
+def cpu_pool(request, monkeypatch):
+    monkeypatch.setattr(executor.settings, "CPU_POOL_WORKERS", request.param)
+    yield request.param
+    executor.shutdown_cpu_pool()
+
+
+@pytest.mark.asyncio
+async def test_run_cpu_bound_returns_result(cpu_pool):
+    pid = await executor.run_cpu_bound(os.getpid)
+    assert (pid == os.getpid()) is (cpu_pool == 0)
+
+
+@pytest.mark.asyncio
+async def test_async_profile_matches_sync(cpu_pool):
+    canvas = _canvas()
+    expected = generate_profile("blue logo", "logo", canvas)
+    assert await generate_profile_async("blue logo", "logo", canvas) == expected
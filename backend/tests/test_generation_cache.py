@@ -0,0 +1,118 @@
+"""Tests for the durable generated-image cache."""
+import asyncio
+import os
+
+import pytest
+
+from app.services import generation_cache, image_generator
+from app.services.generation_cache import GenerationCache, generation_key
+
+_KEY_ARGS = dict(backend="pollinations", cfg=7.0, steps=20, seed=42, width=1024, height=1024)
+
+
+def test_key_covers_every_input():
+    base = generation_key("blue logo", **_KEY_ARGS)
+    assert base == generation_key("blue logo", **_KEY_ARGS)
+    variants = [
+        generation_key("red logo", **_KEY_ARGS),
+        generation_key("blue logo", **{**_KEY_ARGS, "backend": "comfyui"}),
+        generation_key("blue logo", **{**_KEY_ARGS, "seed": 43}),
+        generation_key("blue logo", **{**_KEY_ARGS, "width": 768}),
+        generation_key("blue logo", **_KEY_ARGS, control_image_b64="abc"),
+    ]
+    assert base not in variants
+    assert len(set(variants)) == len(variants)
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_survives_new_instance(tmp_path):
+    cache = GenerationCache(tmp_path, max_bytes=10_000)
+    key = generation_key("blue logo", **_KEY_ARGS)
+    assert await cache.get(key) is None
+    await cache.put(key, {"image_url": "data:image/png;base64,AAAA", "image_base64": "AAAA", "method": "x"})
+    assert await cache.get(key) == {"image_url": "data:image/png;base64,AAAA", "method": "x"}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    reopened = GenerationCache(tmp_path, max_bytes=10_000)
+    assert (await reopened.get(key))["method"] == "x"
+
+
+@pytest.mark.asyncio
+async def test_size_bound_evicts_least_recently_used(tmp_path):
+    cache = GenerationCache(tmp_path, max_bytes=250)
+    entry = {"image_url": "https://img.example/" + "x" * 60, "method": "m"}
+    for key in ("a" * 64, "b" * 64, "c" * 64):
+        await cache.put(key, entry)
+    assert cache.stats()["evictions"] == 1
+    assert await cache.get("a" * 64) is None
+    await cache.get("b" * 64)  # "c" is now least recently used
+    await cache.put("d" * 64, entry)
+    assert await cache.get("c" * 64) is None
+    assert await cache.get("b" * 64) is not None
+    assert cache.stats()["bytes"] <= 250
+
+
+@pytest.mark.asyncio
+async def test_concurrent_access_keeps_index_consistent(tmp_path):
+    cache = GenerationCache(tmp_path, max_bytes=2_000)
+    entry = {"image_url": "https://img.example/" + "x" * 60, "method": "m"}
+    keys = [f"{i:064x}" for i in range(40)]
+
+    await asyncio.gather(
+        *(cache.put(k, entry) for k in keys),
+        *(cache.get(k) for k in keys),
+    )
+    stats = cache.stats()
+    on_disk = sum(p.stat().st_size for p in tmp_path.glob("*/*.json"))
+    assert stats["bytes"] == on_disk <= 2_000
+    assert stats["entries"] == len(list(tmp_path.glob("*/*.json")))
+    assert stats["hits"] + stats["misses"] == len(keys)
+
+
+@pytest.mark.asyncio
+async def test_entry_removed_by_another_process_is_a_miss(tmp_path, monkeypatch):
+    cache = GenerationCache(tmp_path, max_bytes=10_000)
+    key = generation_key("blue logo", **_KEY_ARGS)
+    await cache.put(key, {"image_url": "https://img.example/a.png", "method": "x"})
+
+    def evicted_meanwhile(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted_meanwhile)
+    assert await cache.get(key) is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["entries"] == 0
+
+
+@pytest.fixture
+def fake_chain(tmp_path, monkeypatch):
+    calls = []
+    outcome = {"method": "pollinations_ai"}
+
+    async def fake_uncached(prompt, style, *args):
+        calls.append(prompt)
+        return {"image_url": f"https://img.example/{len(calls)}.png", "method": outcome["method"]}
+
+    monkeypatch.setattr(image_generator, "_generate_uncached", fake_uncached)
+    generation_cache.set_generation_cache(GenerationCache(tmp_path, max_bytes=1_000_000))
+    yield calls, outcome
+    generation_cache.set_generation_cache(None)
+
+
+@pytest.mark.asyncio
+async def test_repeat_prompt_skips_backends(fake_chain):
+    calls, _ = fake_chain
+    first = await image_generator.generate_design_image("blue minimal logo", "logo")
+    second = await image_generator.generate_design_image("blue minimal logo", "logo")
+    assert second["image_url"] == first["image_url"]
+    assert len(calls) == 1
+    await image_generator.generate_design_image("blue minimal logo", "logo", seed=7)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_fallback_results_are_not_cached(fake_chain):
+    calls, outcome = fake_chain
+    outcome["method"] = "svg_local"
+    await image_generator.generate_design_image("blue minimal logo")
+    await image_generator.generate_design_image("blue minimal logo")
+    assert len(calls) == 2
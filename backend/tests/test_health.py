@@ -1,11 +1,16 @@
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services.backend_health import HealthRegistry, set_health_registry
 
 client = TestClient(app)
 
 
 def test_health():
-    res = client.get("/health")
+    set_health_registry(HealthRegistry())
+    try:
+        res = client.get("/health")
+    finally:
+        set_health_registry(None)
     assert res.status_code == 200
-    assert res.json() == {"status": "ok"}
+    assert res.json() == {"status": "ok", "image_backends": {}}
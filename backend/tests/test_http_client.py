@@ -0,0 +1,51 @@
+"""Tests for the shared outbound HTTP client pool."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http import _PerHostLimitTransport, close_http_client, get_http_client
+
+
+@pytest.mark.asyncio
+async def test_client_is_shared_within_loop():
+    try:
+        assert get_http_client() is get_http_client()
+    finally:
+        await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_closed_client_is_rebuilt():
+    first = get_http_client()
+    await close_http_client()
+    second = get_http_client()
+    try:
+        assert second is not first
+        assert not second.is_closed
+    finally:
+        await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit():
+    in_flight: dict[str, int] = {}
+    peak: dict[str, int] = {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        return httpx.Response(200, content=b"ok")
+
+    transport = _PerHostLimitTransport(httpx.MockTransport(handler), max_per_host=2)
+    async with httpx.AsyncClient(transport=transport) as client:
+        await asyncio.gather(
+            *[client.get("https://a.example/x") for _ in range(6)],
+            *[client.get("https://b.example/x") for _ in range(3)],
+        )
+
+    assert peak["a.example"] == 2
+    assert peak["b.example"] == 2
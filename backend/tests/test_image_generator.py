@@ -1,6 +1,14 @@
 """Tests for image generator service."""
+import asyncio
+import base64
+
 import pytest
-from app.services.image_generator import generate_design_image, _enhance_prompt, _placeholder_result
+from app.services.image_generator import (
+    _enhance_prompt,
+    _hedged,
+    _placeholder_result,
+    generate_design_image,
+)
 
 
 def test_enhance_prompt_logo():
@@ -29,7 +37,141 @@ def test_placeholder_deterministic():
 
 @pytest.mark.asyncio
 async def test_generate_without_api_key():
-    # No STABILITY_API_KEY set → fallback chain: Stable Horde → Pollinations.ai → SVG local → placeholder
+    # No STABILITY_API_KEY set → hedged chain: Pollinations.ai / Openverse → SVG local
     result = await generate_design_image("blue minimal logo")
-    assert result["method"] in ("stable_horde", "pollinations_ai", "svg_local", "placeholder")
+    assert result["method"] in (
+        "stable_horde", "pollinations_ai", "openverse", "svg_local", "placeholder"
+    )
     assert result["image_url"]
+
+
+def _backend(name, delay, result, log):
+    async def run():
+        log.append(f"start:{name}")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(f"cancel:{name}")
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return name, run
+
+
+def _image(method):
+    return {"image_url": f"https://img/{method}", "method": method}
+
+
+@pytest.mark.asyncio
+async def test_hedged_fast_primary_wins_alone():
+    log = []
+    result = await _hedged(
+        [_backend("a", 0, _image("a"), log), _backend("b", 0, _image("b"), log)], 1.0
+    )
+    assert result["method"] == "a"
+    assert log == ["start:a"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_slow_primary_is_hedged_and_cancelled():
+    log = []
+    result = await _hedged(
+        [_backend("slow", 5, _image("slow"), log), _backend("fast", 0, _image("fast"), log)],
+        0.05,
+    )
+    assert result["method"] == "fast"
+    assert log == ["start:slow", "start:fast", "cancel:slow"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_failure_starts_next_immediately():
+    log = []
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    result = await _hedged(
+        [
+            _backend("boom", 0, RuntimeError("down"), log),
+            _backend("empty", 0, {"image_url": None, "method": "x"}, log),
+            _backend("placeholder", 0, _placeholder_result("p"), log),
+            _backend("ok", 0, _image("ok"), log),
+        ],
+        10.0,
+    )
+    assert result["method"] == "ok"
+    assert loop.time() - started < 1.0
+
+
+@pytest.mark.asyncio
+async def test_hedged_all_failed_returns_none():
+    log = []
+    result = await _hedged([_backend("boom", 0, RuntimeError("down"), log)], 0.01)
+    assert result is None
+
+
+@pytest.mark.asyncio
+async def test_stability_failure_returns_empty_without_fallback(monkeypatch):
+    from app.services import image_generator
+
+    class FailingClient:
+        async def post(self, *args, **kwargs):
+            raise RuntimeError("stability down")
+
+    async def no_pollinations(*args, **kwargs):
+        raise AssertionError("Stability must not run Pollinations itself")
+
+    monkeypatch.setattr(image_generator, "get_http_client", lambda: FailingClient())
+    monkeypatch.setattr(image_generator, "_pollinations_fetch", no_pollinations)
+    assert await image_generator._generate_via_stability("logo") == {}
+
+
+@pytest.mark.asyncio
+async def test_hedged_caps_backends_in_flight():
+    log = []
+    result = await _hedged(
+        [
+            _backend("a", 5, _image("a"), log),
+            _backend("b", 0.2, _image("b"), log),
+            _backend("c", 0, _image("c"), log),
+        ],
+        0.01,
+        max_running=2,
+    )
+    # "c" is only started once "b" has answered, by which time "b" has won
+    assert result["method"] == "b"
+    assert log == ["start:a", "start:b", "cancel:a"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_observed_latency(monkeypatch):
+    from app.services.backend_health import HealthRegistry, settings
+
+    monkeypatch.setattr(settings, "IMAGE_HEDGE_MIN_DELAY_SECONDS", 0.0)
+    health = HealthRegistry()
+    health.record_success("slow", 0.1)  # 2 x 0.1s hedge delay, well above the 0.01s default
+    assert health.hedge_delay("slow", 0.01) == pytest.approx(0.2)
+    assert health.hedge_delay("unmeasured", 0.01) == 0.01
+    log = []
+    result = await _hedged(
+        [_backend("slow", 0.1, _image("slow"), log), _backend("next", 0, _image("next"), log)],
+        0.01,
+        health,
+    )
+    assert result["method"] == "slow"
+    assert log == ["start:slow"]
+
+
+@pytest.mark.asyncio
+async def test_all_backends_failing_renders_labelled_svg(monkeypatch):
+    from app.services import image_generator
+
+    async def failed(*args, **kwargs):
+        return {}
+
+    monkeypatch.setattr(image_generator, "_pollinations_fetch", failed)
+    monkeypatch.setattr(image_generator, "_openverse_fetch", failed)
+    result = await image_generator._generate_uncached(
+        "고양이 logo", "logo", _enhance_prompt("고양이 logo", "logo"), 7.0, 20, 42, 1024, 1024, None
+    )
+    assert result["method"] == "svg_local"
+    assert ">Cat<" in base64.b64decode(result["image_base64"]).decode()
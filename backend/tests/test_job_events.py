@@ -0,0 +1,65 @@
+"""Tests for the job progress SSE stream (GET /api/jobs/{id}/events)."""
+import asyncio
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.core import redis as cache
+from app.core.cache_backend import MemoryBackend
+from app.main import app
+
+
+@pytest.fixture
+def memory_backend():
+    backend = MemoryBackend()
+    cache.set_backend(backend)
+    yield backend
+    cache.set_backend(None)
+
+
+def _events(body: str) -> list[dict]:
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+async def _get(path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_updates_until_done(memory_backend):
+    job_id = str(uuid.uuid4())
+    await cache.publish_job_status(job_id, {"status": "running", "progress": 0.1})
+
+    request = asyncio.create_task(_get(f"/api/jobs/{job_id}/events"))
+    while cache.job_channel(job_id) not in memory_backend._subscribers:
+        await asyncio.sleep(0.01)
+    await cache.publish_job_status(job_id, {
+        "status": "running",
+        "progress": 0.475,
+        "style_variations": [{"style": "minimal", "image_url": "https://img/1.png"}],
+    })
+    await cache.publish_job_status(job_id, {"status": "done", "progress": 1.0})
+    response = await asyncio.wait_for(request, timeout=5)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [e["progress"] for e in events] == [0.1, 0.475, 1.0]
+    assert events[1]["style_variations"][0]["style"] == "minimal"
+    assert events[-1]["status"] == "done"
+    assert cache.job_channel(job_id) not in memory_backend._subscribers
+
+
+@pytest.mark.asyncio
+async def test_stream_of_finished_job_closes_immediately(memory_backend):
+    job_id = str(uuid.uuid4())
+    await cache.publish_job_status(job_id, {"status": "failed", "error_code": "JobTimeout"})
+    response = await asyncio.wait_for(_get(f"/api/jobs/{job_id}/events"), timeout=5)
+    assert [e["status"] for e in _events(response.text)] == ["failed"]
@@ -0,0 +1,43 @@
+"""Tests for MockProvider's inverted-index search."""
+import re
+
+import pytest
+
+from app.data.design_refs import DESIGN_REFS
+from app.providers.mock_provider import MockProvider
+
+
+def _linear_scan(keywords, category, limit):
+    """The original full-scan scoring, used as the reference."""
+    kw_set = {k.lower() for k in keywords if re.match(r"[a-zA-Z]", k)}
+    scored = []
+    for item in DESIGN_REFS:
+        item_cat = item.get("category", "")
+        tag_set = {t.lower() for t in item.get("tags", [])}
+        title_words = {w.lower() for w in re.findall(r"[a-zA-Z]+", item.get("title", ""))}
+        kw_overlap = len(kw_set & (tag_set | title_words))
+        if category and category.lower() not in (item_cat, *tag_set) and kw_overlap < 3:
+            continue
+        cat_bonus = 2.0 if category and category.lower() == item_cat else 0.0
+        scored.append((kw_overlap + cat_bonus, item))
+    scored.sort(key=lambda x: -x[0])
+    return [item["title"] for _, item in scored[:limit]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "keywords,category,limit",
+    [
+        (["minimal", "blue", "logo"], None, 20),
+        (["minimal", "blue", "logo"], "logo", 20),
+        (["dark", "ui", "dashboard", "modern"], "ui", 50),
+        (["vintage", "poster", "retro", "bold"], "Poster", 10),
+        (["한국어", "unknownword"], None, 15),
+        ([], "icon", 300),
+        (["minimal"], "nonexistent", 20),
+    ],
+)
+async def test_index_matches_linear_scan(keywords, category, limit):
+    results = await MockProvider().search(keywords, category=category, limit=limit)
+    assert [r["title"] for r in results] == _linear_scan(keywords, category, limit)
+    assert all("category" not in r for r in results)
@@ -0,0 +1,367 @@
+"""Tests for the job processing pipeline (worker/processor.py)."""
+import asyncio
+import base64
+import uuid
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core import blobstore
+from app.core import redis as cache
+from app.core.blobstore import MemoryBlobStore
+from app.core.cache_backend import MemoryBackend
+from app.core.database import Base
+from app.models import *  # noqa: F401,F403 — ensure all models registered
+from app.models.design import Design
+from app.models.job import Job
+from app.models.profile_artifact import ProfileArtifact
+from app.models.session import Session
+from app.api import designs, jobs
+from app.worker import main as worker_main
+from app.worker import processor
+
+
+@pytest_asyncio.fixture
+async def db_session(monkeypatch):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(processor, "async_session", factory)
+    monkeypatch.setattr(worker_main, "async_session", factory)
+    cache.set_backend(MemoryBackend())
+    yield factory
+    cache.set_backend(None)
+    await engine.dispose()
+
+
+@pytest.fixture
+def image_calls(monkeypatch):
+    calls: list[str] = []
+
+    async def fake_generate(prompt, style="design-asset", **kwargs):
+        calls.append(prompt)
+        return {"image_url": f"https://img.example/{len(calls)}.png", "method": "fake"}
+
+    monkeypatch.setattr(processor, "generate_design_image", fake_generate)
+    return calls
+
+
+async def _create_design(factory, text_prompt: str, category: str | None = "logo") -> str:
+    async with factory() as db:
+        session = Session(user_agent="test", ip_hash="x")
+        db.add(session)
+        await db.flush()
+        design = Design(
+            session_id=session.id,
+            input_mode="text",
+            category_hint=category,
+            text_prompt=text_prompt,
+            status="processing",
+        )
+        db.add(design)
+        await db.commit()
+        return str(design.id)
+
+
+async def _create_job(factory, text_prompt: str, category: str | None = "logo") -> str:
+    design_id = await _create_design(factory, text_prompt, category)
+    async with factory() as db:
+        job = Job(design_id=design_id, job_type="process", status="queued")
+        db.add(job)
+        await db.commit()
+        return str(job.id)
+
+
+@pytest.mark.asyncio
+async def test_job_completes_with_style_variations(db_session, image_calls):
+    job_id = await _create_job(db_session, "minimal blue logo")
+    await processor.process_job_inline(job_id)
+
+    async with db_session() as db:
+        job = await db.get(Job, job_id)
+        assert job.status == "done"
+        assert job.progress == 1.0
+        assert len(job.result["style_variations"]) == 4
+    assert len(image_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_identical_profiles_reuse_artifacts(db_session, image_calls):
+    first = await _create_job(db_session, "minimal blue logo")
+    second = await _create_job(db_session, "Minimal  BLUE logo")
+    await processor.process_job_inline(first)
+    await processor.process_job_inline(second)
+
+    assert len(image_calls) == 4  # second design generated nothing
+    async with db_session() as db:
+        a = await db.get(Job, first)
+        b = await db.get(Job, second)
+        assert b.status == "done"
+        assert a.result["style_variations"] == b.result["style_variations"]
+        artifacts = (await db.execute(select(ProfileArtifact))).scalars().all()
+        assert len(artifacts) == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_mode_hands_job_to_worker(db_session, image_calls, monkeypatch):
+    monkeypatch.setattr(designs.settings, "JOB_EXECUTION_MODE", "queue")
+    monkeypatch.setattr(designs.settings, "REDIS_URL", "redis://shared:6379/0")
+    design_id = uuid.UUID(await _create_design(db_session, "minimal blue logo"))
+    async with db_session() as db:
+        response = await designs.process_design(design_id, db)
+
+    assert response.status == "queued"
+    assert image_calls == []  # nothing ran in the API process
+    leased = await cache.reserve_job(timeout=1)
+    assert leased == (str(response.job_id), 1)
+
+    await worker_main.process_job(leased[0])
+    await worker_main.process_job(leased[0])  # redelivery of a finished job is a no-op
+    assert len(image_calls) == 4
+    async with db_session() as db:
+        assert (await db.get(Job, response.job_id)).status == "done"
+
+
+@pytest.mark.asyncio
+async def test_queue_mode_rejects_when_queue_is_full(db_session, monkeypatch):
+    monkeypatch.setattr(designs.settings, "JOB_EXECUTION_MODE", "queue")
+    monkeypatch.setattr(designs.settings, "REDIS_URL", "redis://shared:6379/0")
+    monkeypatch.setattr(designs.settings, "QUEUE_MAX_DEPTH", 1)
+    await cache.enqueue_job("backlog")
+    design_id = uuid.UUID(await _create_design(db_session, "minimal blue logo"))
+    async with db_session() as db:
+        with pytest.raises(HTTPException) as exc:
+            await designs.process_design(design_id, db)
+    assert exc.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_queue_mode_without_redis_runs_inline(db_session, image_calls, monkeypatch):
+    monkeypatch.setattr(designs.settings, "JOB_EXECUTION_MODE", "queue")
+    monkeypatch.setattr(designs.settings, "REDIS_URL", "")
+    design_id = uuid.UUID(await _create_design(db_session, "minimal blue logo"))
+    async with db_session() as db:
+        response = await designs.process_design(design_id, db)
+
+    assert await cache.queue_depth() == 0  # nothing left for a worker that cannot see it
+    for _ in range(100):
+        async with db_session() as db:
+            if (await db.get(Job, response.job_id)).status == "done":
+                break
+        await asyncio.sleep(0.01)
+    else:
+        pytest.fail("job never finished")
+    assert len(image_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_variations_are_published_as_they_finish(db_session, monkeypatch):
+    release_bold = asyncio.Event()
+
+    async def fake_generate(prompt, style="design-asset", **kwargs):
+        if "bold" in prompt.split(", ")[1]:
+            await release_bold.wait()
+        return {"image_url": f"https://img.example/{prompt.split(', ')[1]}.png", "method": "fake"}
+
+    monkeypatch.setattr(processor, "generate_design_image", fake_generate)
+    job_id = await _create_job(db_session, "minimal blue logo")
+    run = asyncio.create_task(processor.process_job_inline(job_id))
+
+    while True:
+        async with db_session() as db:
+            status = await jobs.get_job_status(uuid.UUID(job_id), db=db)
+        if status.usable and len(status.style_variations) == 3:
+            break
+        await asyncio.sleep(0.01)
+    assert status.status == "running"
+    assert [v.style for v in status.style_variations] == ["minimal", "modern", "vintage"]
+    async with db_session() as db:
+        assert len((await db.get(Job, job_id)).result["style_variations"]) == 3
+
+    release_bold.set()
+    await run
+    async with db_session() as db:
+        final = await jobs.get_job_status(uuid.UUID(job_id), db=db)
+    assert final.status == "done"
+    assert [v.style for v in final.style_variations] == ["minimal", "modern", "vintage", "bold"]
+
+
+@pytest.mark.asyncio
+async def test_generated_images_are_stored_as_blob_references(db_session, monkeypatch):
+    store = MemoryBlobStore()
+    blobstore.set_blob_store(store)
+    png = base64.b64encode(b"\x89PNG fake image bytes").decode()
+
+    async def fake_generate(prompt, style="design-asset", **kwargs):
+        return {"image_url": f"data:image/png;base64,{png}", "method": "fake"}
+
+    monkeypatch.setattr(processor, "generate_design_image", fake_generate)
+    try:
+        job_id = await _create_job(db_session, "minimal blue logo")
+        await processor.process_job_inline(job_id)
+        async with db_session() as db:
+            job = await db.get(Job, job_id)
+            refs = {v["image_url"] for v in job.result["style_variations"]}
+            status = await jobs.get_job_status(uuid.UUID(job_id), db=db)
+    finally:
+        blobstore.set_blob_store(None)
+
+    assert len(refs) == 1  # four identical images, one blob
+    (ref,) = refs
+    assert ref.startswith("blob:") and len(ref) < 80
+    assert await store.get(ref.removeprefix("blob:")) is not None
+    assert status.style_variations[0].image_url.endswith("/api/blobs/" + ref.removeprefix("blob:"))
+
+
+@pytest.mark.asyncio
+async def test_canvas_is_analysed_once_and_drives_controlnet(db_session, monkeypatch):
+    import io
+
+    from PIL import Image
+
+    from app.core.config import settings
+    from app.services import canvas_analysis, profile_generator
+
+    monkeypatch.setattr(settings, "CPU_POOL_WORKERS", 0)
+    monkeypatch.setattr(profile_generator, "profile_memo", profile_generator.ProfileMemo(8))
+    buf = io.BytesIO()
+    Image.new("RGB", (400, 200), (200, 30, 30)).save(buf, format="PNG")
+    payload = base64.b64encode(buf.getvalue()).decode()
+
+    analyses = []
+    real_analyze = canvas_analysis.analyze_canvas
+
+    def counting_analyze(data):
+        analyses.append(data)
+        return real_analyze(data)
+
+    monkeypatch.setattr(canvas_analysis, "analyze_canvas", counting_analyze)
+    calls = []
+
+    async def fake_generate(prompt, style="design-asset", **kwargs):
+        calls.append(kwargs)
+        return {"image_url": f"https://img.example/{len(calls)}.png", "method": "fake"}
+
+    monkeypatch.setattr(processor, "generate_design_image", fake_generate)
+
+    design_id = await _create_design(db_session, "logo")
+    async with db_session() as db:
+        design = await db.get(Design, uuid.UUID(design_id))
+        design.input_mode = "canvas"
+        design.input_image_url = f"data:image/png;base64,{payload}"
+        design.input_image_sha256 = canvas_analysis.canvas_sha256(design.input_image_url)
+        job = Job(design_id=design.id, job_type="process", status="queued")
+        db.add(job)
+        await db.commit()
+        job_id = str(job.id)
+    await processor.process_job_inline(job_id)
+
+    assert len(analyses) == 1
+    assert len(calls) == 4
+    assert all(
+        c == {"control_image_b64": payload, "width": 1472, "height": 704} for c in calls
+    )
+    async with db_session() as db:
+        assert (await db.get(Job, job_id)).result["dominant_color"] == "#c00000"
+
+
+@pytest.mark.asyncio
+async def test_create_design_stores_canvas_hash(db_session):
+    from app.schemas.design import DesignCreate
+    from app.services.canvas_analysis import canvas_sha256
+
+    payload = base64.b64encode(b"\x89PNG fake").decode()
+    async with db_session() as db:
+        session = Session(user_agent="test", ip_hash="x")
+        db.add(session)
+        await db.commit()
+        body = DesignCreate(
+            session_id=session.id,
+            input_mode="canvas",
+            canvas_data=f"data:image/png;base64,{payload}",
+        )
+        response = await designs.create_design(body, db)
+        design = await db.get(Design, response.design_id)
+    assert design.input_image_sha256 == canvas_sha256(payload)
+    assert len(design.input_image_sha256) == 64
+
+
+async def _create_canvas_job(factory, text_prompt: str, img) -> str:
+    import io
+
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    design_id = await _create_design(factory, text_prompt)
+    async with factory() as db:
+        design = await db.get(Design, uuid.UUID(design_id))
+        design.input_mode = "canvas"
+        design.input_image_url = "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode()
+        job = Job(design_id=design.id, job_type="process", status="queued")
+        db.add(job)
+        await db.commit()
+        return str(job.id)
+
+
+@pytest.mark.asyncio
+async def test_different_canvases_do_not_share_artifacts(db_session, image_calls, monkeypatch):
+    from PIL import Image, ImageDraw
+
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "CPU_POOL_WORKERS", 0)
+    circle = Image.new("RGB", (100, 100), "white")
+    ImageDraw.Draw(circle).ellipse((20, 20, 80, 80), fill=(200, 30, 30))
+    bar = Image.new("RGB", (100, 100), "white")
+    bar.paste((200, 30, 30), (10, 40, 90, 60))
+
+    first = await _create_canvas_job(db_session, "logo", circle)
+    second = await _create_canvas_job(db_session, "logo", bar)
+    again = await _create_canvas_job(db_session, "logo", circle)
+    for job_id in (first, second, again):
+        await processor.process_job_inline(job_id)
+
+    assert len(image_calls) == 8  # the repeated circle reused its own artifact
+    async with db_session() as db:
+        a, b, c = [(await db.get(Job, j)).result for j in (first, second, again)]
+    assert a["dominant_color"] == b["dominant_color"]
+    assert a["style_variations"] != b["style_variations"]
+    assert a["style_variations"] == c["style_variations"]
+
+
+@pytest.mark.asyncio
+async def test_fallback_images_are_not_saved_as_artifacts(db_session, monkeypatch):
+    calls = []
+
+    async def flaky_generate(prompt, style="design-asset", **kwargs):
+        calls.append(prompt)
+        if "vintage" in prompt and len(calls) <= 4:  # outage during the first design
+            return {"image_url": "data:image/svg+xml;base64,PHN2Zy8+", "method": "svg_local"}
+        return {"image_url": f"https://img.example/{len(calls)}.png", "method": "fake"}
+
+    monkeypatch.setattr(processor, "generate_design_image", flaky_generate)
+    blobstore.set_blob_store(MemoryBlobStore())
+    try:
+        first = await _create_job(db_session, "minimal blue logo")
+        await processor.process_job_inline(first)
+
+        async with db_session() as db:
+            assert (await db.get(Job, first)).status == "done"
+            assert (await db.execute(select(ProfileArtifact))).scalars().all() == []
+
+        second = await _create_job(db_session, "minimal blue logo")
+        await processor.process_job_inline(second)
+    finally:
+        blobstore.set_blob_store(None)
+
+    assert len(calls) == 8  # regenerated instead of reusing the fallback
+    async with db_session() as db:
+        assert len((await db.execute(select(ProfileArtifact))).scalars().all()) == 1
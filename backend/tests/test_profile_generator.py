@@ -1,5 +1,13 @@
 """Tests for profile generator."""
-from app.services.profile_generator import generate_profile
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from app.services import profile_generator
+from app.services.canvas_analysis import canvas_sha256
+from app.services.profile_generator import ProfileMemo, generate_profile, generate_profile_async
 
 
 def test_basic_text_prompt():
@@ -34,3 +42,60 @@ def test_stopwords_removed():
     assert "a" not in result["keywords"]
     assert "the" not in result["keywords"]
     assert "for" not in result["keywords"]
+
+
+@pytest.fixture
+def memo(monkeypatch):
+    memo = ProfileMemo(2)
+    monkeypatch.setattr(profile_generator, "profile_memo", memo)
+    return memo
+
+
+def test_memo_hits_on_normalised_text_and_keeps_source(memo, monkeypatch):
+    first = generate_profile("Minimal  Blue logo", "Logo")
+    calls = []
+    monkeypatch.setattr(profile_generator, "_extract_keywords", lambda t: calls.append(t))
+    second = generate_profile("minimal blue LOGO ", "logo")
+
+    assert calls == []
+    assert memo.stats()["hits"] == 1
+    assert second["profile_hash"] == first["profile_hash"]
+    assert second["keywords"] == first["keywords"]
+    assert second["profile"]["source_text"] == "minimal blue LOGO "
+    assert second["profile"]["category"] == "logo"
+
+
+def test_memo_returns_copies_and_evicts_lru(memo):
+    generate_profile("red", None)["keywords"].append("mutated")
+    assert "mutated" not in generate_profile("red", None)["keywords"]
+
+    generate_profile("green", None)
+    generate_profile("red", None)  # refresh "red"
+    generate_profile("blue", None)  # evicts "green"
+    assert memo.stats()["evictions"] == 1
+    assert memo.stats()["entries"] == 2
+    misses = memo.stats()["misses"]
+    generate_profile("red", None)
+    generate_profile("green", None)
+    assert memo.stats()["misses"] == misses + 1
+
+
+@pytest.mark.asyncio
+async def test_memo_keys_canvas_by_image_hash(memo, monkeypatch):
+    buf = io.BytesIO()
+    Image.new("RGB", (20, 20), (20, 20, 220)).save(buf, format="PNG")
+    payload = base64.b64encode(buf.getvalue()).decode()
+    canvas = f"data:image/png;base64,{payload}"
+
+    first = await generate_profile_async("logo", None, canvas)
+    monkeypatch.setattr(
+        profile_generator, "analyze_canvas_async", pytest.fail  # must not run again
+    )
+    # Same image without the data: prefix, keyed by the stored hash
+    again = await generate_profile_async(
+        "logo", None, payload, image_sha256=canvas_sha256(canvas)
+    )
+    assert again == first
+    assert first["dominant_color"] == "#0000c0"
+    # Text-only input with the same prompt is a different entry
+    assert generate_profile("logo", None)["profile"]["has_canvas"] is False
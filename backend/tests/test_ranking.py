@@ -1,5 +1,17 @@
 """Tests for ranking v1 — edge cases per docs/05_ranking.md"""
-from app.services.ranking import rank_results
+import random
+
+from app.services.embedder import build_query_embedding, decode_embedding
+from app.services.ranking import (
+    DEFAULT_WEIGHTS,
+    RankingWeights,
+    _build_explanation,
+    _color_score,
+    _has_negative_keyword,
+    _keyword_score,
+    _meta_score,
+    rank_results,
+)
 
 
 def _make_item(**kwargs):
@@ -115,3 +127,101 @@ def test_duplicate_url_penalty():
     )
     # Both should still be returned
     assert len(results) == 2
+
+
+def _random_items(rng, count):
+    words = ["blue", "minimal", "logo", "icon", "dark", "retro", "ui", "poster"]
+    colors = ["#2563eb", "#ef4444", "#000000", "#ffffff", "bad", None, "#12ab9f"]
+    items = []
+    for i in range(count):
+        items.append(_make_item(
+            title=" ".join(rng.sample(words, rng.randint(0, 4))).title(),
+            tags=rng.sample(words, rng.randint(0, 3)),
+            color_hex=rng.choice(colors),
+            image_url=rng.choice(["https://example.com/i.png", None]),
+            product_url=f"https://example.com/p/{rng.randint(0, 60)}",
+        ))
+    return items
+
+
+def _rank_results_scalar(
+    raw_results: list[dict],
+    keywords: list[str],
+    negative_keywords: list[str],
+    dominant_color: str | None,
+    embedding: bytes | None = None,
+    weights: RankingWeights = DEFAULT_WEIGHTS,
+) -> list[dict]:
+    """The original per-item rank_results loop, the batch engine's reference."""
+    has_embedding = embedding is not None
+    query = decode_embedding(embedding)
+    seen_urls: set[str] = set()
+    scored = []
+
+    for item in raw_results:
+        title = item.get("title", "")
+        tags = item.get("tags", [])
+        image_url = item.get("image_url")
+        product_url = item.get("product_url")
+        color_hex = item.get("color_hex")
+
+        kw = _keyword_score(title, tags, keywords)
+        color = _color_score(color_hex, dominant_color)
+        emb = query.similarity(title, tags) if query is not None else 0.0
+        meta = _meta_score(image_url, product_url, seen_urls)
+
+        if product_url:
+            seen_urls.add(product_url)
+
+        # ── Aggregation ──────────────────────────────────────────────────
+        if has_embedding:
+            overall = (
+                weights.w_embedding * emb
+                + weights.w_color * color
+                + weights.w_keyword * kw
+                + weights.w_meta * meta
+            )
+        else:
+            overall = (
+                weights.w_color_noem * color
+                + weights.w_keyword_noem * kw
+                + weights.w_meta_noem * meta
+            )
+
+        # ── Penalties ────────────────────────────────────────────────────
+        if _has_negative_keyword(title, tags, negative_keywords):
+            overall *= weights.p_negative_kw
+        if product_url and product_url in seen_urls and len(seen_urls) > 1:
+            overall *= weights.p_duplicate_url
+
+        explanation = _build_explanation(kw, color, emb)
+
+        scored.append({
+            **item,
+            "score_overall": round(overall, 4),
+            "score_keyword": round(kw, 4),
+            "score_color": round(color, 4),
+            "score_embedding": round(emb, 4),
+            "explanation": explanation,
+        })
+
+    scored.sort(key=lambda x: x["score_overall"], reverse=True)
+    return scored
+
+
+def test_batch_matches_scalar_reference():
+    items = _random_items(random.Random(7), 200)
+    keywords = ["blue", "minimal", "logo", "blue"]
+    for embedding in (None, build_query_embedding(keywords + ["poster"])):
+        args = (items, keywords, ["retro"], "#2563eb", embedding)
+        assert rank_results(*args) == _rank_results_scalar(*args)
+
+
+def test_top_k_equals_prefix_of_full_ranking():
+    items = _random_items(random.Random(11), 300)
+    embedding = build_query_embedding(["blue", "minimal", "logo"])
+    args = (items, ["blue", "minimal"], ["retro"], "#2563eb", embedding)
+    full = rank_results(*args)
+    for k in (1, 5, 20, 299, 300, 500):
+        assert rank_results(*args, top_k=k) == full[:k]
+    assert rank_results(*args, top_k=0) == []
@@ -0,0 +1,143 @@
+"""Tests for concurrent provider fan-out in POST /api/search."""
+import asyncio
+import time
+
+import pytest
+
+from app.api.search import _cached_fan_out, _fan_out, _refresh_tasks
+from app.core import redis as cache
+from app.core.cache_backend import MemoryBackend
+from app.providers.base import BaseProvider
+
+
+class _FakeProvider(BaseProvider):
+    def __init__(self, provider_id: str, delay: float = 0.0, fail: bool = False):
+        self.provider_id = provider_id
+        self._delay = delay
+        self._fail = fail
+        self.calls = 0
+
+    async def search(self, keywords, dominant_color=None, category=None, limit=20):
+        self.calls += 1
+        await asyncio.sleep(self._delay)
+        if self._fail:
+            raise RuntimeError("boom")
+        return [{"title": f"{self.provider_id} result", "tags": keywords}]
+
+
+async def _run(providers, provider_timeout=1.0, total_timeout=2.0):
+    return await _fan_out(
+        {p.provider_id: p for p in providers},
+        keywords=["logo"],
+        dominant_color=None,
+        category=None,
+        limit=5,
+        provider_timeout=provider_timeout,
+        total_timeout=total_timeout,
+    )
+
+
+@pytest.mark.asyncio
+async def test_providers_run_concurrently():
+    providers = [_FakeProvider(f"p{i}", delay=0.2) for i in range(4)]
+    start = time.monotonic()
+    outcome = await _run(providers)
+    elapsed = time.monotonic() - start
+    assert elapsed < 0.6  # sequential would take 0.8s
+    assert all(status == "done" for status, _ in outcome.values())
+    assert outcome["p0"][1][0]["title"] == "p0 result"
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_times_out():
+    outcome = await _run(
+        [_FakeProvider("fast"), _FakeProvider("slow", delay=5.0)],
+        provider_timeout=0.1,
+    )
+    assert outcome["fast"][0] == "done"
+    assert outcome["slow"] == ("timeout", [])
+
+
+@pytest.mark.asyncio
+async def test_total_budget_cancels_pending():
+    start = time.monotonic()
+    outcome = await _run(
+        [_FakeProvider("fast"), _FakeProvider("slow", delay=5.0)],
+        provider_timeout=10.0,
+        total_timeout=0.1,
+    )
+    assert time.monotonic() - start < 1.0
+    assert outcome["fast"][0] == "done"
+    assert outcome["slow"] == ("timeout", [])
+
+
+@pytest.mark.asyncio
+async def test_failed_provider_is_isolated():
+    outcome = await _run([_FakeProvider("ok"), _FakeProvider("bad", fail=True)])
+    assert outcome["ok"][0] == "done"
+    assert outcome["bad"] == ("failed", [])
+
+
+@pytest.mark.asyncio
+async def test_no_providers():
+    assert await _run([]) == {}
+
+
+# ── Search result cache ──────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def memory_cache():
+    cache.set_backend(MemoryBackend())
+    yield
+    cache.set_backend(None)
+
+
+async def _run_cached(provider, limit=5):
+    return await _cached_fan_out(
+        {provider.provider_id: provider},
+        "hash123",
+        keywords=["logo"],
+        dominant_color=None,
+        category=None,
+        limit=limit,
+    )
+
+
+@pytest.mark.asyncio
+async def test_second_search_is_served_from_cache(memory_cache):
+    provider = _FakeProvider("mock")
+    first = await _run_cached(provider)
+    second = await _run_cached(provider)
+    assert first["mock"][0] == "done" and first["mock"][2] == "miss"
+    assert second["mock"] == ("cached", first["mock"][1], "hit")
+    assert provider.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_limit(memory_cache):
+    provider = _FakeProvider("mock")
+    await _run_cached(provider, limit=5)
+    outcome = await _run_cached(provider, limit=10)
+    assert outcome["mock"][2] == "miss"
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_and_refreshed(memory_cache, monkeypatch):
+    provider = _FakeProvider("mock")
+    await _run_cached(provider)
+    monkeypatch.setitem(cache.settings.SEARCH_CACHE_TTL_SECONDS, "mock", -1)
+    outcome = await _run_cached(provider)
+    assert outcome["mock"][2] == "stale"
+    await asyncio.gather(*_refresh_tasks)
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_provider_is_not_cached(memory_cache):
+    provider = _FakeProvider("api", fail=True)
+    await _run_cached(provider)
+    outcome = await _run_cached(provider)
+    assert outcome["api"] == ("failed", [], "miss")
+    assert provider.calls == 2
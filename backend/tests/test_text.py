@@ -0,0 +1,32 @@
+"""Tests for the shared tokenizer."""
+import re
+
+from app.core.text import en_words, is_english, is_korean, ko_words, strip_tags, tokenize
+
+
+def test_tokenize_matches_previous_inline_pattern():
+    text = "Minimal BLUE logo, a 3D-icon for the Web! x"
+    expected = [t for t in re.findall(r"[a-zA-Z]+", text.lower()) if len(t) > 1]
+    assert tokenize(text) == expected
+    assert tokenize(text, min_len=3) == re.findall(r"[a-zA-Z]{3,}", text.lower())
+
+
+def test_tokenize_hangul_splits_mixed_runs():
+    assert tokenize("파란색 LOGO디자인 새", hangul=True) == ["파란색", "logo", "디자인"]
+    assert tokenize("파란색 LOGO디자인 새", min_len=1, hangul=True)[-1] == "새"
+    assert tokenize(None) == [] and tokenize("") == []
+
+
+def test_tokens_are_interned_on_request():
+    a = tokenize("".join(["mini", "mal"]) + " logo", intern=True)
+    b = tokenize("Logo " + "".join(["MINI", "MAL"]), intern=True)
+    assert a[0] is b[1]
+    assert a[1] is b[0]
+
+
+def test_predicates_and_helpers():
+    assert is_english("logo") and not is_english("로고") and not is_english("3d")
+    assert is_korean("로고") and not is_korean("logo")
+    assert en_words("Blue 로고 Icon") == ["Blue", "Icon"]
+    assert ko_words("Blue 로고 Icon 고양이") == ["로고", "고양이"]
+    assert strip_tags("<b>Flat</b> icon") == "Flat icon"
@@ -0,0 +1,58 @@
+"""Tests for the compiled Korean → English translator."""
+import random
+
+from app.data.ko_en import KO_EN_MAP
+from app.services import translation
+from app.services.image_generator import _translate_ko_to_en
+from app.services.profile_generator import generate_profile
+from app.services.translation import TermAutomaton, translate_text, translate_word
+
+
+def _brute_force_matches(terms, text):
+    return sorted(
+        (i, i + len(t), index)
+        for index, t in enumerate(terms)
+        for i in range(len(text))
+        if text.startswith(t, i)
+    )
+
+
+def test_automaton_finds_every_occurrence():
+    terms = ["he", "she", "his", "hers", "h", "ers"]
+    automaton = TermAutomaton(terms)
+    rng = random.Random(3)
+    for _ in range(200):
+        text = "".join(rng.choice("hers") for _ in range(rng.randrange(12)))
+        assert sorted(automaton.matches(text)) == _brute_force_matches(terms, text)
+
+
+def test_automaton_on_korean_map():
+    terms = list(KO_EN_MAP)
+    automaton = TermAutomaton(terms)
+    for text in ["귀여운고양이와강아지", "빨간색로고디자인", "없는단어"]:
+        assert sorted(automaton.matches(text)) == _brute_force_matches(terms, text)
+
+
+def test_translate_word():
+    assert translate_word("고양이") == "cat"  # exact
+    assert translate_word("고양이들") == "cat"  # contained term
+    assert translate_word("빨간색이") == "red"  # longest contained term wins over "빨간"
+    assert translate_word("강아") == "dog"  # prefix of a term
+    assert translate_word("없는단어") is None
+
+
+def test_translate_word_is_memoised():
+    translation.translate_word.cache_clear()
+    translate_word("고양이들")
+    translate_word("고양이들")
+    assert translation.translate_word.cache_info().hits == 1
+
+
+def test_translate_text_keeps_unknown_words():
+    assert translate_text("파란색 고양이 로고, 없는단어") == "blue cat logo, 없는단어"
+    assert _translate_ko_to_en("귀여운 강아지 icon") == "cute dog icon"
+
+
+def test_profile_falls_back_to_contained_terms():
+    # No exact entry for "고양이들": the contained term still yields English
+    assert "cat" in generate_profile("고양이들", None)["keywords"]
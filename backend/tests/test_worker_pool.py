@@ -0,0 +1,124 @@
+"""Tests for the concurrent worker pool (worker/main.py)."""
+import asyncio
+import functools
+import time
+
+import pytest
+
+from app.core import redis as cache
+from app.core.cache_backend import MemoryBackend
+from app.worker.main import WorkerPool
+from app.worker.supervisor import Supervisor
+
+
+@pytest.fixture
+def memory_queue():
+    cache.set_backend(MemoryBackend())
+    yield
+    cache.set_backend(None)
+
+
+class _Recorder:
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.done: list[str] = []
+        self.timed_out: list[str] = []
+
+    async def handle(self, job_id: str) -> None:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            self.done.append(job_id)
+        finally:
+            self.running -= 1
+
+    async def on_timeout(self, job_id: str) -> None:
+        self.timed_out.append(job_id)
+
+
+async def _until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_jobs_concurrently_up_to_limit(memory_queue):
+    rec = _Recorder()
+    pool = WorkerPool(rec.handle, concurrency=2, job_timeout=5, poll_seconds=1)
+    for i in range(4):
+        await cache.enqueue_job(f"job-{i}")
+    stop = asyncio.Event()
+    start = time.monotonic()
+    runner = asyncio.create_task(pool.run(stop))
+    await _until(lambda: len(rec.done) == 4)
+    elapsed = time.monotonic() - start
+    stop.set()
+    await runner
+    assert rec.peak == 2
+    assert elapsed < 0.7  # one at a time would take 0.8s
+
+
+@pytest.mark.asyncio
+async def test_busy_pool_leaves_jobs_queued(memory_queue):
+    rec = _Recorder(delay=0.3)
+    pool = WorkerPool(rec.handle, concurrency=1, job_timeout=5, poll_seconds=1)
+    for i in range(3):
+        await cache.enqueue_job(f"job-{i}")
+    stop = asyncio.Event()
+    runner = asyncio.create_task(pool.run(stop))
+    await _until(lambda: rec.running == 1)
+    assert await cache.queue_depth() == 2
+    stop.set()
+    await runner
+
+
+@pytest.mark.asyncio
+async def test_job_timeout_is_enforced(memory_queue):
+    rec = _Recorder(delay=5.0)
+    pool = WorkerPool(
+        rec.handle, concurrency=1, job_timeout=0.1, on_timeout=rec.on_timeout, poll_seconds=1
+    )
+    await cache.enqueue_job("slow")
+    stop = asyncio.Event()
+    runner = asyncio.create_task(pool.run(stop))
+    await _until(lambda: rec.timed_out == ["slow"])
+    stop.set()
+    await runner
+    assert rec.done == []
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_in_flight_jobs(memory_queue):
+    rec = _Recorder(delay=0.3)
+    pool = WorkerPool(rec.handle, concurrency=2, job_timeout=5, poll_seconds=1)
+    await cache.enqueue_job("a")
+    await cache.enqueue_job("b")
+    stop = asyncio.Event()
+    runner = asyncio.create_task(pool.run(stop))
+    await _until(lambda: rec.running == 2)
+    stop.set()
+    await runner
+    assert sorted(rec.done) == ["a", "b"]
+
+
+# ── Multi-process supervisor ─────────────────────────────────────────────────
+
+
+def test_supervisor_restarts_and_stops_children():
+    sup = Supervisor(2, target=functools.partial(time.sleep, 30), shutdown_timeout=5)
+    sup.start()
+    try:
+        assert len(sup.children) == 2
+        first = sup.children[0]
+        first.kill()
+        first.join()
+        assert sup.reap() == 1
+        assert all(p.is_alive() for p in sup.children)
+    finally:
+        sup.stop()
+    assert not any(p.is_alive() for p in sup.children)
@@ -17,7 +17,7 @@ import {
   createSession,
   createDesign,
   processDesign,
-  pollJobUntilDone,
+  streamJobUntilDone,
   search,
   getSessionHistory,
 } from "@/lib/api";
@@ -98,7 +98,7 @@ export default function Home() {
       const job = await processDesign(design.design_id);
 
       let finalStatus: JobStatus | null = null;
-      finalStatus = await pollJobUntilDone(job.job_id, (status) => {
+      finalStatus = await streamJobUntilDone(job.job_id, (status) => {
         setProgress(status.progress);
         if (status.ai_image_url) setAiImageUrl(status.ai_image_url);
         if (status.style_variations?.length) setStyleVariations(status.style_variations);
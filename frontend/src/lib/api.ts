@@ -75,3 +75,44 @@ export async function pollJobUntilDone(
   }
   throw new Error("Job polling timed out");
 }
+
+/**
+ * Follow a job over Server-Sent Events (GET /api/jobs/{id}/events), which
+ * pushes each progress step and finished style variation as it happens.
+ * Falls back to polling when EventSource is unavailable or the stream drops.
+ */
+export function streamJobUntilDone(
+  jobId: string,
+  onProgress?: (status: JobStatus) => void,
+  timeoutMs = 330_000
+): Promise<JobStatus> {
+  if (typeof EventSource === "undefined") {
+    return pollJobUntilDone(jobId, onProgress);
+  }
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${API_BASE}/api/jobs/${jobId}/events`);
+    let settled = false;
+    const finish = (fn: () => void) => {
+      if (settled) return;
+      settled = true;
+      clearTimeout(timer);
+      source.close();
+      fn();
+    };
+    const timer = setTimeout(
+      () => finish(() => reject(new Error("Job stream timed out"))),
+      timeoutMs
+    );
+
+    source.addEventListener("status", (event) => {
+      const status: JobStatus = JSON.parse((event as MessageEvent).data);
+      onProgress?.(status);
+      if (status.status === "done" || status.status === "failed") {
+        finish(() => resolve(status));
+      }
+    });
+    source.onerror = () => {
+      finish(() => pollJobUntilDone(jobId, onProgress).then(resolve, reject));
+    };
+  });
+}
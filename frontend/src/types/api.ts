@@ -31,7 +31,8 @@ export interface JobStatus {
   progress: number;
   error_code?: string;
   ai_image_url?: string;
-  style_variations?: StyleVariation[];
+  style_variations?: StyleVariation[]; // grows as each style finishes
+  usable?: boolean; // at least one style variation is ready
   keywords?: string[];
   dominant_color?: string;
 }
@@ -54,8 +55,16 @@ export interface SearchResultItem {
   explanation: string[];
 }
 
+export interface ProviderRunInfo {
+  provider_id: string;
+  status: "done" | "cached" | "timeout" | "failed";
+  cache: "hit" | "stale" | "miss";
+  result_count: number;
+}
+
 export interface SearchResponse {
   results: SearchResultItem[];
+  providers?: ProviderRunInfo[];
 }
 
 // History types